@@ -15,6 +15,10 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    # Первым, чтобы учитывать запросы всех остальных middleware (сессии, auth)
+    'movies.middleware.QueryInstrumentationMiddleware',
+    # До сессий и auth: их чтения тоже должны знать, закреплён ли клиент
+    'movies.middleware.ReplicaPinningMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
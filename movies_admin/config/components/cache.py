@@ -0,0 +1,37 @@
+from split_settings.tools import include
+from dotenv import load_dotenv
+
+import os
+import tempfile
+
+load_dotenv()
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+
+# Cache
+# https://docs.djangoproject.com/en/4.2/topics/cache/
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    },
+    # Денормализованные документы фильмов (фильм + жанры + персоны) и
+    # фасеты. Кэш обязан быть общим для всех воркеров: сброс после правки,
+    # поколение фасетов и счётчики попаданий иначе видит только один
+    # процесс. По умолчанию — файлы на локальном диске (воркеры одной
+    # машины); для нескольких машин — RedisCache или PyMemcacheCache.
+    'films': {
+        'BACKEND': os.environ.get(
+            'FILM_CACHE_BACKEND',
+            'django.core.cache.backends.filebased.FileBasedCache',
+        ),
+        'LOCATION': os.environ.get(
+            'FILM_CACHE_LOCATION',
+            os.path.join(tempfile.gettempdir(), 'movies_admin_films'),
+        ),
+        'TIMEOUT': int(os.environ.get('FILM_CACHE_TIMEOUT', 60 * 60)),
+        'OPTIONS': {
+            'MAX_ENTRIES': int(os.environ.get('FILM_CACHE_MAX_ENTRIES', 10000)),
+        },
+    },
+}
@@ -10,17 +10,59 @@ BASE_DIR = Path(__file__).resolve().parent.parent
 #Database
 # https://docs.djangoproject.com/en/4.2/ref/settings/#databases
 
+# По умолчанию соединения берутся из пула процесса (movies.db.postgresql_pool).
+# DB_POOL=False возвращает штатный бэкенд: тогда соединения можно держать
+# открытыми между запросами через DB_CONN_MAX_AGE.
+DB_POOL = os.environ.get('DB_POOL', 'True').lower() in ('true', '1', 'yes')
+
 DATABASES = {
     'default': {
-        'ENGINE': 'django.db.backends.postgresql',
+        'ENGINE': 'movies.db.postgresql_pool' if DB_POOL else 'django.db.backends.postgresql',
         'NAME': os.environ.get('DB_NAME'),
         'USER': os.environ.get('DB_USER'),
         'PASSWORD': os.environ.get('DB_PASSWORD'),
         'HOST': os.environ.get('DB_HOST', '127.0.0.1'),
         'PORT': os.environ.get('DB_PORT', 5432),
+        # С пулом соединение закрывается в конце запроса, то есть
+        # возвращается в пул, поэтому CONN_MAX_AGE оставляем нулевым
+        'CONN_MAX_AGE': 0 if DB_POOL else int(os.environ.get('DB_CONN_MAX_AGE', 60)),
+        'CONN_HEALTH_CHECKS': True,
+        'POOL': {
+            'MAX_SIZE': int(os.environ.get('DB_POOL_MAX_SIZE', 10)),
+            # Сколько секунд ждать свободное соединение, прежде чем вернуть ошибку
+            'TIMEOUT': float(os.environ.get('DB_POOL_TIMEOUT', 30)),
+            # Соединения старше этого срока (в секундах) пересоздаются
+            'MAX_LIFETIME': float(os.environ.get('DB_POOL_MAX_LIFETIME', 30 * 60)),
+        },
         'OPTIONS': {
             # Нужно явно указать схемы, с которыми будет работать приложение.
-            'options': '-c search_path=public,content'
+            'options': '-c search_path=public,content',
+            'connect_timeout': int(os.environ.get('DB_CONNECT_TIMEOUT', 5)),
         }
     }
-} 
\ No newline at end of file
+}
+
+# Реплики только для чтения: DB_REPLICAS=host[:port][/name],... Имя базы,
+# порт и учётные данные по умолчанию берутся у основной базы.
+DB_REPLICAS = [replica.strip() for replica in os.environ.get('DB_REPLICAS', '').split(',') if replica.strip()]
+
+for number, replica in enumerate(DB_REPLICAS, start=1):
+    replica_address, _slash, replica_name = replica.partition('/')
+    replica_host, _colon, replica_port = replica_address.partition(':')
+    DATABASES[f'replica_{number}'] = {
+        **DATABASES['default'],
+        'HOST': replica_host,
+        'PORT': replica_port or DATABASES['default']['PORT'],
+        'NAME': replica_name or DATABASES['default']['NAME'],
+        'OPTIONS': {
+            **DATABASES['default']['OPTIONS'],
+            # Случайная запись в реплику должна падать сразу
+            'options': DATABASES['default']['OPTIONS']['options'] + ' -c default_transaction_read_only=on',
+        },
+        'TEST': {'MIRROR': 'default'},
+    }
+
+DATABASE_ROUTERS = ['movies.db.router.PrimaryReplicaRouter']
+
+# Сколько секунд после записи чтения клиента идут в основную базу
+DB_READ_YOUR_WRITES_SECONDS = int(os.environ.get('DB_READ_YOUR_WRITES_SECONDS', 5))
@@ -0,0 +1,36 @@
+from split_settings.tools import include
+from dotenv import load_dotenv
+
+import os
+
+load_dotenv()
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+
+# SQL instrumentation (movies.middleware.QueryInstrumentationMiddleware)
+
+# Доля запросов, для которых считаем SQL: 1.0 — все, 0 — выключено
+SQL_INSTRUMENTATION_SAMPLE_RATE = float(os.environ.get('SQL_INSTRUMENTATION_SAMPLE_RATE', 0.1))
+# Запросы дольше порога (в миллисекундах) пишутся в лог вместе с EXPLAIN
+SQL_SLOW_QUERY_MS = float(os.environ.get('SQL_SLOW_QUERY_MS', 200))
+SQL_EXPLAIN_SLOW_QUERIES = os.environ.get('SQL_EXPLAIN_SLOW_QUERIES', 'True').lower() in ('true', '1', 'yes')
+# Сколько одинаковых по шаблону запросов за один HTTP-запрос считаем N+1
+SQL_SIMILAR_QUERY_THRESHOLD = int(os.environ.get('SQL_SIMILAR_QUERY_THRESHOLD', 5))
+
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'handlers': {
+        'console': {
+            'class': 'logging.StreamHandler',
+        },
+    },
+    'loggers': {
+        # Строки логгера уже в JSON, форматтер не нужен
+        'movies.sql': {
+            'handlers': ['console'],
+            'level': os.environ.get('SQL_LOG_LEVEL', 'INFO'),
+            'propagate': False,
+        },
+    },
+}
@@ -0,0 +1,21 @@
+"""
+Профиль развёртывания под ASGI.
+
+Запуск из каталога movies_admin:
+    gunicorn config.asgi:application -c config/gunicorn_asgi.py
+
+Асинхронные представления каталога (movies.views) под ASGI не держат поток
+воркера, пока ждут базу. Синхронный код каждого запроса (ORM, middleware)
+выполняется в отдельном потоке со своим соединением, поэтому
+DB_POOL_MAX_SIZE должен покрывать ожидаемое число одновременных запросов
+на воркер.
+"""
+
+import os
+
+bind = os.environ.get('GUNICORN_BIND', '0.0.0.0:8000')
+workers = int(os.environ.get('GUNICORN_WORKERS', 2))
+worker_class = 'uvicorn.workers.UvicornWorker'
+timeout = int(os.environ.get('GUNICORN_TIMEOUT', 30))
+graceful_timeout = int(os.environ.get('GUNICORN_GRACEFUL_TIMEOUT', 30))
+keepalive = int(os.environ.get('GUNICORN_KEEPALIVE', 5))
@@ -23,6 +23,8 @@ DEBUG = os.environ.get('DEBUG', False)
 include(
     'components/application_definition.py',
     'components/database.py',
+    'components/cache.py',
+    'components/instrumentation.py',
 ) 
 
 ALLOWED_HOSTS = os.environ.get('ALLOWED_HOSTS', 'localhost,127.0.0.1').split(',')
@@ -5,3 +5,13 @@ class MoviesConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'movies'
     verbose_name = _('movies')
+
+    def ready(self):
+        from django.db.backends.signals import connection_created
+
+        from . import signals  # noqa: F401
+        from .db.router import install_write_tracking
+        from .middleware import install_query_recording
+
+        connection_created.connect(install_query_recording, dispatch_uid='movies_query_recording')
+        connection_created.connect(install_write_tracking, dispatch_uid='movies_write_tracking')
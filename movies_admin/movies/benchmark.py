@@ -0,0 +1,20 @@
+import math
+
+
+def percentile(samples: list[float], percent: float) -> float:
+    """Процентиль методом ближайшего ранга"""
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    rank = max(math.ceil(percent / 100 * len(ordered)), 1)
+    return ordered[rank - 1]
+
+
+def summarize(samples: list[float]) -> dict[str, float]:
+    """p50/p95/p99 и среднее в миллисекундах по замерам в секундах"""
+    return {
+        'p50': percentile(samples, 50) * 1000,
+        'p95': percentile(samples, 95) * 1000,
+        'p99': percentile(samples, 99) * 1000,
+        'mean': sum(samples) / len(samples) * 1000 if samples else 0.0,
+    }
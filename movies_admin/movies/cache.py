@@ -0,0 +1,219 @@
+import asyncio
+import threading
+import time
+
+from asgiref.sync import sync_to_async
+from django.core.cache import caches
+from django.db import DEFAULT_DB_ALIAS, connection, transaction
+
+from .models import FilmWork, GenreFilmWork, PersonFilmWork
+
+FILM_CACHE_ALIAS = 'films'
+FILM_CACHE_KEY = 'film:{}'
+FACETS_GENERATION_KEY = 'facets:generation'
+
+
+class CacheStats:
+    """Счётчики попаданий и промахов кэша, общие для всех воркеров.
+
+    Счётчики лежат в самом кэше фильмов; процесс копит их у себя и
+    добавляет в кэш пачкой раз в FLUSH_EVERY событий и при чтении, чтобы
+    не писать в кэш на каждый запрос. У FileBasedCache incr не атомарен,
+    так что при гонке воркеров часть событий теряется: метрика
+    приблизительная. RedisCache и PyMemcacheCache считают точно.
+    """
+
+    FLUSH_EVERY = 100
+    HITS_KEY = 'stats:hits'
+    MISSES_KEY = 'stats:misses'
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._pending = {self.HITS_KEY: 0, self.MISSES_KEY: 0}
+
+    def hit(self):
+        self._count(self.HITS_KEY)
+
+    def miss(self):
+        self._count(self.MISSES_KEY)
+
+    def _count(self, key: str):
+        with self._lock:
+            self._pending[key] += 1
+            if sum(self._pending.values()) < self.FLUSH_EVERY:
+                return
+        self.flush()
+
+    def flush(self):
+        with self._lock:
+            pending, self._pending = self._pending, dict.fromkeys(self._pending, 0)
+        cache = film_cache()
+        for key, delta in pending.items():
+            if not delta:
+                continue
+            try:
+                cache.incr(key, delta)
+            except ValueError:
+                # Ключа ещё нет (или кэш очистили): счёт начинается заново
+                cache.add(key, delta, timeout=None)
+
+    def _total(self, key: str) -> int:
+        self.flush()
+        return film_cache().get(key, 0)
+
+    @property
+    def hits(self) -> int:
+        return self._total(self.HITS_KEY)
+
+    @property
+    def misses(self) -> int:
+        return self._total(self.MISSES_KEY)
+
+    @property
+    def hit_ratio(self) -> float:
+        hits, misses = self.hits, self.misses
+        total = hits + misses
+        return hits / total if total else 0.0
+
+
+film_cache_stats = CacheStats()
+
+
+def film_cache():
+    return caches[FILM_CACHE_ALIAS]
+
+
+def film_cache_key(film_id) -> str:
+    return FILM_CACHE_KEY.format(film_id)
+
+
+def facets_generation() -> int:
+    """Поколение кэша фасетов: входит в ключи, смена поколения сбрасывает их все"""
+    cache = film_cache()
+    generation = cache.get(FACETS_GENERATION_KEY)
+    if generation is None:
+        # Начинаем не с нуля: если ключ вытеснили, старые записи не оживут
+        cache.add(FACETS_GENERATION_KEY, time.time_ns(), timeout=None)
+        generation = cache.get(FACETS_GENERATION_KEY)
+    return generation
+
+
+def bump_facets_generation():
+    cache = film_cache()
+    try:
+        cache.incr(FACETS_GENERATION_KEY)
+    except ValueError:
+        cache.add(FACETS_GENERATION_KEY, time.time_ns(), timeout=None)
+
+
+# Документы для кэша читаются с основной базы, а не с реплики: иначе
+# после сброса кэша в него может попасть документ с отстающей реплики
+# и жить там до истечения TTL
+
+def film_queryset(film_id):
+    return FilmWork.objects.using(DEFAULT_DB_ALIAS).filter(pk=film_id).values(
+        'id', 'title', 'description', 'creation_date', 'rating', 'type',
+    )
+
+
+def genre_queryset(film_id):
+    return GenreFilmWork.objects.using(DEFAULT_DB_ALIAS).filter(film_work_id=film_id).order_by(
+        'genre__name'
+    ).values_list('genre_id', 'genre__name')
+
+
+def person_queryset(film_id):
+    return PersonFilmWork.objects.using(DEFAULT_DB_ALIAS).filter(film_work_id=film_id).order_by(
+        'role', 'person__full_name'
+    ).values_list('role', 'person_id', 'person__full_name')
+
+
+def assemble_film_document(film: dict, genres, person_rows) -> dict:
+    persons = {}
+    for role, person_id, full_name in person_rows:
+        persons.setdefault(role, []).append({'id': person_id, 'full_name': full_name})
+
+    film['genres'] = [{'id': genre_id, 'name': name} for genre_id, name in genres]
+    film['persons'] = persons
+    return film
+
+
+def build_film_document(film_id) -> dict | None:
+    """Собирает денормализованный документ фильма: сам фильм, жанры и персоны по ролям"""
+    film = film_queryset(film_id).first()
+    if film is None:
+        return None
+    return assemble_film_document(film, genre_queryset(film_id), person_queryset(film_id))
+
+
+def _evaluate_in_own_connection(queryset) -> list:
+    try:
+        return list(queryset)
+    finally:
+        # Поток исполнителя живёт дольше запроса: возвращаем соединение в пул
+        connection.close()
+
+
+async def abuild_film_document(film_id) -> dict | None:
+    """Асинхронная версия build_film_document.
+
+    Асинхронный ORM выполняет все запросы одного запроса в общем потоке,
+    поэтому жанры и персоны читаются в отдельных потоках со своими
+    соединениями, параллельно с чтением самого фильма.
+    """
+    evaluate = sync_to_async(_evaluate_in_own_connection, thread_sensitive=False)
+    film, genres, person_rows = await asyncio.gather(
+        film_queryset(film_id).afirst(),
+        evaluate(genre_queryset(film_id)),
+        evaluate(person_queryset(film_id)),
+    )
+    if film is None:
+        return None
+    return assemble_film_document(film, genres, person_rows)
+
+
+def get_film_document(film_id) -> dict | None:
+    """Возвращает документ фильма из кэша, при промахе собирает и кладёт в кэш"""
+    cache = film_cache()
+    key = film_cache_key(film_id)
+
+    document = cache.get(key)
+    if document is not None:
+        film_cache_stats.hit()
+        return document
+
+    film_cache_stats.miss()
+    document = build_film_document(film_id)
+    if document is not None:
+        cache.set(key, document)
+    return document
+
+
+async def aget_film_document(film_id) -> dict | None:
+    """Асинхронная версия get_film_document"""
+    cache = film_cache()
+    key = film_cache_key(film_id)
+
+    document = await cache.aget(key)
+    if document is not None:
+        film_cache_stats.hit()
+        return document
+
+    film_cache_stats.miss()
+    document = await abuild_film_document(film_id)
+    if document is not None:
+        await cache.aset(key, document)
+    return document
+
+
+def invalidate_films(film_ids):
+    """Сбрасывает документы фильмов и фасеты после фиксации текущей транзакции"""
+    keys = [film_cache_key(film_id) for film_id in set(film_ids)]
+    if not keys:
+        return
+    # Удаляем после коммита, иначе параллельный читатель может успеть
+    # положить в кэш ещё не закоммиченное состояние.
+    transaction.on_commit(lambda: film_cache().delete_many(keys))
+    # Фасеты агрегируют весь каталог, поэтому любое изменение фильма
+    # делает устаревшими все их варианты
+    transaction.on_commit(bump_facets_generation)
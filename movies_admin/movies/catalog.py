@@ -0,0 +1,83 @@
+import logging
+
+from django.db import connection, transaction
+
+logger = logging.getLogger(__name__)
+
+CATALOG_VIEW = 'content.film_work_catalog'
+
+# Таблицы, из которых собирается представление каталога
+CATALOG_SOURCE_TABLES = (
+    'film_work',
+    'genre',
+    'person',
+    'genre_film_work',
+    'person_film_work',
+)
+
+# Счётчики вставок/обновлений/удалений из статистики PostgreSQL: дёшево
+# и, в отличие от max(updated_at), замечает удаления строк. У
+# секционированной таблицы (partition_link_tables) счётчики ведутся по
+# секциям, а у родителя остаются нулевыми, поэтому суммируем саму таблицу
+# и листья pg_partition_tree (у обычной таблицы их нет).
+SOURCE_FINGERPRINT_SQL = """
+    SELECT string_agg(name || ':' || changes, ',' ORDER BY name)
+    FROM (
+        SELECT source.name, sum(s.n_tup_ins + s.n_tup_upd + s.n_tup_del) AS changes
+        FROM unnest(%s::text[]) AS source(name)
+        JOIN pg_stat_user_tables s
+          ON s.relid = ('content.' || source.name)::regclass
+          OR s.relid IN (
+              SELECT relid FROM pg_partition_tree(('content.' || source.name)::regclass) WHERE isleaf
+          )
+        GROUP BY source.name
+    ) counters
+"""
+
+# Произвольный, но постоянный ключ advisory-блокировки, чтобы два
+# обновления (например, из cron на разных машинах) не шли параллельно
+REFRESH_LOCK_KEY = 2_700_027
+
+
+def source_fingerprint() -> str:
+    with connection.cursor() as cursor:
+        cursor.execute(SOURCE_FINGERPRINT_SQL, [list(CATALOG_SOURCE_TABLES)])
+        return cursor.fetchone()[0] or ''
+
+
+def refresh_film_catalog(force: bool = False, concurrently: bool = True) -> bool:
+    """Обновляет представление каталога, если исходные таблицы изменились.
+
+    Возвращает True, если обновление было выполнено.
+    """
+    with transaction.atomic(), connection.cursor() as cursor:
+        cursor.execute('SELECT pg_try_advisory_xact_lock(%s)', [REFRESH_LOCK_KEY])
+        if not cursor.fetchone()[0]:
+            logger.info('Обновление %s уже выполняется, пропускаем', CATALOG_VIEW)
+            return False
+
+        fingerprint = source_fingerprint()
+        cursor.execute(
+            'SELECT source_fingerprint FROM content.materialized_view_state WHERE view_name = %s',
+            [CATALOG_VIEW],
+        )
+        row = cursor.fetchone()
+        if not force and row is not None and row[0] == fingerprint:
+            logger.info('Исходные таблицы не менялись, %s актуально', CATALOG_VIEW)
+            return False
+
+        # CONCURRENTLY не блокирует читателей, но работает дольше обычного обновления
+        mode = 'CONCURRENTLY ' if concurrently else ''
+        cursor.execute(f'REFRESH MATERIALIZED VIEW {mode}{CATALOG_VIEW}')
+        cursor.execute(
+            """
+            INSERT INTO content.materialized_view_state (view_name, source_fingerprint, refreshed_at)
+            VALUES (%s, %s, now())
+            ON CONFLICT (view_name) DO UPDATE SET
+                source_fingerprint = EXCLUDED.source_fingerprint,
+                refreshed_at = EXCLUDED.refreshed_at
+            """,
+            [CATALOG_VIEW, fingerprint],
+        )
+    logger.info('%s обновлено', CATALOG_VIEW)
+    return True
@@ -0,0 +1,38 @@
+from django.db import connection, transaction
+
+# Пересчёт счётчиков film_count одним UPDATE на таблицу. Нужен после
+# TRUNCATE связующих таблиц, восстановления из дампа или при подозрении
+# на расхождение: параллельные транзакции, добавляющие одной персоне
+# разные роли в одном фильме, могут засчитать фильм дважды.
+REPAIR_SQL = {
+    'genre': """
+        UPDATE content.genre g SET film_count = c.n
+        FROM (
+            SELECT g.id, count(gfw.id) AS n
+            FROM content.genre g
+            LEFT JOIN content.genre_film_work gfw ON gfw.genre_id = g.id
+            GROUP BY g.id
+        ) c
+        WHERE g.id = c.id AND g.film_count IS DISTINCT FROM c.n
+    """,
+    'person': """
+        UPDATE content.person p SET film_count = c.n
+        FROM (
+            SELECT p.id, count(DISTINCT pfw.film_work_id) AS n
+            FROM content.person p
+            LEFT JOIN content.person_film_work pfw ON pfw.person_id = p.id
+            GROUP BY p.id
+        ) c
+        WHERE p.id = c.id AND p.film_count IS DISTINCT FROM c.n
+    """,
+}
+
+
+def repair_film_counters() -> dict[str, int]:
+    """Пересчитывает film_count жанров и персон, возвращает число исправленных строк"""
+    fixed = {}
+    with transaction.atomic(), connection.cursor() as cursor:
+        for table, sql in REPAIR_SQL.items():
+            cursor.execute(sql)
+            fixed[table] = cursor.rowcount
+    return fixed
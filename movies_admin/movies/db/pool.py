@@ -0,0 +1,195 @@
+import os
+import threading
+import time
+import weakref
+from collections import deque
+
+from django.db import OperationalError
+from psycopg2.extensions import TRANSACTION_STATUS_IDLE
+
+
+class PoolStats:
+    """Счётчики пула для экспорта в метрики"""
+
+    def __init__(self, max_size: int):
+        self.max_size = max_size
+        self.in_use = 0
+        self.idle = 0
+        self.checkouts = 0
+        self.waits = 0
+        self.timeouts = 0
+        self.connections_opened = 0
+        self.connections_recycled = 0
+        self.connections_broken = 0
+        self.checkout_seconds = 0.0
+
+    @property
+    def saturation(self) -> float:
+        return self.in_use / self.max_size if self.max_size else 0.0
+
+
+class ConnectionPool:
+    """Потокобезопасный пул соединений psycopg2 ограниченного размера.
+
+    Если свободных соединений нет, а пул заполнен, getconn ждёт до timeout
+    секунд. Соединения старше max_lifetime секунд закрываются при возврате.
+    Свободное соединение перед выдачей проверяется запросом SELECT 1:
+    psycopg2 не замечает, что сервер закрыл соединение (рестарт базы,
+    переключение на реплику, pg_terminate_backend), пока не отправит запрос.
+    """
+
+    def __init__(self, max_size: int, timeout: float, max_lifetime: float):
+        self._timeout = timeout
+        self._max_lifetime = max_lifetime
+        self._slots = threading.BoundedSemaphore(max_size)
+        self._lock = threading.Lock()
+        self._idle = deque()
+        # Ключ — само соединение: id() после закрытия может достаться новому
+        self._opened_at = weakref.WeakKeyDictionary()
+        self._closed = False
+        self.stats = PoolStats(max_size)
+
+    def getconn(self, connect):
+        started = time.monotonic()
+        if not self._slots.acquire(blocking=False):
+            with self._lock:
+                self.stats.waits += 1
+            if not self._slots.acquire(timeout=self._timeout):
+                with self._lock:
+                    self.stats.timeouts += 1
+                raise OperationalError(
+                    f'Пул соединений исчерпан: нет свободного соединения за {self._timeout} с'
+                )
+        try:
+            connection = self._take_idle() or self._open(connect)
+        except Exception:
+            self._slots.release()
+            raise
+        with self._lock:
+            self.stats.in_use += 1
+            self.stats.checkouts += 1
+            self.stats.checkout_seconds += time.monotonic() - started
+        return connection
+
+    def putconn(self, connection):
+        try:
+            if self._closed:
+                self._discard(connection)
+            elif not connection.closed and self._expired(connection):
+                with self._lock:
+                    self.stats.connections_recycled += 1
+                self._discard(connection)
+            elif not connection.closed:
+                # Незавершённая транзакция не должна достаться следующему запросу
+                if connection.info.transaction_status != TRANSACTION_STATUS_IDLE:
+                    connection.rollback()
+                with self._lock:
+                    self._idle.append(connection)
+                    self.stats.idle = len(self._idle)
+            else:
+                self._discard(connection)
+        except Exception:
+            self._discard(connection)
+        finally:
+            with self._lock:
+                self.stats.in_use -= 1
+            self._slots.release()
+
+    def close(self):
+        """Закрывает свободные соединения; занятые закроются при возврате"""
+        with self._lock:
+            self._closed = True
+            idle, self._idle = list(self._idle), deque()
+            self.stats.idle = 0
+        for connection in idle:
+            self._discard(connection)
+
+    def _open(self, connect):
+        connection = connect()
+        with self._lock:
+            self._opened_at[connection] = time.monotonic()
+            self.stats.connections_opened += 1
+        return connection
+
+    def _take_idle(self):
+        while True:
+            with self._lock:
+                if not self._idle:
+                    return None
+                connection = self._idle.pop()
+                self.stats.idle = len(self._idle)
+            if connection.closed or self._expired(connection):
+                self._discard(connection)
+                continue
+            if not self._alive(connection):
+                with self._lock:
+                    self.stats.connections_broken += 1
+                self._discard(connection)
+                continue
+            return connection
+
+    @staticmethod
+    def _alive(connection) -> bool:
+        try:
+            with connection.cursor() as cursor:
+                cursor.execute('SELECT 1')
+            # Вне режима autocommit запрос открыл транзакцию
+            if connection.info.transaction_status != TRANSACTION_STATUS_IDLE:
+                connection.rollback()
+        except Exception:
+            return False
+        return True
+
+    def _expired(self, connection) -> bool:
+        opened_at = self._opened_at.get(connection, 0)
+        return time.monotonic() - opened_at > self._max_lifetime
+
+    def _discard(self, connection):
+        with self._lock:
+            self._opened_at.pop(connection, None)
+        if not connection.closed:
+            try:
+                connection.close()
+            except Exception:
+                pass
+
+
+_pools = {}
+_pools_lock = threading.Lock()
+
+
+def get_pool(alias: str, settings_dict: dict) -> ConnectionPool:
+    # pid в ключе: после fork воркер не должен делить сокеты с мастером
+    key = (os.getpid(), alias)
+    # Параметры подключения могут смениться на ходу: тестовый прогон
+    # переключает NAME на test_*, и соединения к старой базе выдавать нельзя
+    params = tuple(settings_dict.get(name) for name in ('NAME', 'USER', 'HOST', 'PORT'))
+    with _pools_lock:
+        pool = _pools.get(key)
+        if pool is not None and pool.params != params:
+            pool.close()
+            pool = None
+        if pool is None:
+            options = settings_dict.get('POOL', {})
+            pool = _pools[key] = ConnectionPool(
+                max_size=int(options.get('MAX_SIZE', 10)),
+                timeout=float(options.get('TIMEOUT', 30)),
+                max_lifetime=float(options.get('MAX_LIFETIME', 30 * 60)),
+            )
+            pool.params = params
+        return pool
+
+
+def close_pools(alias: str):
+    """Закрывает пулы алиаса в текущем процессе"""
+    pid = os.getpid()
+    with _pools_lock:
+        pool = _pools.pop((pid, alias), None)
+    if pool is not None:
+        pool.close()
+
+
+def pool_stats() -> dict[str, PoolStats]:
+    """Статистика пулов текущего процесса по алиасам баз"""
+    pid = os.getpid()
+    return {alias: pool.stats for (owner, alias), pool in _pools.items() if owner == pid}
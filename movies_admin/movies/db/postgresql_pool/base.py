@@ -0,0 +1,41 @@
+from django.db.backends.postgresql import base, creation
+from django.db.backends.postgresql.psycopg_any import IsolationLevel
+
+from movies.db.pool import close_pools, get_pool
+
+
+class DatabaseCreation(creation.DatabaseCreation):
+    def _destroy_test_db(self, test_database_name, verbosity):
+        # Свободные соединения пула иначе не дают удалить тестовую базу
+        close_pools(self.connection.alias)
+        super()._destroy_test_db(test_database_name, verbosity)
+
+
+class DatabaseWrapper(base.DatabaseWrapper):
+    """PostgreSQL-бэкенд, берущий соединения из пула процесса.
+
+    Django закрывает соединение в конце запроса (CONN_MAX_AGE = 0), а здесь
+    закрытие возвращает его в пул, так что запрос не платит за новое
+    подключение с TLS и аутентификацией.
+    """
+
+    creation_class = DatabaseCreation
+
+    def get_new_connection(self, conn_params):
+        # Соединение вернётся в тот пул, из которого взято, даже если
+        # параметры базы к тому времени сменились
+        self._pool = get_pool(self.alias, self.settings_dict)
+        connection = self._pool.getconn(
+            lambda: super(DatabaseWrapper, self).get_new_connection(conn_params)
+        )
+        # Родительский метод выставляет isolation_level только при открытии
+        # нового соединения, для взятого из пула делаем это сами
+        self.isolation_level = IsolationLevel(
+            self.settings_dict['OPTIONS'].get('isolation_level', IsolationLevel.READ_COMMITTED)
+        )
+        return connection
+
+    def _close(self):
+        if self.connection is not None:
+            with self.wrap_database_errors:
+                self._pool.putconn(self.connection)
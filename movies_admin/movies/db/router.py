@@ -0,0 +1,118 @@
+import random
+import re
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, connections
+
+REPLICA_PREFIX = 'replica_'
+# Сессии и пользователи читаются на каждом запросе, и отставание реплики
+# здесь выглядело бы как внезапный выход из админки
+PRIMARY_ONLY_APPS = {'auth', 'sessions'}
+
+# Состояние текущего запроса (HTTP или задачи). ContextVar, а не
+# threading.local: под ASGI запросы одного потока чередуются.
+_pinned = ContextVar('movies_db_pinned', default=False)
+_replica = ContextVar('movies_db_replica', default=None)
+_writes = ContextVar('movies_db_writes', default=None)
+
+# Запросы, которые ничего не записывают: по ним cookie не ставится
+READ_STATEMENTS = ('select', 'show', 'explain', 'savepoint', 'release', 'rollback', 'set')
+# WITH бывает и чтением (фасеты), и изменяющим CTE: пишет только тот,
+# в котором есть INSERT, UPDATE, DELETE или MERGE
+WRITE_KEYWORDS = re.compile(r'\b(insert|update|delete|merge)\b')
+
+
+class Writes:
+    """Флаг записи текущего запроса. Изменяемый объект, а не значение
+    ContextVar: запросы из потоков sync_to_async меняют копию контекста."""
+
+    def __init__(self):
+        self.happened = False
+
+
+def replica_aliases() -> list[str]:
+    return [alias for alias in settings.DATABASES if alias.startswith(REPLICA_PREFIX)]
+
+
+def begin_request(pinned: bool) -> tuple:
+    """Закрепляет за запросом одну реплику (или основную базу при pinned)"""
+    replicas = replica_aliases()
+    return (
+        _pinned.set(pinned),
+        _replica.set(random.choice(replicas) if replicas else None),
+        _writes.set(Writes()),
+    )
+
+
+def end_request(tokens: tuple):
+    for var, token in zip((_pinned, _replica, _writes), tokens):
+        var.reset(token)
+
+
+def wrote() -> bool:
+    """Была ли в текущем запросе запись в основную базу"""
+    writes = _writes.get()
+    return writes is not None and writes.happened
+
+
+def is_write(sql: str) -> bool:
+    statement = sql.lstrip().lower()
+    if statement.startswith('with'):
+        return WRITE_KEYWORDS.search(statement) is not None
+    return not statement.startswith(READ_STATEMENTS)
+
+
+def track_writes(execute, sql, params, many, context):
+    """execute_wrapper: отмечает запись, когда изменяющий запрос дошёл до основной базы.
+
+    db_for_write для этого не годится: его вызывают и для чтений внутри
+    atomic(using=...) и при разборе форм админки на GET.
+    """
+    writes = _writes.get()
+    if (
+        writes is not None
+        and not writes.happened
+        and context['connection'].alias == DEFAULT_DB_ALIAS
+        and is_write(sql)
+    ):
+        writes.happened = True
+    return execute(sql, params, many, context)
+
+
+def install_write_tracking(sender, connection, **kwargs):
+    """Обработчик connection_created: подключает track_writes к соединению"""
+    if track_writes not in connection.execute_wrappers:
+        connection.execute_wrappers.append(track_writes)
+
+
+class PrimaryReplicaRouter:
+    """Чтения — на реплики, записи и миграции — на основную базу.
+
+    Чтение остаётся на основной базе, если запрос закреплён за ней
+    (ReplicaPinningMiddleware: изменяющий запрос или недавняя запись
+    клиента) или идёт внутри транзакции основной базы.
+    """
+
+    def db_for_read(self, model, **hints):
+        if (
+            _pinned.get()
+            or model._meta.app_label in PRIMARY_ONLY_APPS
+            or connections[DEFAULT_DB_ALIAS].in_atomic_block
+        ):
+            return DEFAULT_DB_ALIAS
+        replica = _replica.get()
+        if replica is None:
+            replicas = replica_aliases()
+            replica = random.choice(replicas) if replicas else DEFAULT_DB_ALIAS
+        return replica
+
+    def db_for_write(self, model, **hints):
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Реплики содержат те же данные, что и основная база
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        return db == DEFAULT_DB_ALIAS
@@ -0,0 +1,136 @@
+import hashlib
+import json
+
+from django.db import connection
+
+from .cache import facets_generation, film_cache
+from .models import FilmWork
+
+FACETS_CACHE_KEY = 'facets:{}:{}'
+RATING_BUCKET_SIZE = 10
+FACET_NAMES = ('genre', 'type', 'year', 'rating')
+# Годы фильтра: раньше первых фильмов и позже любой разумной даты выхода
+# фильмов нет, а вне диапазона дат PostgreSQL make_date падает с ошибкой
+MIN_YEAR, MAX_YEAR = 1850, 2100
+
+# Все фасеты считаются одним запросом: отфильтрованные фильмы читаются
+# один раз в CTE (он используется дважды, поэтому материализуется), счёт
+# по жанрам идёт через связующую таблицу, остальные фасеты и общий итог —
+# через GROUPING SETS.
+FACETS_SQL = """
+WITH films AS (
+    SELECT
+        fw.id,
+        fw.type,
+        extract(year FROM fw.creation_date)::int AS year,
+        least(floor(fw.rating / {bucket})::int * {bucket}, 100 - {bucket}) AS rating_bucket
+    FROM content.film_work fw
+    WHERE {where}
+)
+SELECT 'genre', g.name, count(*)
+FROM films
+JOIN content.genre_film_work gfw ON gfw.film_work_id = films.id
+JOIN content.genre g ON g.id = gfw.genre_id
+GROUP BY g.name
+UNION ALL
+SELECT
+    CASE
+        WHEN GROUPING(type) = 0 THEN 'type'
+        WHEN GROUPING(year) = 0 THEN 'year'
+        WHEN GROUPING(rating_bucket) = 0 THEN 'rating'
+        ELSE 'total'
+    END,
+    CASE
+        WHEN GROUPING(type) = 0 THEN type
+        WHEN GROUPING(year) = 0 THEN year::text
+        WHEN GROUPING(rating_bucket) = 0 THEN rating_bucket::text
+    END,
+    count(*)
+FROM films
+GROUP BY GROUPING SETS ((type), (year), (rating_bucket), ())
+"""
+
+GENRE_CONDITION = """EXISTS (
+        SELECT 1 FROM content.genre_film_work gfw
+        JOIN content.genre g ON g.id = gfw.genre_id
+        WHERE gfw.film_work_id = fw.id AND g.name = %s
+    )"""
+
+PERSON_CONDITION = """EXISTS (
+        SELECT 1 FROM content.person_film_work pfw
+        JOIN content.person p ON p.id = pfw.person_id
+        WHERE pfw.film_work_id = fw.id AND p.full_name = %s
+    )"""
+
+
+def normalize_filters(params) -> dict:
+    """Приводит параметры запроса к каноническому виду для ключа кэша.
+
+    Поддерживаются genre (можно несколько, условия объединяются через И),
+    person, type и year. Бросает ValueError на недопустимых значениях.
+    """
+    filters = {}
+    genres = sorted({genre.strip() for genre in params.getlist('genre') if genre.strip()})
+    if genres:
+        filters['genre'] = genres
+    if person := params.get('person', '').strip():
+        filters['person'] = person
+    if film_type := params.get('type', '').strip():
+        if film_type not in FilmWork.Type.values:
+            raise ValueError(f'Неизвестный тип: {film_type}')
+        filters['type'] = film_type
+    if year := params.get('year', '').strip():
+        if not year.isdigit() or not MIN_YEAR <= int(year) <= MAX_YEAR:
+            raise ValueError(f'year должен быть числом от {MIN_YEAR} до {MAX_YEAR}')
+        filters['year'] = int(year)
+    return filters
+
+
+def facets_cache_key(filters: dict) -> str:
+    digest = hashlib.sha1(json.dumps(filters, sort_keys=True).encode()).hexdigest()
+    return FACETS_CACHE_KEY.format(facets_generation(), digest)
+
+
+def compute_facets(filters: dict) -> dict:
+    conditions, params = ['TRUE'], []
+    for genre in filters.get('genre', ()):
+        conditions.append(GENRE_CONDITION)
+        params.append(genre)
+    if 'person' in filters:
+        conditions.append(PERSON_CONDITION)
+        params.append(filters['person'])
+    if 'type' in filters:
+        conditions.append('fw.type = %s')
+        params.append(filters['type'])
+    if 'year' in filters:
+        # Диапазон вместо extract(), чтобы работал BRIN-индекс по дате
+        conditions.append("fw.creation_date >= make_date(%s, 1, 1) AND fw.creation_date < make_date(%s, 1, 1)")
+        params.extend([filters['year'], filters['year'] + 1])
+
+    # Как и документы в movies.cache, кэшируемые фасеты считаем по основной базе
+    sql = FACETS_SQL.format(bucket=RATING_BUCKET_SIZE, where=' AND '.join(conditions))
+    with connection.cursor() as cursor:
+        cursor.execute(sql, params)
+        rows = cursor.fetchall()
+
+    facets = {name: [] for name in FACET_NAMES}
+    total = 0
+    for facet, value, count in rows:
+        if facet == 'total':
+            total = count
+        else:
+            facets[facet].append({'value': value, 'count': count})
+    for values in facets.values():
+        values.sort(key=lambda item: (-item['count'], item['value'] or ''))
+    return {'filters': filters, 'total': total, 'facets': facets}
+
+
+def get_facets(filters: dict) -> dict:
+    """Фасеты из кэша; ключ зависит от поколения, которое сбрасывает invalidate_films"""
+    cache = film_cache()
+    key = facets_cache_key(filters)
+    result = cache.get(key)
+    if result is None:
+        result = compute_facets(filters)
+        cache.set(key, result)
+    return result
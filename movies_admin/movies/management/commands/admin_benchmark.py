@@ -0,0 +1,161 @@
+import json
+import time
+from pathlib import Path
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.db.models import Count
+from django.test import Client
+from django.test.utils import override_settings
+
+from movies.benchmark import summarize
+from movies.models import FilmWork, Person, PersonFilmWork
+
+DEFAULT_BASELINE = Path(settings.BASE_DIR) / 'benchmarks' / 'admin_baseline.json'
+
+
+class Command(BaseCommand):
+    help = (
+        'Замеряет задержку (p50/p95/p99) и число SQL-запросов страниц админки '
+        'через тестовый клиент и сравнивает с сохранённым базовым замером. '
+        'Каталог для замеров заполняет команда seed_catalog.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--iterations', type=int, default=20, help='Замеров на сценарий')
+        parser.add_argument('--warmup', type=int, default=3, help='Прогревочных запросов на сценарий')
+        parser.add_argument('--username', help='Пользователь админки, по умолчанию первый суперпользователь')
+        parser.add_argument('--scenario', action='append', help='Запустить только указанные сценарии')
+        parser.add_argument('--baseline', type=Path, default=DEFAULT_BASELINE)
+        parser.add_argument('--save-baseline', action='store_true', help='Записать результаты как базовые')
+        parser.add_argument(
+            '--threshold', type=float, default=0.2,
+            help='Допустимый рост p95 относительно базового замера (доля)',
+        )
+        parser.add_argument(
+            '--fail-on-regression', action='store_true',
+            help='Завершиться с ошибкой при регрессии (для CI)',
+        )
+
+    def handle(self, *args, **options):
+        user = self.get_user(options['username'])
+        scenarios = self.scenarios()
+        if options['scenario']:
+            unknown = set(options['scenario']) - set(scenarios)
+            if unknown:
+                raise CommandError(f'Неизвестные сценарии: {", ".join(sorted(unknown))}')
+            scenarios = {name: scenarios[name] for name in options['scenario']}
+
+        client = Client()
+        client.force_login(user)
+        # Сэмплирующая инструментация SQL искажала бы замеры
+        with override_settings(
+            SQL_INSTRUMENTATION_SAMPLE_RATE=0,
+            ALLOWED_HOSTS=[*settings.ALLOWED_HOSTS, 'testserver'],
+        ):
+            results = {
+                name: self.run_scenario(client, name, path, options['iterations'], options['warmup'])
+                for name, path in scenarios.items()
+            }
+
+        baseline = {}
+        if options['baseline'].exists():
+            baseline = json.loads(options['baseline'].read_text())['scenarios']
+        regressions = self.report(results, baseline, options['threshold'])
+
+        if options['save_baseline']:
+            options['baseline'].parent.mkdir(parents=True, exist_ok=True)
+            options['baseline'].write_text(json.dumps({
+                'films': FilmWork.objects.count(),
+                'iterations': options['iterations'],
+                'scenarios': results,
+            }, indent=2, ensure_ascii=False))
+            self.stdout.write(f'Базовый замер записан в {options["baseline"]}')
+
+        if regressions and options['fail_on_regression']:
+            raise CommandError(f'Регрессии: {", ".join(regressions)}')
+
+    def get_user(self, username):
+        users = get_user_model().objects.filter(is_active=True, is_superuser=True)
+        if username:
+            users = users.filter(username=username)
+        user = users.order_by('pk').first()
+        if user is None:
+            raise CommandError('Нет активного суперпользователя, создайте его через createsuperuser')
+        return user
+
+    def scenarios(self) -> dict[str, str]:
+        film = FilmWork.objects.order_by('pk').values('pk', 'title').first()
+        if film is None:
+            raise CommandError('Каталог пуст, заполните его командой seed_catalog')
+        # Форма фильма с наибольшим числом связей — худший случай для инлайнов
+        busiest = (
+            PersonFilmWork.objects.values('film_work_id').annotate(links=Count('*'))
+            .order_by('-links').values_list('film_work_id', flat=True).first()
+        ) or film['pk']
+        film_word = film['title'].split()[0]
+        person_word = Person.objects.order_by('pk').values_list('full_name', flat=True).first() or film_word
+        letter = person_word[0].upper()
+
+        return {
+            'film_changelist': '/admin/movies/filmwork/',
+            'film_changelist_deep_page': '/admin/movies/filmwork/?p=50',
+            'film_search': f'/admin/movies/filmwork/?q={film_word}',
+            'film_filter_type': '/admin/movies/filmwork/?type__exact=tv_show',
+            'film_sort_rating': '/admin/movies/filmwork/?o=-4',
+            'film_change_form': f'/admin/movies/filmwork/{busiest}/change/',
+            'person_changelist': '/admin/movies/person/',
+            'person_search': f'/admin/movies/person/?q={person_word.split()[0]}',
+            'person_filter_letter': f'/admin/movies/person/?letter={letter}',
+            'person_filter_film_count': '/admin/movies/person/?films=6-20',
+            'person_sort_film_count': '/admin/movies/person/?o=-2',
+            'genre_changelist': '/admin/movies/genre/',
+            'genre_filter_has_films': '/admin/movies/genre/?has_films=yes',
+        }
+
+    def run_scenario(self, client: Client, name: str, path: str, iterations: int, warmup: int) -> dict:
+        query_counts = []
+
+        def count_queries(execute, sql, params, many, context):
+            query_counts[-1] += 1
+            return execute(sql, params, many, context)
+
+        samples = []
+        for iteration in range(warmup + iterations):
+            query_counts.append(0)
+            with connection.execute_wrapper(count_queries):
+                started = time.perf_counter()
+                response = client.get(path)
+                elapsed = time.perf_counter() - started
+            if response.status_code != 200:
+                raise CommandError(f'{name}: {path} ответил {response.status_code}')
+            if iteration >= warmup:
+                samples.append(elapsed)
+
+        stats = summarize(samples)
+        stats['queries'] = max(query_counts[warmup:])
+        return stats
+
+    def report(self, results: dict, baseline: dict, threshold: float) -> list[str]:
+        self.stdout.write(
+            f'{"сценарий":<26} {"p50, мс":>9} {"p95, мс":>9} {"p99, мс":>9} {"SQL":>5} '
+            f'{"Δp95":>8} {"ΔSQL":>5}'
+        )
+        regressions = []
+        for name, stats in results.items():
+            line = (
+                f'{name:<26} {stats["p50"]:>9.2f} {stats["p95"]:>9.2f} '
+                f'{stats["p99"]:>9.2f} {stats["queries"]:>5}'
+            )
+            base = baseline.get(name)
+            if base:
+                p95_change = stats['p95'] / base['p95'] - 1 if base['p95'] else 0.0
+                queries_change = stats['queries'] - base['queries']
+                line += f' {p95_change:>+8.0%} {queries_change:>+5}'
+                if p95_change > threshold or queries_change > 0:
+                    regressions.append(name)
+                    line = self.style.ERROR(line)
+            self.stdout.write(line)
+        return regressions
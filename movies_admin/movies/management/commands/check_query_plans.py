@@ -0,0 +1,35 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from movies.query_plans import SMALL_TABLE_PAGES, admin_queries, large_seq_scans
+
+
+class Command(BaseCommand):
+    help = (
+        'Выполняет EXPLAIN для запросов админки и завершается с ошибкой, '
+        'если планировщик читает какую-то таблицу больше '
+        f'{SMALL_TABLE_PAGES} страниц последовательным сканированием. '
+        'Запускать на наполненной базе (seed_catalog) после ANALYZE; '
+        'то же проверяет тест movies.tests.QueryPlanTests.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--force-index', action='store_true',
+            help=(
+                'Запретить планировщику seq scan: проверяет только, что подходящий '
+                'индекс существует, а не что он выбирается на реальных данных'
+            ),
+        )
+
+    def handle(self, *args, **options):
+        failures = []
+        for label, queryset in admin_queries().items():
+            tables = large_seq_scans(queryset, force_index=options['force_index'])
+            if tables:
+                failures.append(label)
+                self.stdout.write(self.style.ERROR(f'✗ {label}: seq scan по {", ".join(tables)}'))
+            else:
+                self.stdout.write(self.style.SUCCESS(f'✓ {label}'))
+
+        if failures:
+            raise CommandError(f'Запросов с последовательным сканированием: {len(failures)}')
@@ -0,0 +1,60 @@
+import copy
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.core.management.base import BaseCommand
+from django.db import connections
+from django.db.utils import load_backend
+
+from movies.benchmark import summarize
+
+BACKENDS = {
+    'без пула': 'django.db.backends.postgresql',
+    'с пулом': 'movies.db.postgresql_pool',
+}
+
+
+class Command(BaseCommand):
+    help = (
+        'Нагрузочный тест подключения к базе: эмулирует запросы, каждый из '
+        'которых открывает соединение, выполняет запрос и закрывает его, '
+        'и сравнивает задержку со штатным бэкендом и с пулом.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=500, help='Запросов на каждый поток')
+        parser.add_argument('--threads', type=int, default=4, help='Параллельных потоков')
+        parser.add_argument('--database', default='default', help='Алиас базы из DATABASES')
+
+    def handle(self, *args, **options):
+        for label, engine in BACKENDS.items():
+            settings_dict = copy.deepcopy(connections[options['database']].settings_dict)
+            settings_dict['ENGINE'] = engine
+            settings_dict['CONN_MAX_AGE'] = 0
+
+            with ThreadPoolExecutor(options['threads']) as executor:
+                futures = [
+                    executor.submit(self.run_requests, engine, settings_dict, options['requests'])
+                    for _ in range(options['threads'])
+                ]
+                samples = [sample for future in futures for sample in future.result()]
+
+            stats = summarize(samples)
+            self.stdout.write(
+                f'{label:>9}: p50={stats["p50"]:.2f} мс, p95={stats["p95"]:.2f} мс, '
+                f'p99={stats["p99"]:.2f} мс, среднее={stats["mean"]:.2f} мс'
+            )
+
+    @staticmethod
+    def run_requests(engine: str, settings_dict: dict, count: int) -> list[float]:
+        # Отдельный алиас, чтобы пул бенчмарка не смешивался с пулом приложения
+        wrapper = load_backend(engine).DatabaseWrapper(settings_dict, alias='pool_benchmark')
+        samples = []
+        for _ in range(count):
+            started = time.perf_counter()
+            with wrapper.cursor() as cursor:
+                cursor.execute('SELECT count(*) FROM content.film_work')
+                cursor.fetchone()
+            wrapper.close()
+            samples.append(time.perf_counter() - started)
+        return samples
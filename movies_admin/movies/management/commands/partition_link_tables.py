@@ -0,0 +1,53 @@
+from django.core.management.base import BaseCommand
+
+from movies.partitioning import LINK_TABLES, measure_link_table, partition_link_tables
+
+
+class Command(BaseCommand):
+    help = (
+        'Секционирует связующие таблицы genre_film_work и person_film_work '
+        'по хешу film_work_id (или возвращает их к обычным при --partitions 0). '
+        'Поиск связей фильма идёт в одной секции, индексы каждой секции малы; '
+        'поиск по персоне или жанру обходит индексы всех секций. Таблицы '
+        'блокируются на время переноса данных.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--partitions', type=int, default=16, help='Число секций, 0 — без секций')
+        parser.add_argument('--table', choices=LINK_TABLES, action='append', help='По умолчанию обе таблицы')
+        parser.add_argument(
+            '--measure', action='store_true',
+            help='Замерить поиск, VACUUM и размер индексов до и после',
+        )
+        parser.add_argument('--lookups', type=int, default=200, help='Запросов на замер поиска')
+
+    def handle(self, *args, **options):
+        tables = options['table'] or LINK_TABLES
+        before = self.measure(tables, options['lookups']) if options['measure'] else None
+
+        rebuilt = partition_link_tables(options['partitions'], tables)
+        if not rebuilt:
+            self.stdout.write('Таблицы уже в нужном виде')
+            return
+        self.stdout.write(self.style.SUCCESS(f'Перестроены: {", ".join(rebuilt)}'))
+
+        if before is not None:
+            after = self.measure(tables, options['lookups'])
+            self.report(before, after)
+
+    @staticmethod
+    def measure(tables, lookups) -> dict:
+        return {table: measure_link_table(table, lookups) for table in tables}
+
+    def report(self, before: dict, after: dict):
+        self.stdout.write(f'{"таблица":<18} {"замер":<22} {"до":>10} {"после":>10}')
+        for table, results in before.items():
+            for metric, value in results.items():
+                if isinstance(value, dict):
+                    for stat in ('p50', 'p95'):
+                        self.stdout.write(
+                            f'{table:<18} {metric + " " + stat + ", мс":<22} '
+                            f'{value[stat]:>10.3f} {after[table][metric][stat]:>10.3f}'
+                        )
+                else:
+                    self.stdout.write(f'{table:<18} {metric:<22} {value:>10.2f} {after[table][metric]:>10.2f}')
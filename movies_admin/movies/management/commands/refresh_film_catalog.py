@@ -0,0 +1,31 @@
+from django.core.management.base import BaseCommand
+
+from movies.catalog import refresh_film_catalog
+
+
+class Command(BaseCommand):
+    help = (
+        'Обновляет материализованное представление content.film_work_catalog, '
+        'если исходные таблицы изменились с прошлого обновления. '
+        'Предназначена для запуска по расписанию (cron).'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--force', action='store_true',
+            help='Обновить, даже если исходные таблицы не менялись',
+        )
+        parser.add_argument(
+            '--blocking', action='store_true',
+            help='Обычный REFRESH вместо CONCURRENTLY: быстрее, но блокирует чтение',
+        )
+
+    def handle(self, *args, **options):
+        refreshed = refresh_film_catalog(
+            force=options['force'],
+            concurrently=not options['blocking'],
+        )
+        if refreshed:
+            self.stdout.write(self.style.SUCCESS('Каталог фильмов обновлён'))
+        else:
+            self.stdout.write('Каталог фильмов актуален, обновление не требуется')
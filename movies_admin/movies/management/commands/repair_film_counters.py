@@ -0,0 +1,17 @@
+from django.core.management.base import BaseCommand
+
+from movies.counters import repair_film_counters
+
+
+class Command(BaseCommand):
+    help = (
+        'Пересчитывает счётчики film_count жанров и персон по связующим '
+        'таблицам. Счётчики ведут триггеры, команда нужна только для '
+        'исправления расхождений (после TRUNCATE, восстановления из дампа).'
+    )
+
+    def handle(self, *args, **options):
+        fixed = repair_film_counters()
+        for table, count in fixed.items():
+            self.stdout.write(f'{table}: исправлено строк {count}')
+        self.stdout.write(self.style.SUCCESS('Счётчики фильмов пересчитаны'))
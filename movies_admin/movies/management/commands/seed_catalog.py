@@ -0,0 +1,96 @@
+import datetime
+import random
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from movies.catalog import refresh_film_catalog
+from movies.models import FilmWork, Genre, GenreFilmWork, Person, PersonFilmWork
+
+SYLLABLES = (
+    'ка', 'ро', 'ми', 'на', 'те', 'ло', 'ва', 'си', 'де', 'гу',
+    'бе', 'за', 'ри', 'по', 'лю', 'шо', 'та', 'ну', 'ве', 'жи',
+)
+
+
+class Command(BaseCommand):
+    help = (
+        'Заполняет базу синтетическим каталогом для нагрузочных тестов '
+        '(admin_benchmark). Данные создаются через модели пачками; '
+        'при одинаковом --seed получается одинаковый каталог.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--films', type=int, default=100_000)
+        parser.add_argument('--persons', type=int, help='По умолчанию половина числа фильмов')
+        parser.add_argument('--genres', type=int, default=30)
+        parser.add_argument('--batch-size', type=int, default=5000)
+        parser.add_argument('--seed', type=int, default=0)
+
+    def handle(self, *args, **options):
+        self.rng = random.Random(options['seed'])
+        batch_size = options['batch_size']
+        persons_total = options['persons'] or max(options['films'] // 2, 1)
+
+        genres = Genre.objects.bulk_create(
+            [Genre(name=self.words(2).capitalize()) for _ in range(options['genres'])],
+            batch_size=batch_size,
+        )
+        self.stdout.write(f'Жанров: {len(genres)}')
+
+        person_ids = []
+        for start in range(0, persons_total, batch_size):
+            persons = Person.objects.bulk_create(
+                [Person(full_name=self.full_name()) for _ in range(min(batch_size, persons_total - start))]
+            )
+            person_ids.extend(person.pk for person in persons)
+        self.stdout.write(f'Персон: {len(person_ids)}')
+
+        genre_ids = [genre.pk for genre in genres]
+        for start in range(0, options['films'], batch_size):
+            # Фильм и его связи в одной транзакции: прерванный запуск не
+            # оставляет фильмов без жанров и персон
+            with transaction.atomic():
+                films = FilmWork.objects.bulk_create(
+                    [self.film() for _ in range(min(batch_size, options['films'] - start))]
+                )
+                GenreFilmWork.objects.bulk_create(
+                    [
+                        GenreFilmWork(film_work=film, genre_id=genre_id)
+                        for film in films
+                        for genre_id in self.rng.sample(genre_ids, self.rng.randint(1, min(3, len(genre_ids))))
+                    ],
+                    batch_size=batch_size,
+                )
+                PersonFilmWork.objects.bulk_create(
+                    [link for film in films for link in self.credits(film, person_ids)],
+                    batch_size=batch_size,
+                )
+            self.stdout.write(f'Фильмов: {start + len(films)}')
+
+        refresh_film_catalog(force=True)
+        self.stdout.write(self.style.SUCCESS('Каталог заполнен'))
+
+    def words(self, count: int) -> str:
+        return ' '.join(
+            ''.join(self.rng.choices(SYLLABLES, k=self.rng.randint(2, 4))) for _ in range(count)
+        )
+
+    def full_name(self) -> str:
+        return self.words(2).title()
+
+    def film(self) -> FilmWork:
+        return FilmWork(
+            title=self.words(self.rng.randint(1, 4)).capitalize(),
+            description=self.words(20),
+            creation_date=datetime.date(1950, 1, 1) + datetime.timedelta(days=self.rng.randrange(365 * 75)),
+            rating=round(self.rng.uniform(0, 100), 1),
+            type=FilmWork.Type.MOVIE if self.rng.random() < 0.8 else FilmWork.Type.TV_SHOW,
+        )
+
+    def credits(self, film: FilmWork, person_ids: list) -> list[PersonFilmWork]:
+        cast = self.rng.sample(person_ids, min(self.rng.randint(3, 10), len(person_ids)))
+        roles = [(person_id, 'actor') for person_id in cast]
+        roles.append((self.rng.choice(person_ids), 'director'))
+        roles.append((self.rng.choice(person_ids), 'writer'))
+        return [PersonFilmWork(film_work=film, person_id=person_id, role=role) for person_id, role in roles]
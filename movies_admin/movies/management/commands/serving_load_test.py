@@ -0,0 +1,101 @@
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from asgiref.sync import ThreadSensitiveContext, sync_to_async
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+from django.db.backends.signals import connection_created
+from django.test import AsyncClient, Client
+
+from movies.benchmark import summarize
+
+
+class Command(BaseCommand):
+    help = (
+        'Локальный нагрузочный тест: один и тот же эндпоинт под WSGI '
+        '(фиксированный пул потоков воркера) и под ASGI (одно событийное '
+        'кольцо) на нескольких уровнях параллельности.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--path', default='/api/v1/films/?page_size=50')
+        parser.add_argument('--requests', type=int, default=200, help='Запросов на каждый уровень')
+        parser.add_argument(
+            '--concurrency', type=int, nargs='+', default=[1, 8, 32],
+            help='Уровни параллельности',
+        )
+        parser.add_argument(
+            '--wsgi-threads', type=int, default=4,
+            help='Потоков на WSGI-воркер (как --threads у gunicorn)',
+        )
+        parser.add_argument(
+            '--db-latency-ms', type=float, default=0,
+            help='Искусственная задержка каждого SQL-запроса, имитирует медленную базу',
+        )
+
+    def handle(self, *args, **options):
+        if options['db_latency_ms']:
+            delay = options['db_latency_ms'] / 1000
+
+            def slow_execute(execute, sql, params, many, context):
+                time.sleep(delay)
+                return execute(sql, params, many, context)
+
+            def add_delay(sender, connection, **kwargs):
+                if slow_execute not in connection.execute_wrappers:
+                    connection.execute_wrappers.append(slow_execute)
+
+            connection_created.connect(add_delay, weak=False)
+
+        self.stdout.write(
+            f'{options["path"]}: {options["requests"]} запросов на уровень, '
+            f'WSGI-потоков {options["wsgi_threads"]}, задержка SQL {options["db_latency_ms"]:g} мс'
+        )
+        self.stdout.write(f'{"параллельно":>11} {"сервер":>6} {"RPS":>8} {"p50, мс":>9} {"p95, мс":>9}')
+        for concurrency in options['concurrency']:
+            for label, run in (('WSGI', self.run_wsgi), ('ASGI', self.run_asgi)):
+                started = time.perf_counter()
+                samples = run(options['path'], options['requests'], concurrency, options['wsgi_threads'])
+                elapsed = time.perf_counter() - started
+                stats = summarize(samples)
+                self.stdout.write(
+                    f'{concurrency:>11} {label:>6} {len(samples) / elapsed:>8.1f} '
+                    f'{stats["p50"]:>9.2f} {stats["p95"]:>9.2f}'
+                )
+
+    @staticmethod
+    def run_wsgi(path: str, requests: int, concurrency: int, threads: int) -> list[float]:
+        # Клиенты шлют concurrency запросов одновременно, но воркер
+        # обслуживает не больше threads из них: остальные ждут в очереди
+        def request(_):
+            started = time.perf_counter()
+            response = Client().get(path)
+            # Тестовый клиент не закрывает соединения в конце запроса,
+            # а настоящий обработчик закрывает: возвращаем их в пул сами
+            close_old_connections()
+            assert response.status_code == 200, response.status_code
+            return time.perf_counter() - started
+
+        with ThreadPoolExecutor(min(concurrency, threads)) as executor:
+            return list(executor.map(request, range(requests)))
+
+    @staticmethod
+    def run_asgi(path: str, requests: int, concurrency: int, threads: int) -> list[float]:
+        async def main():
+            client = AsyncClient()
+            semaphore = asyncio.Semaphore(concurrency)
+
+            async def request():
+                async with semaphore:
+                    started = time.perf_counter()
+                    # Как ASGIHandler: свой поток для синхронного кода каждого запроса
+                    async with ThreadSensitiveContext():
+                        response = await client.get(path)
+                        await sync_to_async(close_old_connections)()
+                    assert response.status_code == 200, response.status_code
+                    return time.perf_counter() - started
+
+            return await asyncio.gather(*(request() for _ in range(requests)))
+
+        return asyncio.run(main())
@@ -0,0 +1,49 @@
+import json
+from pathlib import Path
+
+from django.core.management.base import BaseCommand
+
+from movies.startup import profile_startup
+
+
+class Command(BaseCommand):
+    help = (
+        'Замеряет холодный старт проекта в отдельных процессах с python -X importtime: '
+        'этапы (импорт Django, настройки, приложения, URL, middleware), компоненты '
+        'настроек, время импорта по приложениям и пакетам и самые медленные модули.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--runs', type=int, default=5, help='Замеряемых запусков, берётся медиана')
+        parser.add_argument('--warmup', type=int, default=1, help='Прогревочных запусков')
+        parser.add_argument('--top', type=int, default=15, help='Строк в таблицах пакетов и модулей')
+        parser.add_argument('--json', type=Path, help='Сохранить полный отчёт в файл')
+
+    def handle(self, *args, **options):
+        profile = profile_startup(options['runs'], options['warmup'])
+        top = options['top']
+
+        self.stdout.write(f'Старт процесса целиком: {profile["total"] * 1000:.1f} мс\n')
+        self.table('этап', profile['phases'].items())
+        self.table('компонент настроек', profile['components'].items())
+        self.table(
+            'приложение / пакет (свои модули)',
+            sorted(profile['groups'].items(), key=lambda item: -item[1])[:top],
+        )
+        self.table(
+            'модуль (с вложенными импортами)',
+            sorted(
+                ((module, times['cumulative']) for module, times in profile['modules'].items()),
+                key=lambda item: -item[1],
+            )[:top],
+        )
+
+        if options['json']:
+            options['json'].write_text(json.dumps(profile, indent=2, ensure_ascii=False))
+            self.stdout.write(f'Отчёт записан в {options["json"]}')
+
+    def table(self, title: str, rows):
+        self.stdout.write(f'{title:<48} {"мс":>9}')
+        for name, seconds in rows:
+            self.stdout.write(f'{name:<48} {seconds * 1000:>9.1f}')
+        self.stdout.write('')
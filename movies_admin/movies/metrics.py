@@ -0,0 +1,45 @@
+from .cache import film_cache_stats
+from .db.pool import pool_stats
+
+
+def render_metrics() -> str:
+    """Метрики процесса в текстовом формате Prometheus"""
+    lines = [
+        '# HELP movies_film_cache_hits_total Film document cache hits.',
+        '# TYPE movies_film_cache_hits_total counter',
+        f'movies_film_cache_hits_total {film_cache_stats.hits}',
+        '# HELP movies_film_cache_misses_total Film document cache misses.',
+        '# TYPE movies_film_cache_misses_total counter',
+        f'movies_film_cache_misses_total {film_cache_stats.misses}',
+        '# HELP movies_film_cache_hit_ratio Film document cache hit ratio.',
+        '# TYPE movies_film_cache_hit_ratio gauge',
+        f'movies_film_cache_hit_ratio {film_cache_stats.hit_ratio}',
+    ]
+    lines += _pool_metrics()
+    return '\n'.join(lines) + '\n'
+
+
+def _pool_metrics() -> list[str]:
+    stats = pool_stats()
+    if not stats:
+        return []
+    metrics = (
+        ('movies_db_pool_max_size', 'gauge', 'Maximum pool size.', 'max_size'),
+        ('movies_db_pool_in_use', 'gauge', 'Connections checked out.', 'in_use'),
+        ('movies_db_pool_idle', 'gauge', 'Idle connections kept in the pool.', 'idle'),
+        ('movies_db_pool_saturation', 'gauge', 'Share of the pool checked out.', 'saturation'),
+        ('movies_db_pool_checkouts_total', 'counter', 'Connection checkouts.', 'checkouts'),
+        ('movies_db_pool_waits_total', 'counter', 'Checkouts that waited for a free slot.', 'waits'),
+        ('movies_db_pool_timeouts_total', 'counter', 'Checkouts that timed out.', 'timeouts'),
+        ('movies_db_pool_checkout_seconds_total', 'counter', 'Time spent checking out connections.', 'checkout_seconds'),
+        ('movies_db_pool_connections_opened_total', 'counter', 'New PostgreSQL connections.', 'connections_opened'),
+        ('movies_db_pool_connections_recycled_total', 'counter', 'Connections closed by max lifetime.', 'connections_recycled'),
+        ('movies_db_pool_connections_broken_total', 'counter', 'Idle connections dropped by the server.', 'connections_broken'),
+    )
+    lines = []
+    for name, kind, help_text, attr in metrics:
+        lines.append(f'# HELP {name} {help_text}')
+        lines.append(f'# TYPE {name} {kind}')
+        for alias, pool in stats.items():
+            lines.append(f'{name}{{database="{alias}"}} {getattr(pool, attr)}')
+    return lines
@@ -0,0 +1,258 @@
+import json
+import logging
+import random
+import threading
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from contextvars import ContextVar
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.db import connections
+
+from .db import router
+
+logger = logging.getLogger('movies.sql')
+
+EXPLAINABLE = ('select', 'with')
+# Медленных запросов, ждущих EXPLAIN; сверх этого они пишутся в лог без плана
+EXPLAIN_BACKLOG = 16
+
+# Запросы текущего HTTP-запроса. ContextVar копируется в потоки
+# sync_to_async, поэтому видны и запросы, выполненные вне потока запроса
+# (например, параллельные чтения детальной карточки фильма).
+_queries = ContextVar('movies_sql_queries', default=None)
+
+_explain_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='sql-explain')
+_explain_slots = threading.BoundedSemaphore(EXPLAIN_BACKLOG)
+
+
+class QueryRecorder:
+    """Замеры SQL-запросов одного HTTP-запроса к одной базе"""
+
+    def __init__(self, alias: str, slow_query_ms: float):
+        self.alias = alias
+        self.slow_query_ms = slow_query_ms
+        self.count = 0
+        self.duration = 0.0
+        self.templates = Counter()
+        self.statements = Counter()
+        self.slow = []
+
+    def record(self, sql, params, many, duration):
+        self.count += 1
+        self.duration += duration
+        # Шаблон без параметров: много одинаковых шаблонов — признак N+1,
+        # одинаковые шаблон и параметры — просто повторный запрос
+        self.templates[sql] += 1
+        self.statements[(sql, repr(params))] += 1
+        if duration * 1000 >= self.slow_query_ms and not many:
+            self.slow.append((sql, params, duration))
+
+
+class RequestQueries:
+    """Запросы HTTP-запроса по базам; пишется из нескольких потоков"""
+
+    def __init__(self, slow_query_ms: float):
+        self.slow_query_ms = slow_query_ms
+        self.recorders = {}
+        self._lock = threading.Lock()
+
+    def record(self, alias, sql, params, many, duration):
+        with self._lock:
+            if alias not in self.recorders:
+                self.recorders[alias] = QueryRecorder(alias, self.slow_query_ms)
+            self.recorders[alias].record(sql, params, many, duration)
+
+
+def record_queries(execute, sql, params, many, context):
+    """execute_wrapper всех соединений: замеряет запрос, если HTTP-запрос попал в выборку"""
+    queries = _queries.get()
+    if queries is None:
+        return execute(sql, params, many, context)
+    started = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        queries.record(context['connection'].alias, sql, params, many, time.perf_counter() - started)
+
+
+def install_query_recording(sender, connection, **kwargs):
+    """Обработчик connection_created: подключает record_queries к соединению"""
+    if record_queries not in connection.execute_wrappers:
+        connection.execute_wrappers.insert(0, record_queries)
+
+
+class QueryInstrumentationMiddleware:
+    """Считает SQL-запросы каждого HTTP-запроса.
+
+    Для доли запросов SQL_INSTRUMENTATION_SAMPLE_RATE отдаёт число запросов и
+    время в базе в заголовке Server-Timing, пишет структурированную строку в
+    лог movies.sql, а запросы дольше SQL_SLOW_QUERY_MS — вместе с EXPLAIN.
+    Остальные запросы проходят без накладных расходов. Запросы считает
+    record_queries, подключённый ко всем соединениям (MoviesConfig.ready).
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        # Под ASGI цепочка middleware остаётся асинхронной, и асинхронные
+        # представления не переходят в поток ради middleware
+        if iscoroutinefunction(self.get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        queries = self.sample()
+        if queries is None:
+            return self.get_response(request)
+        token = _queries.set(queries)
+        try:
+            response = self.get_response(request)
+        finally:
+            _queries.reset(token)
+        self.report(request, response, queries)
+        return response
+
+    async def __acall__(self, request):
+        queries = self.sample()
+        if queries is None:
+            return await self.get_response(request)
+        token = _queries.set(queries)
+        try:
+            response = await self.get_response(request)
+        finally:
+            _queries.reset(token)
+        self.report(request, response, queries)
+        return response
+
+    @staticmethod
+    def sample() -> RequestQueries | None:
+        sample_rate = settings.SQL_INSTRUMENTATION_SAMPLE_RATE
+        if sample_rate <= 0 or random.random() >= sample_rate:
+            return None
+        return RequestQueries(settings.SQL_SLOW_QUERY_MS)
+
+    def report(self, request, response, queries: RequestQueries):
+        with queries._lock:
+            recorders = list(queries.recorders.values())
+        count = sum(recorder.count for recorder in recorders)
+        db_ms = sum(recorder.duration for recorder in recorders) * 1000
+        duplicates = sum(
+            repeats - 1
+            for recorder in recorders
+            for repeats in recorder.statements.values()
+            if repeats > 1
+        )
+        similar = [
+            {'database': recorder.alias, 'count': repeats, 'sql': sql}
+            for recorder in recorders
+            for sql, repeats in recorder.templates.most_common()
+            if repeats >= settings.SQL_SIMILAR_QUERY_THRESHOLD
+        ]
+
+        response['Server-Timing'] = f'db;dur={db_ms:.1f};desc="{count} queries"'
+        logger.info(json.dumps({
+            'event': 'sql_summary',
+            'method': request.method,
+            'path': request.path,
+            'status': response.status_code,
+            'queries': count,
+            'db_ms': round(db_ms, 1),
+            'duplicates': duplicates,
+            'similar': similar,
+        }, ensure_ascii=False))
+
+        for recorder in recorders:
+            for sql, params, duration in recorder.slow:
+                event = {
+                    'event': 'slow_query',
+                    'path': request.path,
+                    'database': recorder.alias,
+                    'duration_ms': round(duration * 1000, 1),
+                    'sql': sql,
+                    'plan': None,
+                }
+                # Только чтение: EXPLAIN без ANALYZE запрос не выполняет, но план
+                # для изменяющих запросов в логе обычно не нужен. План строится
+                # в фоновом потоке, чтобы не задерживать ответ
+                if (
+                    settings.SQL_EXPLAIN_SLOW_QUERIES
+                    and sql.lstrip().lower().startswith(EXPLAINABLE)
+                    and _explain_slots.acquire(blocking=False)
+                ):
+                    _explain_executor.submit(log_with_plan, event, params)
+                else:
+                    logger.warning(json.dumps(event, ensure_ascii=False))
+
+
+def log_with_plan(event: dict, params):
+    alias = event['database']
+    try:
+        with connections[alias].cursor() as cursor:
+            cursor.execute(f'EXPLAIN {event["sql"]}', params)
+            event['plan'] = [row[0] for row in cursor.fetchall()]
+    except Exception:
+        logger.exception('Не удалось получить план медленного запроса')
+    finally:
+        # Соединение этого потока возвращаем в пул до следующего EXPLAIN
+        connections[alias].close()
+        _explain_slots.release()
+    logger.warning(json.dumps(event, ensure_ascii=False))
+
+
+class ReplicaPinningMiddleware:
+    """Read-your-writes при чтении с реплик (movies.db.router).
+
+    Изменяющие запросы целиком идут в основную базу. После записи клиент
+    получает cookie на DB_READ_YOUR_WRITES_SECONDS секунд, и пока она
+    жива, его чтения тоже идут в основную базу: реплика могла ещё не
+    получить только что записанные данные.
+    """
+
+    cookie_name = 'db_pinned'
+    safe_methods = ('GET', 'HEAD', 'OPTIONS')
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(self.get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        tokens = router.begin_request(self.pinned(request))
+        try:
+            response = self.get_response(request)
+            wrote = router.wrote()
+        finally:
+            router.end_request(tokens)
+        return self.set_cookie(response, wrote)
+
+    async def __acall__(self, request):
+        tokens = router.begin_request(self.pinned(request))
+        try:
+            response = await self.get_response(request)
+            wrote = router.wrote()
+        finally:
+            router.end_request(tokens)
+        return self.set_cookie(response, wrote)
+
+    def pinned(self, request) -> bool:
+        return request.method not in self.safe_methods or self.cookie_name in request.COOKIES
+
+    def set_cookie(self, response, wrote: bool):
+        # Без реплик все чтения и так идут в основную базу
+        if wrote and settings.DB_READ_YOUR_WRITES_SECONDS > 0 and router.replica_aliases():
+            response.set_cookie(
+                self.cookie_name, '1',
+                max_age=settings.DB_READ_YOUR_WRITES_SECONDS, httponly=True, samesite='Lax',
+            )
+        return response
@@ -14,6 +14,9 @@ class Migration(migrations.Migration):
     ]
 
     operations = [
+        # Схему content создаёт schema_design/movies_database.ddl; на пустой
+        # базе (в том числе тестовой) её нужно создать до таблиц
+        migrations.RunSQL('CREATE SCHEMA IF NOT EXISTS content', migrations.RunSQL.noop),
         migrations.CreateModel(
             name='FilmWork',
             fields=[
@@ -0,0 +1,91 @@
+# Generated by Django 4.2.11 on 2026-10-19 09:01
+
+import django.contrib.postgres.fields
+from django.db import migrations, models
+
+
+CREATE_CATALOG_SQL = """
+CREATE MATERIALIZED VIEW IF NOT EXISTS content.film_work_catalog AS
+SELECT
+    fw.id,
+    fw.title,
+    fw.description,
+    fw.creation_date,
+    fw.rating,
+    fw.type,
+    fw.updated_at,
+    COALESCE(g.genres, '{}') AS genres,
+    COALESCE(p.actors, '{}') AS actors,
+    COALESCE(p.directors, '{}') AS directors,
+    COALESCE(p.writers, '{}') AS writers,
+    COALESCE(p.persons, '{}') AS persons
+FROM content.film_work fw
+LEFT JOIN (
+    SELECT gfw.film_work_id, array_agg(DISTINCT g.name ORDER BY g.name) AS genres
+    FROM content.genre_film_work gfw
+    JOIN content.genre g ON g.id = gfw.genre_id
+    GROUP BY gfw.film_work_id
+) g ON g.film_work_id = fw.id
+LEFT JOIN (
+    SELECT
+        pfw.film_work_id,
+        array_agg(DISTINCT p.full_name ORDER BY p.full_name) FILTER (WHERE pfw.role = 'actor') AS actors,
+        array_agg(DISTINCT p.full_name ORDER BY p.full_name) FILTER (WHERE pfw.role = 'director') AS directors,
+        array_agg(DISTINCT p.full_name ORDER BY p.full_name) FILTER (WHERE pfw.role = 'writer') AS writers,
+        array_agg(DISTINCT p.full_name ORDER BY p.full_name) AS persons
+    FROM content.person_film_work pfw
+    JOIN content.person p ON p.id = pfw.person_id
+    GROUP BY pfw.film_work_id
+) p ON p.film_work_id = fw.id
+WITH DATA;
+
+-- Уникальный индекс обязателен для REFRESH MATERIALIZED VIEW CONCURRENTLY
+CREATE UNIQUE INDEX IF NOT EXISTS film_work_catalog_id_idx ON content.film_work_catalog (id);
+CREATE INDEX IF NOT EXISTS film_work_catalog_genres_idx ON content.film_work_catalog USING gin (genres);
+
+-- Отпечаток исходных таблиц на момент последнего обновления представления
+CREATE TABLE IF NOT EXISTS content.materialized_view_state (
+    view_name TEXT PRIMARY KEY,
+    source_fingerprint TEXT NOT NULL,
+    refreshed_at TIMESTAMP WITH TIME ZONE NOT NULL
+);
+"""
+
+DROP_CATALOG_SQL = """
+DROP TABLE IF EXISTS content.materialized_view_state;
+DROP MATERIALIZED VIEW IF EXISTS content.film_work_catalog;
+"""
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('movies', '0006_alter_genrefilmwork_unique_together_and_more'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='FilmWorkCatalog',
+            fields=[
+                ('id', models.UUIDField(primary_key=True, serialize=False)),
+                ('title', models.TextField(verbose_name='title')),
+                ('description', models.TextField(verbose_name='description')),
+                ('creation_date', models.DateField(verbose_name='creation_date')),
+                ('rating', models.FloatField(verbose_name='rating')),
+                ('type', models.CharField(choices=[('movie', 'Movie'), ('tv_show', 'Tv Show')], max_length=10, verbose_name='type')),
+                ('updated_at', models.DateTimeField()),
+                ('genres', django.contrib.postgres.fields.ArrayField(base_field=models.TextField(), size=None)),
+                ('actors', django.contrib.postgres.fields.ArrayField(base_field=models.TextField(), size=None)),
+                ('directors', django.contrib.postgres.fields.ArrayField(base_field=models.TextField(), size=None)),
+                ('writers', django.contrib.postgres.fields.ArrayField(base_field=models.TextField(), size=None)),
+                ('persons', django.contrib.postgres.fields.ArrayField(base_field=models.TextField(), size=None)),
+            ],
+            options={
+                'verbose_name': 'Каталог фильмов',
+                'verbose_name_plural': 'Каталог фильмов',
+                'db_table': 'content"."film_work_catalog',
+                'managed': False,
+            },
+        ),
+        migrations.RunSQL(CREATE_CATALOG_SQL, DROP_CATALOG_SQL),
+    ]
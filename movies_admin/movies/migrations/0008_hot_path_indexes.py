@@ -0,0 +1,125 @@
+# Generated by Django 4.2.11 on 2026-10-19 09:04
+
+import django.contrib.postgres.indexes
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+# Внешние ключи, одиночные индексы которых удаляются: их покрывают
+# unique_together и составные индексы ниже
+FK_COLUMNS = (
+    ('genrefilmwork', 'film_work'),
+    ('genrefilmwork', 'genre'),
+    ('personfilmwork', 'film_work'),
+    ('personfilmwork', 'person'),
+)
+
+# Имя индекса ищем в каталоге: Django генерирует его с хешем, и в базе,
+# созданной не этими миграциями, оно может отличаться
+FK_INDEXES_SQL = """
+    SELECT ic.relname
+    FROM pg_index i
+    JOIN pg_class ic ON ic.oid = i.indexrelid
+    JOIN pg_attribute a ON a.attrelid = i.indrelid AND a.attnum = i.indkey[0]
+    WHERE i.indrelid = %s::regclass AND a.attname = %s
+      AND i.indnatts = 1 AND NOT i.indisunique
+      AND i.indexprs IS NULL AND i.indpred IS NULL
+"""
+
+
+def drop_fk_indexes(apps, schema_editor):
+    for model_name, field_name in FK_COLUMNS:
+        model = apps.get_model('movies', model_name)
+        column = model._meta.get_field(field_name).column
+        with schema_editor.connection.cursor() as cursor:
+            cursor.execute(FK_INDEXES_SQL, [f'"{model._meta.db_table}"', column])
+            names = [row[0] for row in cursor.fetchall()]
+        for name in names:
+            schema_editor.execute(f'DROP INDEX content.{schema_editor.quote_name(name)}')
+
+
+def create_fk_indexes(apps, schema_editor):
+    for model_name, field_name in FK_COLUMNS:
+        model = apps.get_model('movies', model_name)
+        field = model._meta.get_field(field_name)
+        with schema_editor.connection.cursor() as cursor:
+            cursor.execute(FK_INDEXES_SQL, [f'"{model._meta.db_table}"', field.column])
+            if cursor.fetchone():
+                continue
+        schema_editor.execute(schema_editor._create_index_sql(model, fields=[field]))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('movies', '0007_film_work_catalog'),
+    ]
+
+    operations = [
+        # Для таблиц вида "content"."genre_film_work" Django не находит индексы
+        # внешних ключей при интроспекции, и AlterField(db_index=False) их не
+        # удаляет, поэтому в базе удаляем их сами, найдя в каталоге
+        migrations.SeparateDatabaseAndState(
+            state_operations=[
+                migrations.AlterField(
+                    model_name='genrefilmwork',
+                    name='film_work',
+                    field=models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, to='movies.filmwork'),
+                ),
+                migrations.AlterField(
+                    model_name='genrefilmwork',
+                    name='genre',
+                    field=models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, to='movies.genre'),
+                ),
+                migrations.AlterField(
+                    model_name='personfilmwork',
+                    name='film_work',
+                    field=models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, to='movies.filmwork'),
+                ),
+                migrations.AlterField(
+                    model_name='personfilmwork',
+                    name='person',
+                    field=models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, to='movies.person'),
+                ),
+            ],
+            database_operations=[
+                migrations.RunPython(drop_fk_indexes, create_fk_indexes),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name='filmwork',
+            index=models.Index(fields=['title'], name='film_work_title_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='filmwork',
+            index=models.Index(fields=['rating'], name='film_work_rating_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='filmwork',
+            index=models.Index(fields=['type', 'rating'], name='film_work_type_rating_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='filmwork',
+            index=django.contrib.postgres.indexes.BrinIndex(fields=['creation_date'], name='film_work_creation_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='genre',
+            index=models.Index(fields=['name'], name='genre_name_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='genrefilmwork',
+            index=models.Index(fields=['genre', 'film_work'], name='genre_film_work_genre_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='person',
+            index=models.Index(fields=['full_name'], name='person_full_name_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='personfilmwork',
+            index=models.Index(fields=['person', 'film_work'], name='person_film_work_person_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='personfilmwork',
+            index=models.Index(condition=models.Q(('role', 'actor'), _negated=True), fields=['role', 'person'], name='person_film_work_crew_idx'),
+        ),
+    ]
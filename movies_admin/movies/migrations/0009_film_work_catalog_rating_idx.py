@@ -0,0 +1,19 @@
+# Generated by Django 4.2.11 on 2026-10-19 09:20
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('movies', '0008_hot_path_indexes'),
+    ]
+
+    operations = [
+        # Порядок списка фильмов в API: ORDER BY rating DESC, id
+        migrations.RunSQL(
+            'CREATE INDEX IF NOT EXISTS film_work_catalog_rating_idx '
+            'ON content.film_work_catalog (rating DESC, id);',
+            'DROP INDEX IF EXISTS content.film_work_catalog_rating_idx;',
+        ),
+    ]
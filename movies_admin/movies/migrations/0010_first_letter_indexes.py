@@ -0,0 +1,22 @@
+# Generated by Django 4.2.11 on 2026-10-19 09:13
+
+from django.db import migrations, models
+import django.db.models.functions.text
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('movies', '0009_film_work_catalog_rating_idx'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='genre',
+            index=models.Index(django.db.models.functions.text.Upper(django.db.models.functions.text.Left('name', 1)), name='genre_first_letter_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='person',
+            index=models.Index(django.db.models.functions.text.Upper(django.db.models.functions.text.Left('full_name', 1)), name='person_first_letter_idx'),
+        ),
+    ]
@@ -0,0 +1,168 @@
+# Generated by Django 4.2.11 on 2026-10-19 09:15
+
+from django.db import migrations, models
+
+
+# Счётчики ведутся statement-триггерами с таблицами переходов: bulk_create
+# на тысячу связей обновляет каждый жанр/персону одним UPDATE, а не тысячей.
+# Жанр связан с фильмом не более одного раза (unique_together), поэтому для
+# него достаточно числа строк. Персона может участвовать в фильме в нескольких
+# ролях, поэтому считаем только первую/последнюю связь с фильмом.
+CREATE_TRIGGERS_SQL = """
+ALTER TABLE content.genre ALTER COLUMN film_count SET DEFAULT 0;
+ALTER TABLE content.person ALTER COLUMN film_count SET DEFAULT 0;
+
+CREATE OR REPLACE FUNCTION content.genre_film_count_trigger() RETURNS trigger
+LANGUAGE plpgsql AS $$
+BEGIN
+    IF TG_OP = 'INSERT' THEN
+        UPDATE content.genre g SET film_count = g.film_count + d.n
+        FROM (SELECT genre_id, count(*) AS n FROM new_rows GROUP BY genre_id) d
+        WHERE g.id = d.genre_id;
+    ELSIF TG_OP = 'DELETE' THEN
+        UPDATE content.genre g SET film_count = greatest(g.film_count - d.n, 0)
+        FROM (SELECT genre_id, count(*) AS n FROM old_rows GROUP BY genre_id) d
+        WHERE g.id = d.genre_id;
+    ELSE
+        UPDATE content.genre g SET film_count = greatest(g.film_count + d.n, 0)
+        FROM (
+            SELECT genre_id, sum(n) AS n FROM (
+                SELECT genre_id, count(*) AS n FROM new_rows GROUP BY genre_id
+                UNION ALL
+                SELECT genre_id, -count(*) AS n FROM old_rows GROUP BY genre_id
+            ) delta
+            GROUP BY genre_id
+            HAVING sum(n) <> 0
+        ) d
+        WHERE g.id = d.genre_id;
+    END IF;
+    RETURN NULL;
+END
+$$;
+
+CREATE OR REPLACE FUNCTION content.person_film_count_trigger() RETURNS trigger
+LANGUAGE plpgsql AS $$
+BEGIN
+    IF TG_OP = 'INSERT' THEN
+        UPDATE content.person p SET film_count = p.film_count + d.n
+        FROM (
+            SELECT pair.person_id, count(*) AS n
+            FROM (SELECT DISTINCT person_id, film_work_id FROM new_rows) pair
+            WHERE NOT EXISTS (
+                SELECT 1 FROM content.person_film_work pfw
+                WHERE pfw.person_id = pair.person_id
+                  AND pfw.film_work_id = pair.film_work_id
+                  AND pfw.id NOT IN (SELECT id FROM new_rows)
+            )
+            GROUP BY pair.person_id
+        ) d
+        WHERE p.id = d.person_id;
+    ELSIF TG_OP = 'DELETE' THEN
+        UPDATE content.person p SET film_count = greatest(p.film_count - d.n, 0)
+        FROM (
+            SELECT pair.person_id, count(*) AS n
+            FROM (SELECT DISTINCT person_id, film_work_id FROM old_rows) pair
+            WHERE NOT EXISTS (
+                SELECT 1 FROM content.person_film_work pfw
+                WHERE pfw.person_id = pair.person_id
+                  AND pfw.film_work_id = pair.film_work_id
+            )
+            GROUP BY pair.person_id
+        ) d
+        WHERE p.id = d.person_id;
+    ELSE
+        -- Перепривязка связей редка (правка инлайна), пересчитываем затронутых
+        UPDATE content.person p SET film_count = (
+            SELECT count(DISTINCT pfw.film_work_id)
+            FROM content.person_film_work pfw
+            WHERE pfw.person_id = p.id
+        )
+        WHERE p.id IN (
+            SELECT unnest(ARRAY[o.person_id, n.person_id])
+            FROM old_rows o
+            JOIN new_rows n ON n.id = o.id
+            WHERE (o.person_id, o.film_work_id) IS DISTINCT FROM (n.person_id, n.film_work_id)
+        );
+    END IF;
+    RETURN NULL;
+END
+$$;
+
+CREATE TRIGGER genre_film_count_insert
+    AFTER INSERT ON content.genre_film_work
+    REFERENCING NEW TABLE AS new_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION content.genre_film_count_trigger();
+CREATE TRIGGER genre_film_count_delete
+    AFTER DELETE ON content.genre_film_work
+    REFERENCING OLD TABLE AS old_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION content.genre_film_count_trigger();
+CREATE TRIGGER genre_film_count_update
+    AFTER UPDATE ON content.genre_film_work
+    REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION content.genre_film_count_trigger();
+
+CREATE TRIGGER person_film_count_insert
+    AFTER INSERT ON content.person_film_work
+    REFERENCING NEW TABLE AS new_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION content.person_film_count_trigger();
+CREATE TRIGGER person_film_count_delete
+    AFTER DELETE ON content.person_film_work
+    REFERENCING OLD TABLE AS old_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION content.person_film_count_trigger();
+CREATE TRIGGER person_film_count_update
+    AFTER UPDATE ON content.person_film_work
+    REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION content.person_film_count_trigger();
+"""
+
+DROP_TRIGGERS_SQL = """
+DROP TRIGGER IF EXISTS genre_film_count_insert ON content.genre_film_work;
+DROP TRIGGER IF EXISTS genre_film_count_delete ON content.genre_film_work;
+DROP TRIGGER IF EXISTS genre_film_count_update ON content.genre_film_work;
+DROP TRIGGER IF EXISTS person_film_count_insert ON content.person_film_work;
+DROP TRIGGER IF EXISTS person_film_count_delete ON content.person_film_work;
+DROP TRIGGER IF EXISTS person_film_count_update ON content.person_film_work;
+DROP FUNCTION IF EXISTS content.genre_film_count_trigger();
+DROP FUNCTION IF EXISTS content.person_film_count_trigger();
+"""
+
+# Начальное заполнение; то же делает команда repair_film_counters
+BACKFILL_SQL = """
+UPDATE content.genre g SET film_count = c.n
+FROM (SELECT genre_id, count(*) AS n FROM content.genre_film_work GROUP BY genre_id) c
+WHERE g.id = c.genre_id;
+
+UPDATE content.person p SET film_count = c.n
+FROM (
+    SELECT person_id, count(DISTINCT film_work_id) AS n
+    FROM content.person_film_work
+    GROUP BY person_id
+) c
+WHERE p.id = c.person_id;
+"""
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('movies', '0010_first_letter_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='genre',
+            name='film_count',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name='film_count'),
+        ),
+        migrations.AddField(
+            model_name='person',
+            name='film_count',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name='film_count'),
+        ),
+        migrations.RunSQL(CREATE_TRIGGERS_SQL, DROP_TRIGGERS_SQL),
+        migrations.RunSQL(BACKFILL_SQL, migrations.RunSQL.noop),
+        migrations.AddIndex(
+            model_name='person',
+            index=models.Index(fields=['film_count'], name='person_film_count_idx'),
+        ),
+    ]
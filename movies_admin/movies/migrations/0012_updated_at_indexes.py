@@ -0,0 +1,30 @@
+# Generated by Django 4.2.11 on 2026-10-19 09:18
+
+import django.contrib.postgres.indexes
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('movies', '0011_film_counters'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='filmwork',
+            index=models.Index(fields=['updated_at'], name='film_work_updated_at_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='genrefilmwork',
+            index=django.contrib.postgres.indexes.BrinIndex(fields=['created_at'], name='genre_film_work_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='person',
+            index=models.Index(fields=['updated_at'], name='person_updated_at_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='personfilmwork',
+            index=django.contrib.postgres.indexes.BrinIndex(fields=['created_at'], name='person_film_work_created_idx'),
+        ),
+    ]
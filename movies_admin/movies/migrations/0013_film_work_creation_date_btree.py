@@ -0,0 +1,21 @@
+# Generated by Django 4.2.11 on 2026-10-19 09:49
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('movies', '0012_updated_at_indexes'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='filmwork',
+            name='film_work_creation_date_idx',
+        ),
+        migrations.AddIndex(
+            model_name='filmwork',
+            index=models.Index(fields=['creation_date'], name='film_work_creation_date_idx'),
+        ),
+    ]
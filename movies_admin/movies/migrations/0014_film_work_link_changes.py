@@ -0,0 +1,75 @@
+# Generated by Django 4.2.11 on 2026-10-19 12:40
+
+from django.db import migrations
+
+
+# Удаления и перепривязки связей не оставляют временных меток в самих
+# связях, поэтому statement-триггеры записывают затронутые фильмы в
+# content.film_work_link_change: по строке на фильм с временем последнего
+# изменения. По ней инкрементальная выгрузка (postgres_to_search) находит
+# фильмы, у которых убрали жанр или персону или сменили роль. Вставки
+# видны по created_at самих связей и сюда не пишутся.
+CREATE_LINK_CHANGES_SQL = """
+CREATE TABLE content.film_work_link_change (
+    film_work_id uuid PRIMARY KEY,
+    changed_at timestamp with time zone NOT NULL
+);
+CREATE INDEX film_work_link_change_changed_at_idx ON content.film_work_link_change (changed_at);
+
+CREATE OR REPLACE FUNCTION content.film_work_link_change_trigger() RETURNS trigger
+LANGUAGE plpgsql AS $$
+BEGIN
+    IF TG_OP = 'DELETE' THEN
+        INSERT INTO content.film_work_link_change (film_work_id, changed_at)
+        SELECT DISTINCT film_work_id, now() FROM old_rows
+        ON CONFLICT (film_work_id) DO UPDATE SET changed_at = excluded.changed_at;
+    ELSE
+        INSERT INTO content.film_work_link_change (film_work_id, changed_at)
+        SELECT film_work_id, now() FROM (
+            SELECT film_work_id FROM old_rows
+            UNION
+            SELECT film_work_id FROM new_rows
+        ) changed
+        ON CONFLICT (film_work_id) DO UPDATE SET changed_at = excluded.changed_at;
+    END IF;
+    RETURN NULL;
+END
+$$;
+
+CREATE TRIGGER genre_film_work_change_delete
+    AFTER DELETE ON content.genre_film_work
+    REFERENCING OLD TABLE AS old_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION content.film_work_link_change_trigger();
+CREATE TRIGGER genre_film_work_change_update
+    AFTER UPDATE ON content.genre_film_work
+    REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION content.film_work_link_change_trigger();
+CREATE TRIGGER person_film_work_change_delete
+    AFTER DELETE ON content.person_film_work
+    REFERENCING OLD TABLE AS old_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION content.film_work_link_change_trigger();
+CREATE TRIGGER person_film_work_change_update
+    AFTER UPDATE ON content.person_film_work
+    REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION content.film_work_link_change_trigger();
+"""
+
+DROP_LINK_CHANGES_SQL = """
+DROP TRIGGER IF EXISTS genre_film_work_change_delete ON content.genre_film_work;
+DROP TRIGGER IF EXISTS genre_film_work_change_update ON content.genre_film_work;
+DROP TRIGGER IF EXISTS person_film_work_change_delete ON content.person_film_work;
+DROP TRIGGER IF EXISTS person_film_work_change_update ON content.person_film_work;
+DROP FUNCTION IF EXISTS content.film_work_link_change_trigger();
+DROP TABLE IF EXISTS content.film_work_link_change;
+"""
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('movies', '0013_film_work_creation_date_btree'),
+    ]
+
+    operations = [
+        migrations.RunSQL(CREATE_LINK_CHANGES_SQL, DROP_LINK_CHANGES_SQL),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 4.2.11 on 2026-10-19 10:21
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('movies', '0014_film_work_link_changes'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='genre',
+            index=models.Index(fields=['film_count'], name='genre_film_count_idx'),
+        ),
+    ]
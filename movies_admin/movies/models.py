@@ -1,6 +1,10 @@
 import uuid
 
+from django.contrib.postgres.fields import ArrayField
+from django.contrib.postgres.indexes import BrinIndex
 from django.db import models
+from django.db.models import Q
+from django.db.models.functions import Left, Upper
 from django.core.validators import MinValueValidator, MaxValueValidator
 from django.utils.translation import gettext_lazy as _
 
@@ -18,7 +22,25 @@ class UUIDMixin(models.Model):
     class Meta:
         abstract = True
 
-class Genre(UUIDMixin, TimeStampedMixin):
+
+class FilmCountMixin(models.Model):
+    # Число фильмов ведут триггеры на связующих таблицах (миграция 0011),
+    # поэтому оно верно и для bulk_create, каскадных удалений и load_data.py
+    film_count = models.PositiveIntegerField(_('film_count'), default=0, editable=False)
+
+    def save(self, *args, **kwargs):
+        # Не затираем счётчик значением, прочитанным до изменения связей
+        if not self._state.adding and kwargs.get('update_fields') is None:
+            kwargs['update_fields'] = [
+                field.name for field in self._meta.concrete_fields
+                if not field.primary_key and field.name != 'film_count'
+            ]
+        super().save(*args, **kwargs)
+
+    class Meta:
+        abstract = True
+
+class Genre(UUIDMixin, TimeStampedMixin, FilmCountMixin):
     name = models.CharField(_('name'), max_length=255)
     # blank=True делает поле необязательным для заполнения.
     description = models.TextField(_('description'), blank=True)
@@ -32,17 +54,31 @@ class Genre(UUIDMixin, TimeStampedMixin):
         # Следующие два поля отвечают за название модели в интерфейсе
         verbose_name = 'Жанр'
         verbose_name_plural = 'Жанры'
+        indexes = [
+            models.Index(fields=['name'], name='genre_name_idx'),
+            # Для фильтра по первой букве в админке (movies.filters)
+            models.Index(Upper(Left('name', 1)), name='genre_first_letter_idx'),
+            # Сортировка и фильтры по числу фильмов в админке
+            models.Index(fields=['film_count'], name='genre_film_count_idx'),
+        ]
 
 class GenreFilmWork(UUIDMixin):
-    film_work = models.ForeignKey('FilmWork', on_delete=models.CASCADE)
-    genre = models.ForeignKey('Genre', on_delete=models.CASCADE)
+    # Отдельные индексы по внешним ключам не нужны: film_work покрыт
+    # unique_together, genre — составным индексом ниже
+    film_work = models.ForeignKey('FilmWork', on_delete=models.CASCADE, db_index=False)
+    genre = models.ForeignKey('Genre', on_delete=models.CASCADE, db_index=False)
     created_at = models.DateTimeField(auto_now_add=True)
 
     class Meta:
         db_table = "content\".\"genre_film_work"
         unique_together = ['film_work', 'genre' ]
+        indexes = [
+            models.Index(fields=['genre', 'film_work'], name='genre_film_work_genre_idx'),
+            # Связи только добавляются и удаляются, created_at растёт с порядком вставки
+            BrinIndex(fields=['created_at'], name='genre_film_work_created_idx'),
+        ]
 
-class Person(UUIDMixin, TimeStampedMixin):
+class Person(UUIDMixin, TimeStampedMixin, FilmCountMixin):
     full_name = models.CharField(_('full_name'), max_length=255)
 
     def __str__(self):
@@ -54,16 +90,41 @@ class Person(UUIDMixin, TimeStampedMixin):
         # Следующие два поля отвечают за название модели в интерфейсе
         verbose_name = 'Актёра'
         verbose_name_plural = 'Актёрвов'
+        indexes = [
+            models.Index(fields=['full_name'], name='person_full_name_idx'),
+            models.Index(Upper(Left('full_name', 1)), name='person_first_letter_idx'),
+            # Сортировка и фильтр по числу фильмов в админке
+            models.Index(fields=['film_count'], name='person_film_count_idx'),
+            models.Index(fields=['updated_at'], name='person_updated_at_idx'),
+        ]
 
 class PersonFilmWork(UUIDMixin):
-    film_work = models.ForeignKey('FilmWork', on_delete=models.CASCADE)
-    person = models.ForeignKey('Person', on_delete=models.CASCADE)
+    class Role(models.TextChoices):
+        # Роли, которые понимают выгрузка и массовые действия админки
+        ACTOR = 'actor', _('actor')
+        DIRECTOR = 'director', _('director')
+        WRITER = 'writer', _('writer')
+
+    # Как и у GenreFilmWork, внешние ключи покрыты составными индексами
+    film_work = models.ForeignKey('FilmWork', on_delete=models.CASCADE, db_index=False)
+    person = models.ForeignKey('Person', on_delete=models.CASCADE, db_index=False)
     role = models.TextField('Role', max_length=500)
     created_at = models.DateTimeField(auto_now_add=True)
 
     class Meta:
         db_table = "content\".\"person_film_work" 
         unique_together = ['film_work', 'person', 'role']
+        indexes = [
+            models.Index(fields=['person', 'film_work'], name='person_film_work_person_idx'),
+            BrinIndex(fields=['created_at'], name='person_film_work_created_idx'),
+            # Актёров подавляющее большинство, индекс по ним бесполезен,
+            # а режиссёров и сценаристов по частичному индексу ищем быстро
+            models.Index(
+                fields=['role', 'person'],
+                name='person_film_work_crew_idx',
+                condition=~Q(role='actor'),
+            ),
+        ]
 
 class FilmWork(UUIDMixin, TimeStampedMixin):
     class Type(models.TextChoices):
@@ -96,4 +157,43 @@ class FilmWork(UUIDMixin, TimeStampedMixin):
         db_table = "content\".\"film_work"
         # Следующие два поля отвечают за название модели в интерфейсе
         verbose_name = 'Фильмы'
-        verbose_name_plural = 'Фильмы'
\ No newline at end of file
+        verbose_name_plural = 'Фильмы'
+        indexes = [
+            models.Index(fields=['title'], name='film_work_title_idx'),
+            models.Index(fields=['rating'], name='film_work_rating_idx'),
+            # Фильтр по типу в админке почти всегда идёт с сортировкой
+            models.Index(fields=['type', 'rating'], name='film_work_type_rating_idx'),
+            # B-tree, как в schema_design: даты выхода фильмов не коррелируют
+            # с порядком вставки, и BRIN планировщик на таких данных не берёт
+            models.Index(fields=['creation_date'], name='film_work_creation_date_idx'),
+            # Выборка изменённых фильмов для поискового индекса (postgres_to_search)
+            models.Index(fields=['updated_at'], name='film_work_updated_at_idx'),
+        ]
+
+class FilmWorkCatalog(models.Model):
+    """Материализованное представление: фильм с уже агрегированными жанрами и персонами"""
+    # Массивы собираются из varchar(255)-колонок genre.name и person.full_name,
+    # тип элемента должен совпадать, иначе не работают __contains и __overlap
+    id = models.UUIDField(primary_key=True)
+    title = models.TextField(_('title'))
+    description = models.TextField(_('description'))
+    creation_date = models.DateField(_('creation_date'))
+    rating = models.FloatField(_('rating'))
+    type = models.CharField(_('type'), max_length=10, choices=FilmWork.Type.choices)
+    updated_at = models.DateTimeField()
+    genres = ArrayField(models.CharField(max_length=255))
+    actors = ArrayField(models.CharField(max_length=255))
+    directors = ArrayField(models.CharField(max_length=255))
+    writers = ArrayField(models.CharField(max_length=255))
+    persons = ArrayField(models.CharField(max_length=255))
+
+    def __str__(self):
+        return self.title
+
+    class Meta:
+        # Представление создаётся миграцией через RunSQL и обновляется
+        # командой refresh_film_catalog, поэтому Django им не управляет
+        managed = False
+        db_table = "content\".\"film_work_catalog"
+        verbose_name = 'Каталог фильмов'
+        verbose_name_plural = 'Каталог фильмов'
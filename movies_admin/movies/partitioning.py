@@ -0,0 +1,188 @@
+import logging
+import time
+
+from django.db import connection, transaction
+
+from .benchmark import summarize
+
+logger = logging.getLogger(__name__)
+
+# Связующие таблицы, которые можно секционировать по хешу film_work_id.
+# Ключ секционирования обязан входить в первичный ключ и все уникальные
+# ограничения: unique_together обеих моделей уже начинается с film_work_id,
+# а первичный ключ становится (id, film_work_id).
+LINK_TABLES = ('genre_film_work', 'person_film_work')
+PARTITION_KEY = 'film_work_id'
+
+CONSTRAINTS_SQL = """
+    SELECT conname, contype, pg_get_constraintdef(oid)
+    FROM pg_constraint
+    WHERE conrelid = %s::regclass
+    ORDER BY contype DESC, conname
+"""
+
+# Индексы, не созданные ограничениями (их пересоздают сами ограничения)
+INDEXES_SQL = """
+    SELECT i.indexname, i.indexdef
+    FROM pg_indexes i
+    WHERE i.schemaname = 'content' AND i.tablename = %s
+      AND NOT EXISTS (SELECT 1 FROM pg_constraint c WHERE c.conname = i.indexname)
+"""
+
+TRIGGERS_SQL = """
+    SELECT pg_get_triggerdef(oid)
+    FROM pg_trigger
+    WHERE tgrelid = %s::regclass AND NOT tgisinternal AND tgparentid = 0
+"""
+
+# Представления, читающие таблицу (каталог film_work_catalog): их придётся
+# пересоздать, так как старую таблицу удаляем
+DEPENDENT_VIEWS_SQL = """
+    SELECT DISTINCT n.nspname, v.relname, v.relkind, pg_get_viewdef(v.oid)
+    FROM pg_depend d
+    JOIN pg_rewrite r ON r.oid = d.objid
+    JOIN pg_class v ON v.oid = r.ev_class
+    JOIN pg_namespace n ON n.oid = v.relnamespace
+    WHERE d.refobjid = ANY(%s::regclass[]) AND v.oid <> d.refobjid
+"""
+
+VIEW_INDEXES_SQL = """
+    SELECT indexdef FROM pg_indexes
+    WHERE schemaname = %s AND tablename = %s
+"""
+
+
+def qualified(table: str) -> str:
+    return f'content.{table}'
+
+
+def partition_count(cursor, table: str) -> int:
+    """Число секций таблицы, 0 — обычная таблица"""
+    cursor.execute(
+        """
+        SELECT c.relkind, (SELECT count(*) FROM pg_inherits WHERE inhparent = c.oid)
+        FROM pg_class c WHERE c.oid = %s::regclass
+        """,
+        [qualified(table)],
+    )
+    relkind, partitions = cursor.fetchone()
+    return partitions if relkind == 'p' else 0
+
+
+def _rebuild_table(cursor, table: str, partitions: int):
+    """Пересоздаёт таблицу с нужной схемой секционирования и переносит строки"""
+    name = qualified(table)
+    cursor.execute(CONSTRAINTS_SQL, [name])
+    constraints = cursor.fetchall()
+    cursor.execute(INDEXES_SQL, [table])
+    indexes = cursor.fetchall()
+    cursor.execute(TRIGGERS_SQL, [name])
+    triggers = [row[0] for row in cursor.fetchall()]
+
+    new_name = f'{name}_rebuilt'
+    partition_clause = f' PARTITION BY HASH ({PARTITION_KEY})' if partitions else ''
+    cursor.execute(f'CREATE TABLE {new_name} (LIKE {name} INCLUDING DEFAULTS){partition_clause}')
+    for remainder in range(partitions):
+        cursor.execute(
+            f'CREATE TABLE {new_name}_p{remainder} PARTITION OF {new_name} '
+            f'FOR VALUES WITH (MODULUS {partitions}, REMAINDER {remainder})'
+        )
+    # Индексы и триггеры создаём после копирования: так быстрее, и триггеры
+    # счётчиков film_count не срабатывают на перенос
+    cursor.execute(f'INSERT INTO {new_name} SELECT * FROM {name}')
+    cursor.execute(f'DROP TABLE {name}')
+    # Секции старой таблицы удаляются вместе с ней, поэтому имена _pN свободны
+    cursor.execute(f'ALTER TABLE {new_name} RENAME TO {table}')
+    for remainder in range(partitions):
+        cursor.execute(f'ALTER TABLE {new_name}_p{remainder} RENAME TO {table}_p{remainder}')
+
+    for conname, contype, definition in constraints:
+        if contype == 'p':
+            columns = f'id, {PARTITION_KEY}' if partitions else 'id'
+            definition = f'PRIMARY KEY ({columns})'
+        cursor.execute(f'ALTER TABLE {name} ADD CONSTRAINT {conname} {definition}')
+    for indexname, definition in indexes:
+        cursor.execute(definition.replace(' ON ONLY ', ' ON '))
+    for definition in triggers:
+        cursor.execute(definition)
+
+
+def partition_link_tables(partitions: int, tables=LINK_TABLES) -> list[str]:
+    """Переводит связующие таблицы на partitions секций (0 — обратно в обычные).
+
+    Таблицы блокируются на всё время переноса, запускать в окно обслуживания.
+    Возвращает список перестроенных таблиц.
+    """
+    with transaction.atomic(), connection.cursor() as cursor:
+        for table in tables:
+            cursor.execute(f'LOCK TABLE {qualified(table)} IN ACCESS EXCLUSIVE MODE')
+        tables = [table for table in tables if partition_count(cursor, table) != partitions]
+        if not tables:
+            return []
+
+        cursor.execute(DEPENDENT_VIEWS_SQL, [[qualified(table) for table in tables]])
+        views = []
+        for schema, view_name, relkind, definition in cursor.fetchall():
+            view = f'{schema}.{view_name}'
+            cursor.execute(VIEW_INDEXES_SQL, [schema, view_name])
+            views.append((view, relkind, definition, [row[0] for row in cursor.fetchall()]))
+            cursor.execute(f'DROP {"MATERIALIZED VIEW" if relkind == "m" else "VIEW"} {view}')
+
+        for table in tables:
+            started = time.perf_counter()
+            _rebuild_table(cursor, table, partitions)
+            logger.info('%s перестроена за %.1f с', table, time.perf_counter() - started)
+
+        for view, relkind, definition, view_indexes in views:
+            if relkind == 'm':
+                cursor.execute(f'CREATE MATERIALIZED VIEW {view} AS {definition.rstrip(";")} WITH DATA')
+            else:
+                cursor.execute(f'CREATE VIEW {view} AS {definition}')
+            for index in view_indexes:
+                cursor.execute(index)
+
+    with connection.cursor() as cursor:
+        for table in tables:
+            cursor.execute(f'ANALYZE {qualified(table)}')
+    return tables
+
+
+def measure_link_table(table: str, lookups: int = 200) -> dict:
+    """Задержка поиска связей по фильму и по второй стороне связи, время VACUUM
+    и размер самого большого индекса одной секции (или таблицы)"""
+    other_key, other_table = {
+        'genre_film_work': ('genre_id', 'genre'),
+        'person_film_work': ('person_id', 'person'),
+    }[table]
+    name = qualified(table)
+    results = {}
+    with connection.cursor() as cursor:
+        for key, source in ((PARTITION_KEY, 'film_work'), (other_key, other_table)):
+            cursor.execute(f'SELECT id FROM content.{source} ORDER BY random() LIMIT %s', [lookups])
+            ids = [row[0] for row in cursor.fetchall()]
+            samples = []
+            for value in ids:
+                started = time.perf_counter()
+                cursor.execute(f'SELECT {PARTITION_KEY}, {other_key} FROM {name} WHERE {key} = %s', [value])
+                cursor.fetchall()
+                samples.append(time.perf_counter() - started)
+            results[f'by_{key}'] = summarize(samples)
+
+        # Первый VACUUM после переноса данных заполняет карту видимости всей
+        # таблицы; замеряем повторный, как у работающей базы
+        cursor.execute(f'VACUUM {name}')
+        started = time.perf_counter()
+        cursor.execute(f'VACUUM (ANALYZE) {name}')
+        results['vacuum_ms'] = (time.perf_counter() - started) * 1000
+
+        cursor.execute(
+            """
+            SELECT max(pg_relation_size(i.indexrelid))
+            FROM pg_index i
+            WHERE i.indrelid = %s::regclass
+               OR i.indrelid IN (SELECT relid FROM pg_partition_tree(%s::regclass) WHERE isleaf)
+            """,
+            [name, name],
+        )
+        results['largest_index_mb'] = cursor.fetchone()[0] / 1024 / 1024
+    return results
@@ -0,0 +1,77 @@
+import datetime
+import json
+import uuid
+
+from django.db import connection, transaction
+
+from .filters import first_letter
+from .models import FilmWork, Genre, GenreFilmWork, Person, PersonFilmWork
+
+# Таблицы не больше стольких страниц планировщик честно читает целиком:
+# это дешевле любого индекса (справочник жанров занимает пару страниц)
+SMALL_TABLE_PAGES = 16
+
+
+def admin_queries() -> dict:
+    """Запросы, которые админка выполняет при сортировке, фильтрации и на инлайнах"""
+    some_id = uuid.uuid4()
+    page = slice(0, 100)
+    return {
+        'FilmWork: сортировка по названию': FilmWork.objects.order_by('title')[page],
+        'FilmWork: сортировка по рейтингу': FilmWork.objects.order_by('-rating')[page],
+        'FilmWork: фильтр по типу + рейтинг': FilmWork.objects.filter(
+            type=FilmWork.Type.TV_SHOW,
+        ).order_by('-rating')[page],
+        'FilmWork: диапазон дат создания': FilmWork.objects.filter(
+            creation_date__range=(datetime.date(2000, 1, 1), datetime.date(2000, 12, 31)),
+        ),
+        'Person: сортировка по имени': Person.objects.order_by('full_name')[page],
+        'Person: фильтр по первой букве': Person.objects.alias(
+            first_letter=first_letter('full_name'),
+        ).filter(first_letter='А'),
+        'Person: без фильмов': Person.objects.filter(film_count=0),
+        'Person: сортировка по числу фильмов': Person.objects.order_by('-film_count')[page],
+        'Genre: сортировка по названию': Genre.objects.order_by('name')[page],
+        'Genre: фильтр по первой букве': Genre.objects.alias(
+            first_letter=first_letter('name'),
+        ).filter(first_letter='А'),
+        'GenreFilmWork: инлайн фильма': GenreFilmWork.objects.filter(film_work_id=some_id),
+        'GenreFilmWork: фильмы жанра': GenreFilmWork.objects.filter(genre_id=some_id),
+        'PersonFilmWork: инлайн фильма': PersonFilmWork.objects.filter(film_work_id=some_id),
+        'PersonFilmWork: фильмы персоны': PersonFilmWork.objects.filter(person_id=some_id),
+        'PersonFilmWork: режиссёры': PersonFilmWork.objects.filter(role='director', person_id=some_id),
+    }
+
+
+def seq_scans(plan: dict) -> list[str]:
+    """Таблицы, которые план читает последовательным сканированием"""
+    found = []
+    if plan.get('Node Type') == 'Seq Scan':
+        found.append(plan['Relation Name'])
+    for child in plan.get('Plans', []):
+        found += seq_scans(child)
+    return found
+
+
+def large_seq_scans(queryset, force_index: bool = False) -> list[str]:
+    """Таблицы больше SMALL_TABLE_PAGES, которые план запроса читает целиком.
+
+    По умолчанию проверяется выбор планировщика на текущих данных и
+    статистике, поэтому база должна быть наполнена (seed_catalog) и
+    проанализирована. С force_index seq scan запрещён: остаётся только
+    там, где подходящего индекса нет вовсе.
+    """
+    with transaction.atomic(), connection.cursor() as cursor:
+        if force_index:
+            cursor.execute('SET LOCAL enable_seqscan = off')
+        plan = json.loads(queryset.explain(format='json'))[0]['Plan']
+        tables = seq_scans(plan)
+        if not tables or force_index:
+            return tables
+        cursor.execute(
+            "SELECT relname FROM pg_class WHERE relnamespace = 'content'::regnamespace "
+            'AND relname = ANY(%s) AND relpages > %s',
+            [tables, SMALL_TABLE_PAGES],
+        )
+        large = {row[0] for row in cursor.fetchall()}
+    return [table for table in tables if table in large]
@@ -0,0 +1,38 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .cache import invalidate_films
+from .models import FilmWork, Genre, GenreFilmWork, Person, PersonFilmWork
+
+# Удаление жанра или персоны отдельно не обрабатываем: связи удаляются
+# каскадно, и на каждую из них срабатывает post_delete связующей модели.
+
+
+@receiver([post_save, post_delete], sender=FilmWork)
+def invalidate_film_work(sender, instance, **kwargs):
+    invalidate_films([instance.pk])
+
+
+@receiver([post_save, post_delete], sender=GenreFilmWork)
+@receiver([post_save, post_delete], sender=PersonFilmWork)
+def invalidate_film_work_link(sender, instance, **kwargs):
+    invalidate_films([instance.film_work_id])
+
+
+@receiver(post_save, sender=Genre)
+def invalidate_genre_films(sender, instance, created, **kwargs):
+    if created:
+        return
+    invalidate_films(
+        GenreFilmWork.objects.filter(genre_id=instance.pk).values_list('film_work_id', flat=True)
+    )
+
+
+@receiver(post_save, sender=Person)
+def invalidate_person_films(sender, instance, created, **kwargs):
+    # Переименование персоны меняет документы всех фильмов с её участием
+    if created:
+        return
+    invalidate_films(
+        PersonFilmWork.objects.filter(person_id=instance.pk).values_list('film_work_id', flat=True)
+    )
@@ -0,0 +1,175 @@
+import json
+import os
+import re
+import statistics
+import subprocess
+import sys
+import time
+
+from django.apps import apps
+from django.conf import settings
+
+# Запускается в отдельном интерпретаторе с -X importtime: этапы старта
+# проекта и время каждого компонента настроек django-split-settings.
+# Компоненты исполняются через exec, а не import, поэтому в отчёт
+# importtime не попадают и замеряются обёрткой над include. Модули,
+# которые Django грузит через importlib.import_module (настройки, приложения,
+# модели, admin, URLconf), importtime тоже не видит: обёртка отмечает
+# их начало и конец в stderr, а parse_importtime досчитывает их время.
+PROFILE_SCRIPT = """
+import json, sys, time
+started = time.perf_counter()
+phases, components = {}, {}
+
+import importlib, importlib.util
+original_import_module = importlib.import_module
+
+def import_module(name, package=None):
+    name = importlib.util.resolve_name(name, package)
+    if name in sys.modules:
+        return original_import_module(name)
+    print(f'import time: dynamic begin {name}', file=sys.stderr, flush=True)
+    mark = time.perf_counter_ns()
+    try:
+        module = original_import_module(name)
+    except ImportError:
+        # Django пробует имена вроде movies.apps.MoviesConfig как модули
+        print(f'import time: dynamic failed {name}', file=sys.stderr, flush=True)
+        raise
+    elapsed = (time.perf_counter_ns() - mark) // 1000
+    print(f'import time: dynamic end {name} {elapsed}', file=sys.stderr, flush=True)
+    return module
+
+importlib.import_module = import_module
+
+import split_settings.tools
+original_include = split_settings.tools.include
+
+def include(*args, scope=None):
+    scope = scope or sys._getframe(1).f_globals
+    for conf_file in args:
+        mark = time.perf_counter()
+        original_include(conf_file, scope=scope)
+        components[str(conf_file)] = time.perf_counter() - mark
+
+split_settings.tools.include = include
+
+def phase(name, mark):
+    phases[name] = time.perf_counter() - mark
+    return time.perf_counter()
+
+import django
+mark = phase('django', started)
+from django.conf import settings
+settings.INSTALLED_APPS
+mark = phase('settings', mark)
+django.setup(set_prefix=False)
+mark = phase('apps', mark)
+from django.urls import get_resolver
+get_resolver().url_patterns
+mark = phase('urls', mark)
+from django.core.handlers.asgi import ASGIHandler
+ASGIHandler()
+phase('middleware', mark)
+print(json.dumps({'phases': phases, 'components': components}))
+"""
+
+IMPORTTIME_LINE = re.compile(r'^import time:\s+(\d+) \|\s+(\d+) \| (\s*)(\S+)$')
+DYNAMIC_BEGIN = re.compile(r'^import time: dynamic begin (\S+)$')
+DYNAMIC_FAILED = re.compile(r'^import time: dynamic failed (\S+)$')
+DYNAMIC_END = re.compile(r'^import time: dynamic end (\S+) (\d+)$')
+
+
+def parse_importtime(output: str) -> dict[str, tuple[float, float]]:
+    """Модули из вывода -X importtime: (собственное время, с вложенными), секунды"""
+    modules = {}
+    # Открытые динамические импорты: [модуль, вложенные статические импорты
+    # (глубина, мкс), вложенные динамические импорты, мкс]
+    dynamic = []
+    for line in output.splitlines():
+        if match := DYNAMIC_BEGIN.match(line):
+            dynamic.append([match.group(1), [], 0])
+        elif DYNAMIC_FAILED.match(line):
+            dynamic.pop()
+        elif match := DYNAMIC_END.match(line):
+            module, imports, nested = dynamic.pop()
+            cumulative = int(match.group(2))
+            # Глубина importtime не сбрасывается внутри динамического импорта:
+            # прямые вложенные импорты — самые мелкие строки внутри него
+            if imports:
+                top = min(depth for depth, _time in imports)
+                nested += sum(time for depth, time in imports if depth == top)
+            modules[module] = ((cumulative - nested) / 1e6, cumulative / 1e6)
+            if dynamic:
+                dynamic[-1][2] += cumulative
+        elif match := IMPORTTIME_LINE.match(line):
+            own, cumulative, indent, module = match.groups()
+            modules[module] = (int(own) / 1e6, int(cumulative) / 1e6)
+            if dynamic:
+                dynamic[-1][1].append((len(indent) // 2, int(cumulative)))
+    return modules
+
+
+def module_group(module: str, app_names: list[str]) -> str:
+    """Приложение, которому принадлежит модуль, иначе его корневой пакет"""
+    for name in app_names:
+        if module == name or module.startswith(f'{name}.'):
+            return name
+    return module.partition('.')[0]
+
+
+def run_once() -> dict:
+    """Один холодный старт проекта в отдельном процессе"""
+    env = {**os.environ, 'DJANGO_SETTINGS_MODULE': os.environ.get('DJANGO_SETTINGS_MODULE', 'config.settings')}
+    started = time.perf_counter()
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', PROFILE_SCRIPT],
+        cwd=settings.BASE_DIR, env=env, capture_output=True, text=True, check=True,
+    )
+    total = time.perf_counter() - started
+    profile = json.loads(result.stdout.strip().splitlines()[-1])
+    profile['total'] = total
+    profile['modules'] = parse_importtime(result.stderr)
+    return profile
+
+
+def profile_startup(runs: int = 5, warmup: int = 1) -> dict:
+    """Медианы по runs холодным стартам: этапы, компоненты настроек,
+    приложения и пакеты, отдельные модули. Времена в секундах."""
+    for _ in range(warmup):
+        # Первый запуск компилирует .pyc и прогревает файловый кеш
+        run_once()
+    profiles = [run_once() for _ in range(runs)]
+
+    def median(values) -> float:
+        values = list(values)
+        # Модуль мог импортироваться не в каждом запуске — считаем как ноль
+        return statistics.median(values + [0.0] * (len(profiles) - len(values)))
+
+    app_names = sorted((config.name for config in apps.get_app_configs()), key=len, reverse=True)
+    module_names = {module for profile in profiles for module in profile['modules']}
+    modules = {
+        module: {
+            'self': median(p['modules'][module][0] for p in profiles if module in p['modules']),
+            'cumulative': median(p['modules'][module][1] for p in profiles if module in p['modules']),
+        }
+        for module in module_names
+    }
+    groups = {}
+    for profile in profiles:
+        totals = {}
+        for module, (own, _cumulative) in profile['modules'].items():
+            group = module_group(module, app_names)
+            totals[group] = totals.get(group, 0.0) + own
+        for group, value in totals.items():
+            groups.setdefault(group, []).append(value)
+
+    return {
+        'total': median(p['total'] for p in profiles),
+        'phases': {name: median(p['phases'][name] for p in profiles) for name in profiles[0]['phases']},
+        'components': {
+            name: median(p['components'][name] for p in profiles) for name in profiles[0]['components']
+        },
+        'groups': {group: median(values) for group, values in groups.items()},
+        'modules': modules,
+    }
@@ -0,0 +1,93 @@
+import datetime
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+
+from movies.models import FilmWork, Genre, GenreFilmWork, Person, PersonFilmWork
+
+CHANGELIST = '/admin/movies/filmwork/'
+
+
+class FilmWorkActionTests(TestCase):
+    """Массовые действия над фильмами: один запрос и честный отчёт"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = get_user_model().objects.create_superuser('review', 'review@example.com', 'review')
+        cls.films = [
+            FilmWork.objects.create(title=f'Фильм {number}', creation_date=datetime.date(2000, 1, 1), rating=50)
+            for number in range(4)
+        ]
+        cls.genre = Genre.objects.create(name='Драма')
+        cls.person = Person.objects.create(full_name='Анна Смирнова')
+        GenreFilmWork.objects.create(film_work=cls.films[0], genre=cls.genre)
+        PersonFilmWork.objects.create(film_work=cls.films[0], person=cls.person, role='actor')
+
+    def setUp(self):
+        self.client.force_login(self.user)
+        patcher = mock.patch('movies.admin.invalidate_films')
+        self.invalidate_films = patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def run_action(self, action: str, films: list | None, **params) -> list[str]:
+        """Выполняет действие над films; None означает «выбрать все»"""
+        data = {'action': action, 'index': 0, **params}
+        if films is None:
+            data.update(select_across=1, _selected_action=[str(self.films[0].pk)])
+        else:
+            data['_selected_action'] = [str(film.pk) for film in films]
+        response = self.client.post(CHANGELIST, data, follow=True)
+        self.assertEqual(response.status_code, 200)
+        return [str(message) for message in response.context['messages']]
+
+    def invalidated(self) -> set:
+        self.invalidate_films.assert_called_once()
+        return set(self.invalidate_films.call_args.args[0])
+
+    def test_attach_genre_counts_inserted_rows(self):
+        messages = self.run_action('attach_genre', self.films[:3], genre=self.genre.pk)
+        self.assertEqual(messages, ['Жанр «Драма» добавлен фильмам: 2'])
+        self.assertEqual(self.invalidated(), {film.pk for film in self.films[1:3]})
+        self.assertEqual(GenreFilmWork.objects.filter(genre=self.genre).count(), 3)
+        self.genre.refresh_from_db()
+        self.assertEqual(self.genre.film_count, 3)
+
+    def test_attach_genre_select_across(self):
+        with CaptureQueriesContext(connection) as queries:
+            messages = self.run_action('attach_genre', None, genre=self.genre.pk)
+        self.assertEqual(messages, ['Жанр «Драма» добавлен фильмам: 3'])
+        self.assertEqual(GenreFilmWork.objects.filter(genre=self.genre).count(), 4)
+        # id фильмов не выбираются отдельно: подзапрос внутри INSERT
+        inserts = [query['sql'] for query in queries if query['sql'].startswith('INSERT INTO "content"."genre_film_work"')]
+        self.assertEqual(len(inserts), 1)
+        self.assertIn('SELECT', inserts[0])
+
+    def test_detach_genre(self):
+        messages = self.run_action('detach_genre', self.films[:2], genre=self.genre.pk)
+        self.assertEqual(messages, ['Жанр «Драма» убран у фильмов: 1'])
+        self.assertEqual(self.invalidated(), {self.films[0].pk})
+        self.assertFalse(GenreFilmWork.objects.filter(genre=self.genre).exists())
+
+    def test_attach_person(self):
+        messages = self.run_action('attach_person', self.films[:2], person=self.person.pk, role='actor')
+        self.assertEqual(messages, ['Анна Смирнова добавлен(а) с ролью actor фильмам: 1'])
+        self.assertEqual(self.invalidated(), {self.films[1].pk})
+        # Та же персона в другой роли — отдельная связь
+        messages = self.run_action('attach_person', self.films[:1], person=self.person.pk, role='director')
+        self.assertEqual(messages, ['Анна Смирнова добавлен(а) с ролью director фильмам: 1'])
+        self.assertEqual(PersonFilmWork.objects.filter(person=self.person).count(), 3)
+
+    def test_attach_person_rejects_unknown_role(self):
+        # Форму действия проверяет ещё changelist, до вызова действия
+        messages = self.run_action('attach_person', self.films[:2], person=self.person.pk, role='Actor ')
+        self.assertEqual(messages, ['Действие не выбрано.'])
+        self.invalidate_films.assert_not_called()
+        self.assertEqual(PersonFilmWork.objects.count(), 1)
+
+    def test_missing_params(self):
+        messages = self.run_action('attach_person', self.films[:2], person=self.person.pk)
+        self.assertEqual(messages, ['Заполните: Роль'])
+        self.assertEqual(PersonFilmWork.objects.count(), 1)
@@ -0,0 +1,93 @@
+import datetime
+
+from django.core.cache import caches
+from django.test import TestCase
+
+from movies.cache import CacheStats, film_cache_key, get_film_document
+from movies.models import FilmWork, Genre, GenreFilmWork, Person, PersonFilmWork
+
+
+class FilmCacheInvalidationTests(TestCase):
+    """Сигналы сбрасывают закэшированный документ фильма после коммита"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.film = FilmWork.objects.create(title='Первый', creation_date=datetime.date(2000, 1, 1), rating=50)
+        cls.genre = Genre.objects.create(name='Нуар')
+        cls.person = Person.objects.create(full_name='Иван Петров')
+        cls.genre_link = GenreFilmWork.objects.create(film_work=cls.film, genre=cls.genre)
+        cls.person_link = PersonFilmWork.objects.create(film_work=cls.film, person=cls.person, role='actor')
+
+    def setUp(self):
+        self.cache = caches['films']
+        self.cache.clear()
+        get_film_document(self.film.pk)
+        self.assertIsNotNone(self.cached())
+
+    def cached(self):
+        return self.cache.get(film_cache_key(self.film.pk))
+
+    def assert_evicted(self, change):
+        with self.captureOnCommitCallbacks(execute=True):
+            change()
+        self.assertIsNone(self.cached())
+
+    def test_film_edit(self):
+        self.film.title = 'Первый (режиссёрская версия)'
+        self.assert_evicted(self.film.save)
+        self.assertEqual(get_film_document(self.film.pk)['title'], 'Первый (режиссёрская версия)')
+
+    def test_link_added(self):
+        other = Genre.objects.create(name='Драма')
+        self.assert_evicted(lambda: GenreFilmWork.objects.create(film_work=self.film, genre=other))
+
+    def test_link_removed(self):
+        self.assert_evicted(self.person_link.delete)
+
+    def test_genre_rename(self):
+        self.genre.name = 'Неонуар'
+        self.assert_evicted(self.genre.save)
+        self.assertEqual([genre['name'] for genre in get_film_document(self.film.pk)['genres']], ['Неонуар'])
+
+    def test_person_rename(self):
+        self.person.full_name = 'Иван Сидоров'
+        self.assert_evicted(self.person.save)
+
+    def test_uncommitted_change_keeps_document(self):
+        # Сброс откладывается до коммита: без него документ остаётся
+        self.film.title = 'Черновик'
+        self.film.save()
+        self.assertIsNotNone(self.cached())
+
+    def test_unrelated_film_is_kept(self):
+        other = FilmWork.objects.create(title='Второй', creation_date=datetime.date(2001, 1, 1), rating=10)
+        with self.captureOnCommitCallbacks(execute=True):
+            other.save()
+        self.assertIsNotNone(self.cached())
+
+
+class CacheStatsTests(TestCase):
+    """Счётчики попаданий общие для процессов через кэш фильмов"""
+
+    def setUp(self):
+        caches['films'].clear()
+
+    def test_workers_share_counters(self):
+        # Два экземпляра — как два воркера со своей памятью и общим кэшем
+        first, second = CacheStats(), CacheStats()
+        first.hit()
+        first.hit()
+        second.miss()
+        # Накопленное воркер отдаёт пачкой или при чтении своих метрик
+        second.flush()
+        self.assertEqual((first.hits, first.misses), (2, 1))
+        self.assertEqual((second.hits, second.misses), (2, 1))
+        self.assertAlmostEqual(second.hit_ratio, 2 / 3)
+
+    def test_events_are_flushed_in_batches(self):
+        stats = CacheStats()
+        for _ in range(CacheStats.FLUSH_EVERY - 1):
+            stats.hit()
+        self.assertIsNone(caches['films'].get(CacheStats.HITS_KEY))
+        stats.hit()
+        self.assertEqual(caches['films'].get(CacheStats.HITS_KEY), CacheStats.FLUSH_EVERY)
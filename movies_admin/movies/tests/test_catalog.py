@@ -0,0 +1,43 @@
+import datetime
+
+from django.db import connection
+
+from movies.catalog import refresh_film_catalog
+from movies.models import FilmWork, FilmWorkCatalog, Person, PersonFilmWork
+from movies.partitioning import partition_link_tables
+from movies.tests.utils import ContentTransactionTestCase
+
+
+class PartitionedCatalogTests(ContentTransactionTestCase):
+    """Каталог замечает правки связей и после секционирования связующих таблиц.
+
+    Транзакционный тест: статистика pg_stat_user_tables, по которой
+    refresh_film_catalog решает, обновляться ли, видна только после коммита.
+    """
+
+    def setUp(self):
+        partition_link_tables(4)
+        self.addCleanup(partition_link_tables, 0)
+        film = FilmWork.objects.create(title='Первый', creation_date=datetime.date(2000, 1, 1), rating=50)
+        person = Person.objects.create(full_name='Иван Петров')
+        self.role = PersonFilmWork.objects.create(film_work=film, person=person, role='actor')
+        self.flush_stats()
+        refresh_film_catalog(force=True)
+        self.film = film
+
+    @staticmethod
+    def flush_stats():
+        # Счётчики сессии уходят в общую статистику не чаще раза в секунду
+        with connection.cursor() as cursor:
+            cursor.execute('SELECT pg_stat_force_next_flush()')
+
+    def test_role_change_refreshes_catalog(self):
+        PersonFilmWork.objects.filter(pk=self.role.pk).update(role='director')
+        self.flush_stats()
+        self.assertTrue(refresh_film_catalog())
+        catalog = FilmWorkCatalog.objects.get(pk=self.film.pk)
+        self.assertEqual((catalog.actors, catalog.directors), ([], ['Иван Петров']))
+
+    def test_unchanged_tables_skip_refresh(self):
+        self.flush_stats()
+        self.assertFalse(refresh_film_catalog())
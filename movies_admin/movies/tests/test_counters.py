@@ -0,0 +1,113 @@
+import datetime
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import TestCase
+
+from movies.counters import repair_film_counters
+from movies.models import FilmWork, Genre, GenreFilmWork, Person, PersonFilmWork
+
+
+class FilmCounterTests(TestCase):
+    """film_count жанров и персон ведут statement-триггеры миграции 0011"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.first, cls.second = (
+            FilmWork.objects.create(title=title, creation_date=datetime.date(2000, 1, 1), rating=50)
+            for title in ('Первый', 'Второй')
+        )
+        cls.genre = Genre.objects.create(name='Нуар')
+        cls.other_genre = Genre.objects.create(name='Драма')
+        cls.person = Person.objects.create(full_name='Иван Петров')
+
+    def counts(self) -> tuple[int, int, int]:
+        return tuple(
+            model.objects.get(pk=obj.pk).film_count
+            for model, obj in ((Genre, self.genre), (Genre, self.other_genre), (Person, self.person))
+        )
+
+    def test_insert_and_delete(self):
+        GenreFilmWork.objects.create(film_work=self.first, genre=self.genre)
+        link = PersonFilmWork.objects.create(film_work=self.first, person=self.person, role='actor')
+        self.assertEqual(self.counts(), (1, 0, 1))
+        link.delete()
+        self.assertEqual(self.counts(), (1, 0, 0))
+
+    def test_person_in_two_roles_counts_film_once(self):
+        actor = PersonFilmWork.objects.create(film_work=self.first, person=self.person, role='actor')
+        PersonFilmWork.objects.create(film_work=self.first, person=self.person, role='director')
+        self.assertEqual(self.counts()[2], 1)
+        # Одна из ролей осталась: фильм по-прежнему в счёте
+        actor.delete()
+        self.assertEqual(self.counts()[2], 1)
+        PersonFilmWork.objects.filter(person=self.person).delete()
+        self.assertEqual(self.counts()[2], 0)
+
+    def test_two_roles_in_one_statement(self):
+        PersonFilmWork.objects.bulk_create([
+            PersonFilmWork(film_work=self.first, person=self.person, role=role)
+            for role in ('actor', 'director', 'writer')
+        ] + [PersonFilmWork(film_work=self.second, person=self.person, role='actor')])
+        self.assertEqual(self.counts()[2], 2)
+
+    def test_bulk_create_ignore_conflicts_counts_inserted_rows(self):
+        GenreFilmWork.objects.create(film_work=self.first, genre=self.genre)
+        PersonFilmWork.objects.create(film_work=self.first, person=self.person, role='actor')
+        GenreFilmWork.objects.bulk_create([
+            GenreFilmWork(film_work=film, genre=self.genre) for film in (self.first, self.second)
+        ], ignore_conflicts=True)
+        PersonFilmWork.objects.bulk_create([
+            PersonFilmWork(film_work=self.first, person=self.person, role='actor'),
+            PersonFilmWork(film_work=self.first, person=self.person, role='writer'),
+        ], ignore_conflicts=True)
+        self.assertEqual(self.counts(), (2, 0, 1))
+
+    def test_cascade_delete(self):
+        for film in (self.first, self.second):
+            GenreFilmWork.objects.create(film_work=film, genre=self.genre)
+            PersonFilmWork.objects.create(film_work=film, person=self.person, role='actor')
+        self.first.delete()
+        self.assertEqual(self.counts(), (1, 0, 1))
+
+    def test_link_moved_to_another_film(self):
+        genre_link = GenreFilmWork.objects.create(film_work=self.first, genre=self.genre)
+        PersonFilmWork.objects.create(film_work=self.first, person=self.person, role='actor')
+        director = PersonFilmWork.objects.create(film_work=self.second, person=self.person, role='director')
+        self.assertEqual(self.counts(), (1, 0, 2))
+
+        GenreFilmWork.objects.filter(pk=genre_link.pk).update(film_work=self.second)
+        # Режиссёр переехал в фильм, где персона уже играет: фильм у неё один
+        PersonFilmWork.objects.filter(pk=director.pk).update(film_work=self.first)
+        self.assertEqual(self.counts(), (1, 0, 1))
+
+    def test_link_moved_to_another_genre(self):
+        link = GenreFilmWork.objects.create(film_work=self.first, genre=self.genre)
+        GenreFilmWork.objects.filter(pk=link.pk).update(genre=self.other_genre)
+        self.assertEqual(self.counts()[:2], (0, 1))
+
+    def test_rename_keeps_counter(self):
+        # Экземпляр прочитан до того, как у жанра и персоны появились фильмы
+        genre, person = Genre.objects.get(pk=self.genre.pk), Person.objects.get(pk=self.person.pk)
+        GenreFilmWork.objects.create(film_work=self.first, genre=self.genre)
+        PersonFilmWork.objects.create(film_work=self.first, person=self.person, role='actor')
+        genre.name = 'Неонуар'
+        genre.save()
+        person.full_name = 'Иван Сидоров'
+        person.save()
+        self.assertEqual(self.counts(), (1, 0, 1))
+        self.assertEqual(Genre.objects.get(pk=self.genre.pk).name, 'Неонуар')
+
+    def test_repair(self):
+        GenreFilmWork.objects.create(film_work=self.first, genre=self.genre)
+        PersonFilmWork.objects.create(film_work=self.first, person=self.person, role='actor')
+        PersonFilmWork.objects.create(film_work=self.first, person=self.person, role='writer')
+        Genre.objects.update(film_count=7)
+        Person.objects.update(film_count=0)
+
+        self.assertEqual(repair_film_counters(), {'genre': 2, 'person': 1})
+        self.assertEqual(self.counts(), (1, 0, 1))
+        # Повторный запуск ничего не меняет
+        out = StringIO()
+        call_command('repair_film_counters', stdout=out)
+        self.assertIn('genre: исправлено строк 0', out.getvalue())
@@ -0,0 +1,84 @@
+import csv
+import datetime
+import io
+import json
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+
+from movies.models import FilmWork, Genre, GenreFilmWork, Person, PersonFilmWork
+
+
+class ExportTests(TestCase):
+    """Потоковая выгрузка каталога в CSV и NDJSON под WSGI и ASGI"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = get_user_model().objects.create_superuser('review', 'review@example.com', 'review')
+        cls.film = FilmWork.objects.create(
+            title='Первый', description='Описание', creation_date=datetime.date(2000, 1, 1), rating=75,
+        )
+        FilmWork.objects.create(title='Второй', creation_date=datetime.date(2001, 1, 1), rating=50)
+        for name in ('Нуар', 'Драма'):
+            GenreFilmWork.objects.create(film_work=cls.film, genre=Genre.objects.create(name=name))
+        for full_name, role in (('Иван Петров', 'actor'), ('Анна Смирнова', 'actor'), ('Пётр Иванов', 'director')):
+            PersonFilmWork.objects.create(
+                film_work=cls.film, person=Person.objects.create(full_name=full_name), role=role,
+            )
+
+    def setUp(self):
+        self.client.force_login(self.user)
+        self.async_client.force_login(self.user)
+
+    def assert_headers(self, response, content_type: str, extension: str):
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Content-Type'], content_type)
+        self.assertEqual(response['Content-Disposition'], f'attachment; filename="films.{extension}"')
+
+    def test_csv(self):
+        response = self.client.get('/api/v1/films/export/?format=csv')
+        self.assert_headers(response, 'text/csv; charset=utf-8', 'csv')
+        rows = {row['title']: row for row in csv.DictReader(io.StringIO(response.getvalue().decode()))}
+        self.assertEqual(set(rows), {'Первый', 'Второй'})
+        self.assertEqual(rows['Первый']['genres'], 'Драма; Нуар')
+        self.assertEqual(rows['Первый']['actors'], 'Анна Смирнова; Иван Петров')
+        self.assertEqual(rows['Первый']['directors'], 'Пётр Иванов')
+        self.assertEqual(rows['Второй']['writers'], '')
+
+    def test_ndjson(self):
+        response = self.client.get('/api/v1/films/export/?format=ndjson')
+        self.assert_headers(response, 'application/x-ndjson', 'ndjson')
+        rows = {row['title']: row for row in map(json.loads, response.getvalue().decode().splitlines())}
+        self.assertEqual(rows['Первый']['id'], str(self.film.pk))
+        self.assertEqual(rows['Первый']['creation_date'], '2000-01-01')
+        self.assertEqual(rows['Первый']['genres'], ['Драма', 'Нуар'])
+        self.assertEqual(rows['Второй']['actors'], [])
+
+    def test_unknown_format(self):
+        self.assertEqual(self.client.get('/api/v1/films/export/?format=xml').status_code, 400)
+
+    def test_requires_staff(self):
+        self.client.logout()
+        self.assertEqual(self.client.get('/api/v1/films/export/').status_code, 302)
+
+    @mock.patch('movies.export.ROWS_PER_WRITE', 1)
+    async def test_asgi_streams_chunk_by_chunk(self):
+        # Под ASGI ответ должен быть асинхронным итератором: иначе Django
+        # соберёт всю выгрузку в память до отправки первого байта
+        response = await self.async_client.get('/api/v1/films/export/?format=ndjson')
+        self.assert_headers(response, 'application/x-ndjson', 'ndjson')
+        self.assertTrue(response.is_async)
+        chunks = [chunk async for chunk in response.streaming_content]
+        self.assertEqual(len(chunks), 2)
+        self.assertEqual({json.loads(chunk)['title'] for chunk in chunks}, {'Первый', 'Второй'})
+
+    def test_admin_action(self):
+        response = self.client.post('/admin/movies/filmwork/', {
+            'action': 'export_csv',
+            '_selected_action': [self.film.pk],
+        })
+        self.assert_headers(response, 'text/csv; charset=utf-8', 'csv')
+        lines = response.getvalue().decode().splitlines()
+        self.assertEqual(len(lines), 2)
+        self.assertIn('Первый', lines[1])
@@ -0,0 +1,79 @@
+import datetime
+
+from django.core.cache import caches
+from django.test import TestCase
+
+from movies.models import FilmWork, Genre, GenreFilmWork, Person, PersonFilmWork
+
+
+def create_film(title: str, year: int, rating: float, film_type=FilmWork.Type.MOVIE, genres=(), persons=()):
+    film = FilmWork.objects.create(
+        title=title, creation_date=datetime.date(year, 6, 1), rating=rating, type=film_type,
+    )
+    for genre in genres:
+        GenreFilmWork.objects.create(film_work=film, genre=genre)
+    for person in persons:
+        PersonFilmWork.objects.create(film_work=film, person=person, role='actor')
+    return film
+
+
+class FacetsTests(TestCase):
+    """Счётчики фасетов учитывают фильтры и сбрасываются после записи"""
+
+    @classmethod
+    def setUpTestData(cls):
+        drama, noir = Genre.objects.create(name='Драма'), Genre.objects.create(name='Нуар')
+        actor = Person.objects.create(full_name='Иван Петров')
+        create_film('Первый', 2000, 15, genres=[drama, noir], persons=[actor])
+        create_film('Второй', 2000, 55, genres=[drama])
+        create_film('Третий', 2001, 95, FilmWork.Type.TV_SHOW, genres=[noir], persons=[actor])
+
+    def setUp(self):
+        caches['films'].clear()
+
+    def facets(self, query: str = '') -> dict:
+        response = self.client.get(f'/api/v1/films/facets/?{query}')
+        self.assertEqual(response.status_code, 200)
+        result = response.json()
+        return {
+            'total': result['total'],
+            **{name: {item['value']: item['count'] for item in values} for name, values in result['facets'].items()},
+        }
+
+    def test_unfiltered(self):
+        facets = self.facets()
+        self.assertEqual(facets['total'], 3)
+        self.assertEqual(facets['genre'], {'Драма': 2, 'Нуар': 2})
+        self.assertEqual(facets['type'], {'movie': 2, 'tv_show': 1})
+        self.assertEqual(facets['year'], {'2000': 2, '2001': 1})
+        self.assertEqual(facets['rating'], {'10': 1, '50': 1, '90': 1})
+
+    def test_filters_are_combined(self):
+        cases = {
+            'genre=Нуар': (2, {'Драма': 1, 'Нуар': 2}),
+            'genre=Нуар&genre=Драма': (1, {'Драма': 1, 'Нуар': 1}),
+            'type=movie&year=2000': (2, {'Драма': 2, 'Нуар': 1}),
+            'person=Иван Петров&year=2001': (1, {'Нуар': 1}),
+            'year=1999': (0, {}),
+        }
+        for query, (total, genres) in cases.items():
+            with self.subTest(query):
+                facets = self.facets(query)
+                self.assertEqual((facets['total'], facets['genre']), (total, genres))
+
+    def test_invalid_filters_are_bad_request(self):
+        for query in ('year=0', 'year=99999999999', 'year=-1', 'year=²', 'year=дважды', 'type=cartoon'):
+            with self.subTest(query):
+                self.assertEqual(self.client.get(f'/api/v1/films/facets/?{query}').status_code, 400)
+
+    def test_write_invalidates_cached_facets(self):
+        self.assertEqual(self.facets()['total'], 3)
+        # update() сигналов не шлёт: в кэше остаются прежние фасеты
+        FilmWork.objects.filter(title='Второй').update(type=FilmWork.Type.TV_SHOW)
+        self.assertEqual(self.facets()['type'], {'movie': 2, 'tv_show': 1})
+
+        with self.captureOnCommitCallbacks(execute=True):
+            create_film('Четвёртый', 2002, 70)
+        facets = self.facets()
+        self.assertEqual(facets['total'], 4)
+        self.assertEqual(facets['type'], {'movie': 2, 'tv_show': 2})
@@ -0,0 +1,94 @@
+import datetime
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+
+from movies.admin import GenreFilmWorkInline
+from movies.models import FilmWork, Genre, GenreFilmWork
+
+PREFIX = 'genrefilmwork_set'
+PAGE_PARAM = f'{PREFIX}-page'
+
+
+@mock.patch.object(GenreFilmWorkInline, 'per_page', 2)
+class PaginatedInlineTests(TestCase):
+    """Инлайн связей показывает и сохраняет одну страницу"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = get_user_model().objects.create_superuser('review', 'review@example.com', 'review')
+        cls.film = FilmWork.objects.create(title='Фильм', creation_date=datetime.date(2000, 1, 1), rating=50)
+        cls.genres = [Genre.objects.create(name=f'G{number:02}') for number in range(5)]
+        for genre in cls.genres:
+            GenreFilmWork.objects.create(film_work=cls.film, genre=genre)
+        cls.url = f'/admin/movies/filmwork/{cls.film.pk}/change/'
+
+    def setUp(self):
+        self.client.force_login(self.user)
+
+    def open_page(self, page: int):
+        response = self.client.get(self.url, {PAGE_PARAM: page})
+        self.assertEqual(response.status_code, 200)
+        return response.context['inline_admin_formsets'][0].formset
+
+    def post_data(self, formset, **changes) -> dict:
+        """Данные отправки формы фильма с показанной страницей жанров.
+
+        changes: номер формы на странице → новый жанр.
+        """
+        data = {
+            'title': self.film.title, 'description': '', 'creation_date': '2000-01-01',
+            'rating': '50', 'type': 'movie',
+            f'{PREFIX}-TOTAL_FORMS': len(formset.initial_forms),
+            f'{PREFIX}-INITIAL_FORMS': len(formset.initial_forms),
+            f'{PREFIX}-MIN_NUM_FORMS': 0, f'{PREFIX}-MAX_NUM_FORMS': 1000,
+            'personfilmwork_set-TOTAL_FORMS': 0, 'personfilmwork_set-INITIAL_FORMS': 0,
+            'personfilmwork_set-MIN_NUM_FORMS': 0, 'personfilmwork_set-MAX_NUM_FORMS': 1000,
+        }
+        for i, form in enumerate(formset.initial_forms):
+            data[f'{PREFIX}-{i}-id'] = form.instance.pk
+            data[f'{PREFIX}-{i}-film_work'] = self.film.pk
+            data[f'{PREFIX}-{i}-genre'] = changes.get(f'form{i}', form.instance.genre).pk
+        return data
+
+    def test_pages(self):
+        formset = self.open_page(2)
+        self.assertEqual([form.instance.genre.name for form in formset.initial_forms], ['G02', 'G03'])
+        self.assertEqual([number for number, _ in formset.page_links], [1, 2, 3])
+        self.assertIn(f'{PAGE_PARAM}=3', dict(formset.page_links)[3])
+        self.assertEqual([form.instance.genre.name for form in self.open_page(3).initial_forms], ['G04'])
+
+    def test_saves_only_changed_rows(self):
+        formset = self.open_page(2)
+        new_genre = Genre.objects.create(name='G99')
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.post(
+                f'{self.url}?{PAGE_PARAM}=2', self.post_data(formset, form1=new_genre),
+            )
+        self.assertEqual(response.status_code, 302)
+        self.assertEqual(
+            sorted(self.film.genres.values_list('name', flat=True)), ['G00', 'G01', 'G02', 'G04', 'G99'],
+        )
+        links = [query['sql'] for query in queries if '"content"."genre_film_work"' in query['sql']]
+        self.assertEqual(len([sql for sql in links if sql.startswith('UPDATE')]), 1)
+        # unique_together проверяется только у изменённой формы
+        self.assertEqual(len([sql for sql in links if 'LIMIT 1' in sql]), 1)
+
+    def test_shifted_page_is_rejected(self):
+        formset = self.open_page(2)
+        new_genre = Genre.objects.create(name='G99')
+        # Пока форма открыта, кто-то убрал связь с первой страницы:
+        # G02 переехал на первую страницу, на второй теперь G03 и G04
+        GenreFilmWork.objects.filter(genre=self.genres[0]).delete()
+        response = self.client.post(
+            f'{self.url}?{PAGE_PARAM}=2', self.post_data(formset, form0=new_genre),
+        )
+        self.assertEqual(response.status_code, 200)
+        formset = response.context['inline_admin_formsets'][0].formset
+        self.assertEqual([error.code for error in formset.non_form_errors().as_data()], ['stale_page'])
+        self.assertEqual(
+            sorted(self.film.genres.values_list('name', flat=True)), ['G01', 'G02', 'G03', 'G04'],
+        )
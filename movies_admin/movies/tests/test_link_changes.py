@@ -0,0 +1,34 @@
+import datetime
+
+from django.db import connection
+from django.test import TestCase
+
+from movies.models import FilmWork, Genre, GenreFilmWork, Person, PersonFilmWork
+
+
+class LinkChangeTests(TestCase):
+    """Удаления и правки связей попадают в film_work_link_change для выгрузки"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.film, cls.other_film = (
+            FilmWork.objects.create(title=title, creation_date=datetime.date(2000, 1, 1), rating=50)
+            for title in ('Первый', 'Второй')
+        )
+        genre = Genre.objects.create(name='Нуар')
+        person = Person.objects.create(full_name='Иван Петров')
+        GenreFilmWork.objects.create(film_work=cls.film, genre=genre)
+        cls.role = PersonFilmWork.objects.create(film_work=cls.other_film, person=person, role='actor')
+
+    def changed_films(self) -> set:
+        with connection.cursor() as cursor:
+            cursor.execute('SELECT film_work_id FROM content.film_work_link_change')
+            return {row[0] for row in cursor.fetchall()}
+
+    def test_insert_is_not_recorded(self):
+        self.assertEqual(self.changed_films(), set())
+
+    def test_delete_and_update_are_recorded(self):
+        GenreFilmWork.objects.filter(film_work=self.film).delete()
+        PersonFilmWork.objects.filter(pk=self.role.pk).update(role='director')
+        self.assertEqual(self.changed_films(), {self.film.pk, self.other_film.pk})
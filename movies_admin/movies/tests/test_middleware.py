@@ -0,0 +1,21 @@
+import uuid
+
+from django.test import TestCase, override_settings
+
+
+@override_settings(SQL_INSTRUMENTATION_SAMPLE_RATE=1.0, SQL_EXPLAIN_SLOW_QUERIES=False)
+class QueryInstrumentationTests(TestCase):
+    """Server-Timing учитывает запросы из всех потоков, а не только из потока запроса"""
+
+    async def test_async_view_counts_queries_from_worker_threads(self):
+        # Детальная карточка читает фильм, жанры и персоны тремя параллельными
+        # запросами, два из них — в потоках sync_to_async(thread_sensitive=False)
+        with self.assertLogs('movies.sql', 'INFO'):
+            response = await self.async_client.get(f'/api/v1/films/{uuid.uuid4()}/')
+        self.assertEqual(response.status_code, 404)
+        self.assertIn('desc="3 queries"', response['Server-Timing'])
+
+    def test_sync_request_counts_queries(self):
+        with self.assertLogs('movies.sql', 'INFO'):
+            response = self.client.get(f'/api/v1/films/{uuid.uuid4()}/')
+        self.assertIn('desc="3 queries"', response['Server-Timing'])
@@ -0,0 +1,122 @@
+import datetime
+from contextlib import ExitStack
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.cache import caches
+from django.db import DEFAULT_DB_ALIAS, connections, router as db_router, transaction
+from django.test import TestCase, override_settings
+
+from movies.catalog import refresh_film_catalog
+from movies.db import router
+from movies.db.pool import close_pools
+from movies.models import FilmWork, Genre
+from movies.tests.utils import ContentTransactionTestCase
+
+REPLICA = 'replica_1'
+
+
+class WriteTrackingTests(TestCase):
+    """Cookie read-your-writes ставится только после настоящей записи"""
+
+    def setUp(self):
+        tokens = router.begin_request(pinned=False)
+        self.addCleanup(router.end_request, tokens)
+
+    def test_routing_and_atomic_reads_are_not_writes(self):
+        # Так админка открывает форму изменения на GET
+        with transaction.atomic(using=db_router.db_for_write(Genre)):
+            list(Genre.objects.all())
+        self.assertFalse(router.wrote())
+
+    def test_insert_is_write(self):
+        Genre.objects.create(name='Нуар')
+        self.assertTrue(router.wrote())
+
+    def test_no_cookie_without_replicas(self):
+        user = get_user_model().objects.create_superuser('review', 'review@example.com', 'review')
+        self.client.force_login(user)
+        response = self.client.post('/admin/movies/genre/add/', {'name': 'Нуар'})
+        self.assertEqual(response.status_code, 302)
+        self.assertNotIn('db_pinned', response.cookies)
+
+
+@override_settings(SQL_INSTRUMENTATION_SAMPLE_RATE=0)
+class ReplicaRoutingTests(ContentTransactionTestCase):
+    """Чтения идут на реплику, запись закрепляет клиента за основной базой.
+
+    Реплика — второе подключение к той же тестовой базе только для чтения,
+    как с DB_REPLICAS; данные коммитятся, иначе второе
+    подключение их не увидит.
+    """
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        primary = connections[DEFAULT_DB_ALIAS].settings_dict
+        replica = {
+            **primary,
+            'OPTIONS': {
+                **primary['OPTIONS'],
+                'options': primary['OPTIONS']['options'] + ' -c default_transaction_read_only=on',
+            },
+            'TEST': {**primary['TEST'], 'MIRROR': DEFAULT_DB_ALIAS},
+        }
+        connections.settings[REPLICA] = replica
+        cls.enterClassContext(mock.patch.object(router, 'replica_aliases', return_value=[REPLICA]))
+        cls.addClassCleanup(cls.remove_replica)
+
+    @classmethod
+    def remove_replica(cls):
+        connections[REPLICA].close()
+        close_pools(REPLICA)
+        del connections[REPLICA]
+        del connections.settings[REPLICA]
+
+    def setUp(self):
+        caches['films'].clear()
+        FilmWork.objects.create(title='Первый', creation_date=datetime.date(2000, 1, 1), rating=50)
+        refresh_film_catalog(force=True)
+        user = get_user_model().objects.create_superuser('review', 'review@example.com', 'review')
+        self.client.force_login(user)
+
+    def queries_by_alias(self, request) -> dict:
+        """Число запросов к каждой базе, выполненных в этом потоке за request()"""
+        counts = {DEFAULT_DB_ALIAS: 0, REPLICA: 0}
+
+        def counter(alias):
+            def wrapper(execute, sql, params, many, context):
+                counts[alias] += 1
+                return execute(sql, params, many, context)
+            return wrapper
+
+        with ExitStack() as stack:
+            for alias in counts:
+                stack.enter_context(connections[alias].execute_wrapper(counter(alias)))
+            response = request()
+        return response, counts
+
+    def test_reads_go_to_replica(self):
+        response, counts = self.queries_by_alias(lambda: self.client.get('/api/v1/films/'))
+        self.assertEqual(response.status_code, 200)
+        self.assertGreater(counts[REPLICA], 0)
+        self.assertNotIn('db_pinned', response.cookies)
+
+    def test_write_pins_client_to_primary(self):
+        response = self.client.post('/admin/movies/genre/add/', {'name': 'Нуар'})
+        self.assertEqual(response.status_code, 302)
+        self.assertIn('db_pinned', response.cookies)
+
+        # Тестовый клиент возвращает полученную cookie в следующих запросах
+        response, counts = self.queries_by_alias(lambda: self.client.get('/api/v1/films/'))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(counts[REPLICA], 0)
+        self.assertGreater(counts[DEFAULT_DB_ALIAS], 0)
+
+    def test_read_only_endpoints_do_not_pin(self):
+        film_id = FilmWork.objects.get().pk
+        for path in ('/api/v1/films/', '/api/v1/films/facets/', f'/api/v1/films/{film_id}/'):
+            with self.subTest(path):
+                response = self.client.get(path)
+                self.assertEqual(response.status_code, 200)
+                self.assertNotIn('db_pinned', response.cookies)
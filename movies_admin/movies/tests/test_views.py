@@ -0,0 +1,45 @@
+import datetime
+
+from django.test import TestCase
+
+from movies.catalog import refresh_film_catalog
+from movies.models import FilmWork
+from movies.views import FILM_LIST_MAX_PAGE_SIZE
+
+
+class FilmListTests(TestCase):
+    """Постраничный список каталога"""
+
+    @classmethod
+    def setUpTestData(cls):
+        for number in range(3):
+            FilmWork.objects.create(
+                title=f'Фильм {number}', creation_date=datetime.date(2000, 1, 1), rating=number * 10,
+            )
+        refresh_film_catalog(force=True, concurrently=False)
+
+    def get(self, query: str) -> dict:
+        response = self.client.get(f'/api/v1/films/?{query}')
+        self.assertEqual(response.status_code, 200)
+        return response.json()
+
+    def test_pages(self):
+        first = self.get('page_size=2')
+        self.assertEqual([film['title'] for film in first['results']], ['Фильм 2', 'Фильм 1'])
+        self.assertEqual(first['next'], 2)
+        last = self.get('page_size=2&page=2')
+        self.assertEqual([film['title'] for film in last['results']], ['Фильм 0'])
+        self.assertIsNone(last['next'])
+
+    def test_page_size_is_clamped(self):
+        for page_size, expected in (('-5', 1), ('0', 1), ('1000', FILM_LIST_MAX_PAGE_SIZE)):
+            with self.subTest(page_size=page_size):
+                films = self.get(f'page_size={page_size}')
+                self.assertEqual(len(films['results']), min(expected, 3))
+                self.assertEqual(films['next'], 2 if expected < 3 else None)
+
+    def test_page_below_one_is_first_page(self):
+        self.assertEqual(self.get('page=-3&page_size=1')['page'], 1)
+
+    def test_non_numeric_is_bad_request(self):
+        self.assertEqual(self.client.get('/api/v1/films/?page_size=много').status_code, 400)
@@ -0,0 +1,18 @@
+from django.db import connection
+from django.test import TransactionTestCase
+
+
+class ContentTransactionTestCase(TransactionTestCase):
+    """TransactionTestCase, который после теста очищает и схему content.
+
+    flush её таблиц не видит: db_table моделей записан как content"."x, а
+    интроспекция возвращает имена без схемы.
+    """
+
+    def _fixture_teardown(self):
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT format('%I.%I', schemaname, tablename) FROM pg_tables WHERE schemaname = 'content'")
+            tables = [row[0] for row in cursor.fetchall()]
+            cursor.execute(f'TRUNCATE {", ".join(tables)} CASCADE')
+            cursor.execute('REFRESH MATERIALIZED VIEW content.film_work_catalog')
+        super()._fixture_teardown()
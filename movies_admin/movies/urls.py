@@ -0,0 +1,13 @@
+from django.urls import path
+
+from . import views
+
+app_name = 'movies'
+
+urlpatterns = [
+    path('api/v1/films/', views.film_list, name='film-list'),
+    path('api/v1/films/export/', views.film_export, name='film-export'),
+    path('api/v1/films/facets/', views.film_facets, name='film-facets'),
+    path('api/v1/films/<uuid:pk>/', views.film_detail, name='film-detail'),
+    path('metrics/', views.metrics, name='metrics'),
+]
@@ -0,0 +1,97 @@
+from asgiref.sync import sync_to_async
+from django.contrib.admin.views.decorators import staff_member_required
+from django.http import (
+    Http404, HttpResponse, HttpResponseBadRequest, HttpResponseNotAllowed, JsonResponse,
+)
+from django.views.decorators.http import require_GET
+
+from .cache import aget_film_document
+from .models import FilmWork, FilmWorkCatalog
+
+FILM_LIST_PAGE_SIZE = 50
+FILM_LIST_MAX_PAGE_SIZE = 100
+FILM_LIST_FIELDS = (
+    'id', 'title', 'creation_date', 'rating', 'type',
+    'genres', 'actors', 'directors', 'writers',
+)
+
+# Представления каталога асинхронные: под ASGI медленный запрос к базе
+# не занимает поток воркера. Декораторы вроде require_GET в Django 4.2
+# не поддерживают корутины, поэтому метод проверяем вручную.
+#
+# Выгрузка, фасеты и метрики импортируются внутри представлений: они
+# нужны не каждому воркеру, а старт процесса (manage.py startup_profile)
+# не должен расти с каждой новой возможностью.
+
+
+async def film_list(request):
+    """Страница каталога из материализованного представления"""
+    if request.method != 'GET':
+        return HttpResponseNotAllowed(['GET'])
+    try:
+        page = max(int(request.GET.get('page', 1)), 1)
+        page_size = int(request.GET.get('page_size', FILM_LIST_PAGE_SIZE))
+    except ValueError:
+        return HttpResponseBadRequest('page и page_size должны быть числами')
+    # Как и page, размер страницы приводим к допустимому диапазону
+    page_size = min(max(page_size, 1), FILM_LIST_MAX_PAGE_SIZE)
+
+    queryset = FilmWorkCatalog.objects.order_by('-rating', 'id')
+    if genre := request.GET.get('genre'):
+        queryset = queryset.filter(genres__contains=[genre])
+    if person := request.GET.get('person'):
+        queryset = queryset.filter(persons__contains=[person])
+    if film_type := request.GET.get('type'):
+        queryset = queryset.filter(type=film_type)
+
+    # Берём на одну запись больше, чтобы узнать о следующей странице без COUNT(*)
+    offset = (page - 1) * page_size
+    films = [
+        film async for film in queryset.values(*FILM_LIST_FIELDS)[offset:offset + page_size + 1]
+    ]
+    return JsonResponse({
+        'page': page,
+        'next': page + 1 if len(films) > page_size else None,
+        'results': films[:page_size],
+    })
+
+
+async def film_facets(request):
+    """Число фильмов по жанрам, типам, годам и корзинам рейтинга для набора фильтров"""
+    if request.method != 'GET':
+        return HttpResponseNotAllowed(['GET'])
+    from .facets import get_facets, normalize_filters
+
+    try:
+        filters = normalize_filters(request.GET)
+    except ValueError as error:
+        return HttpResponseBadRequest(str(error))
+    return JsonResponse(await sync_to_async(get_facets)(filters))
+
+
+async def film_detail(request, pk):
+    if request.method != 'GET':
+        return HttpResponseNotAllowed(['GET'])
+    document = await aget_film_document(pk)
+    if document is None:
+        raise Http404
+    return JsonResponse(document)
+
+
+@require_GET
+@staff_member_required
+def film_export(request):
+    """Потоковая выгрузка всего каталога: ?format=csv или ?format=ndjson"""
+    from .export import WRITERS, stream_export
+
+    export_format = request.GET.get('format', 'ndjson')
+    if export_format not in WRITERS:
+        return HttpResponseBadRequest(f'Неизвестный формат: {export_format}')
+    return stream_export(request, FilmWork.objects.all(), export_format)
+
+
+@require_GET
+def metrics(request):
+    from .metrics import render_metrics
+
+    return HttpResponse(render_metrics(), content_type='text/plain; version=0.0.4')
@@ -0,0 +1,210 @@
+import argparse
+import json
+import logging
+import os
+from collections.abc import Generator
+from contextlib import closing
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Optional
+
+import psycopg2
+from dotenv import load_dotenv
+from psycopg2.extras import DictCursor
+
+from models import FilmDocument, GenreRef, PersonRef
+
+logging.basicConfig(level=logging.INFO)
+
+load_dotenv()
+
+BATCH_SIZE = int(os.environ.get('EXPORT_BATCH_SIZE', 500))
+EXPORT_DIR = os.environ.get('EXPORT_DIR', 'export')
+STATE_FILE = os.environ.get('EXPORT_STATE_FILE', 'state.json')
+INDEX_NAME = os.environ.get('SEARCH_INDEX', 'movies')
+# Транзакция, начатая до прошлого запуска, может закоммитить строку с
+# updated_at меньше водяной отметки. Перечитываем окно с запасом:
+# повторная выгрузка документа безопасна, это upsert по id.
+SAFETY_LAG = timedelta(seconds=int(os.environ.get('EXPORT_SAFETY_LAG', 300)))
+
+ROLE_FIELDS = {
+    'actor': 'actors',
+    'director': 'directors',
+    'writer': 'writers',
+}
+
+# Фильм попадает в выгрузку, если изменился он сам, его жанр или персона
+# (переименование затрагивает все фильмы с её участием), к нему добавили
+# связь (created_at связи) либо связь удалили или изменили (роль, жанр):
+# такие фильмы триггеры связей пишут в film_work_link_change.
+CHANGED_FILMS_SQL = """
+    SELECT id FROM content.film_work
+    WHERE updated_at > %(since)s AND updated_at <= %(until)s
+    UNION
+    SELECT pfw.film_work_id
+    FROM content.person p
+    JOIN content.person_film_work pfw ON pfw.person_id = p.id
+    WHERE p.updated_at > %(since)s AND p.updated_at <= %(until)s
+    UNION
+    SELECT gfw.film_work_id
+    FROM content.genre g
+    JOIN content.genre_film_work gfw ON gfw.genre_id = g.id
+    WHERE g.updated_at > %(since)s AND g.updated_at <= %(until)s
+    UNION
+    SELECT film_work_id FROM content.person_film_work
+    WHERE created_at > %(since)s AND created_at <= %(until)s
+    UNION
+    SELECT film_work_id FROM content.genre_film_work
+    WHERE created_at > %(since)s AND created_at <= %(until)s
+    UNION
+    SELECT film_work_id FROM content.film_work_link_change
+    WHERE changed_at > %(since)s AND changed_at <= %(until)s
+"""
+
+# Документы батча собираются одним запросом: жанры и персоны каждого
+# фильма агрегируются коррелированными подзапросами по индексам связей
+FILM_DOCUMENTS_SQL = """
+    SELECT
+        fw.id, fw.title, fw.type, fw.description, fw.creation_date, fw.rating,
+        COALESCE((
+            SELECT json_agg(json_build_object('id', g.id, 'name', g.name) ORDER BY g.name)
+            FROM content.genre_film_work gfw
+            JOIN content.genre g ON g.id = gfw.genre_id
+            WHERE gfw.film_work_id = fw.id
+        ), '[]') AS genres,
+        COALESCE((
+            SELECT json_agg(
+                json_build_object('id', p.id, 'full_name', p.full_name, 'role', pfw.role)
+                ORDER BY pfw.role, p.full_name
+            )
+            FROM content.person_film_work pfw
+            JOIN content.person p ON p.id = pfw.person_id
+            WHERE pfw.film_work_id = fw.id
+        ), '[]') AS persons
+    FROM content.film_work fw
+    WHERE fw.id = ANY(%s::uuid[])
+"""
+
+
+class JsonFileState:
+    """Водяная отметка выгрузки в JSON-файле"""
+
+    def __init__(self, path: str):
+        self.path = Path(path)
+
+    def get_watermark(self) -> Optional[datetime]:
+        if not self.path.exists():
+            return None
+        state = json.loads(self.path.read_text())
+        return datetime.fromisoformat(state['watermark'])
+
+    def set_watermark(self, watermark: datetime):
+        tmp_path = self.path.with_suffix('.tmp')
+        tmp_path.write_text(json.dumps({'watermark': watermark.isoformat()}))
+        # Замена атомарна: при сбое остаётся прежняя отметка
+        os.replace(tmp_path, self.path)
+
+
+class PostgresExtractor:
+    def __init__(self, connection: psycopg2.extensions.connection):
+        self.conn = connection
+
+    def current_time(self) -> datetime:
+        with self.conn.cursor() as cursor:
+            cursor.execute('SELECT now()')
+            return cursor.fetchone()[0]
+
+    def changed_film_ids(self, since: datetime, until: datetime) -> Generator[list, None, None]:
+        """Идентификаторы изменённых фильмов батчами (серверный курсор)"""
+        with self.conn.cursor(name='changed_films') as cursor:
+            cursor.itersize = BATCH_SIZE
+            cursor.execute(CHANGED_FILMS_SQL, {'since': since, 'until': until})
+            while rows := cursor.fetchmany(BATCH_SIZE):
+                yield [row[0] for row in rows]
+
+    def build_documents(self, film_ids: list) -> list[FilmDocument]:
+        with self.conn.cursor() as cursor:
+            cursor.execute(FILM_DOCUMENTS_SQL, [film_ids])
+            rows = cursor.fetchall()
+
+        documents = []
+        for row in rows:
+            document = FilmDocument(
+                id=row['id'], title=row['title'], type=row['type'],
+                description=row['description'], creation_date=row['creation_date'],
+                rating=row['rating'],
+                genres=[GenreRef(**genre) for genre in row['genres']],
+            )
+            for person in row['persons']:
+                role_field = ROLE_FIELDS.get(person.pop('role'))
+                if role_field is not None:
+                    getattr(document, role_field).append(PersonRef(**person))
+            documents.append(document)
+        return documents
+
+
+class NDJSONFileSink:
+    """Пишет батчи в файлы формата bulk API поискового движка.
+
+    Локальная замена отправки в движок: каждый файл можно передать
+    в _bulk как есть.
+    """
+
+    def __init__(self, directory: str, index: str = INDEX_NAME):
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.index = index
+
+    def write_batch(self, run_id: str, batch_no: int, documents: list[FilmDocument]) -> Path:
+        path = self.directory / f'{self.index}_{run_id}_{batch_no:05d}.ndjson'
+        tmp_path = path.with_suffix('.tmp')
+        with open(tmp_path, 'w', encoding='utf-8') as file:
+            for document in documents:
+                file.write(json.dumps({'index': {'_index': self.index, '_id': str(document.id)}}) + '\n')
+                file.write(json.dumps(document.to_dict(), ensure_ascii=False, default=str) + '\n')
+        os.replace(tmp_path, path)
+        return path
+
+
+def export_changes(pg_conn: psycopg2.extensions.connection, sink: NDJSONFileSink,
+                   state: JsonFileState, full: bool = False) -> int:
+    """Выгружает фильмы, изменённые с прошлого запуска, возвращает их число"""
+    extractor = PostgresExtractor(pg_conn)
+    watermark = None if full else state.get_watermark()
+    since = watermark - SAFETY_LAG if watermark else datetime.min.replace(tzinfo=timezone.utc)
+    until = extractor.current_time()
+    run_id = until.strftime('%Y%m%dT%H%M%S%f')
+    logging.info(f'Выгружаем изменения с {since.isoformat()} по {until.isoformat()}')
+
+    exported = 0
+    for batch_no, film_ids in enumerate(extractor.changed_film_ids(since, until), start=1):
+        documents = extractor.build_documents(film_ids)
+        path = sink.write_batch(run_id, batch_no, documents)
+        exported += len(documents)
+        logging.info(f'Батч #{batch_no}: {len(documents)} документов -> {path}')
+
+    # Отметку сдвигаем только после записи всех батчей: при сбое следующий
+    # запуск повторит выгрузку целиком
+    state.set_watermark(until)
+    logging.info(f'Выгружено документов: {exported}')
+    return exported
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Инкрементальная выгрузка фильмов для поискового индекса')
+    parser.add_argument('--full', action='store_true', help='Игнорировать водяную отметку и выгрузить всё')
+    args = parser.parse_args()
+
+    dsl = {
+        'dbname': os.environ.get('DB_NAME'),
+        'user': os.environ.get('DB_USER'),
+        'password': os.environ.get('DB_PASSWORD'),
+        'host': os.environ.get('DB_HOST', '127.0.0.1'),
+        'port': os.environ.get('DB_PORT', 5432)
+    }
+
+    with closing(psycopg2.connect(**dsl, cursor_factory=DictCursor)) as pg_conn:
+        # Весь запуск читает один снимок базы
+        pg_conn.set_session(isolation_level='REPEATABLE READ', readonly=True)
+        with pg_conn:
+            export_changes(pg_conn, NDJSONFileSink(EXPORT_DIR), JsonFileState(STATE_FILE), full=args.full)
@@ -0,0 +1,39 @@
+from dataclasses import asdict, dataclass, field
+from datetime import date
+from typing import Optional
+from uuid import UUID
+
+
+@dataclass
+class GenreRef:
+    id: UUID
+    name: str
+
+
+@dataclass
+class PersonRef:
+    id: UUID
+    full_name: str
+
+
+@dataclass
+class FilmDocument:
+    """Денормализованный документ фильма для поискового индекса"""
+    id: UUID
+    title: str
+    type: str
+    description: Optional[str] = None
+    creation_date: Optional[date] = None
+    rating: Optional[float] = None
+    genres: list[GenreRef] = field(default_factory=list)
+    actors: list[PersonRef] = field(default_factory=list)
+    directors: list[PersonRef] = field(default_factory=list)
+    writers: list[PersonRef] = field(default_factory=list)
+
+    def to_dict(self) -> dict:
+        document = asdict(self)
+        # Плоские списки имён нужны для полнотекстового поиска
+        document['genre_names'] = [genre.name for genre in self.genres]
+        for role in ('actors', 'directors', 'writers'):
+            document[f'{role}_names'] = [person.full_name for person in getattr(self, role)]
+        return document
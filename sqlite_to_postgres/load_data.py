@@ -1,6 +1,11 @@
 import sqlite3
 import psycopg2
 import os
+import argparse
+import math
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
 from psycopg2.extras import DictCursor
 from collections.abc import Generator
 from dataclasses import dataclass
@@ -18,6 +23,34 @@ logging.basicConfig(level=logging.INFO)
 load_dotenv()
 
 BATCH_SIZE = 4
+# Записей в одном диапазоне параллельной проверки
+VERIFY_RANGE_SIZE = 10000
+
+SQLITE_PATH = 'db.sqlite'
+
+# Соответствие таблиц SQLite и PostgreSQL
+TABLE_MAP = {
+    'genre': 'content.genre',
+    'film_work': 'content.film_work',
+    'person': 'content.person',
+    'genre_film_work': 'content.genre_film_work',
+    'person_film_work': 'content.person_film_work'
+}
+
+# Связи вставляются с ON CONFLICT по id, как и остальные таблицы. У
+# секционированных связующих таблиц (partition_link_tables) уникален только
+# (id, film_work_id): ключ секционирования входит в первичный ключ. Поэтому
+# цель конфликта {id_key} подставляет PostgresSaver по схеме таблицы;
+# film_work_id при этом совпадает, и строка не переезжает в другую секцию.
+LINK_ID_KEYS = {
+    False: 'id',
+    True: 'id, film_work_id',
+}
+
+PARTITIONED_TABLES_SQL = """
+    SELECT relname FROM pg_class
+    WHERE relnamespace = 'content'::regnamespace AND relkind = 'p'
+"""
 
 SQL_INSERT_MAP = {
     FilmWork: """
@@ -48,7 +81,7 @@ SQL_INSERT_MAP = {
     GenreFilmWork: """
         INSERT INTO content.genre_film_work (id, film_work_id, genre_id, created_at)
         VALUES (%s, %s, %s, %s)
-        ON CONFLICT (id) DO UPDATE SET
+        ON CONFLICT ({id_key}) DO UPDATE SET
             film_work_id = EXCLUDED.film_work_id,
             genre_id = EXCLUDED.genre_id
     """,
@@ -64,7 +97,7 @@ SQL_INSERT_MAP = {
     PersonFilmWork: """
         INSERT INTO content.person_film_work (id, film_work_id, person_id, role, created_at)
         VALUES (%s, %s, %s, %s, %s)
-        ON CONFLICT (id) DO UPDATE SET
+        ON CONFLICT ({id_key}) DO UPDATE SET
             film_work_id = EXCLUDED.film_work_id,
             person_id = EXCLUDED.person_id,
             role = EXCLUDED.role
@@ -118,219 +151,524 @@ class SQLiteLoader:
             objects_batch = [data_class(**dict(row)) for row in batch]
             yield objects_batch
 
+@dataclass
+class ThrottleLimits:
+    """Пределы щадящего режима загрузки; None — без ограничения"""
+    rows_per_second: Optional[float] = None
+    bytes_per_second: Optional[float] = None
+    # Отставание реплик (replay_lag), сек: выше половины — замедляемся,
+    # выше предела — ждём, пока реплики не догонят
+    max_replication_lag: float = 10.0
+    # Время COMMIT, сек: рост говорит о перегрузке диска или синхронных реплик
+    max_commit_latency: float = 0.5
+    health_check_interval: float = 5.0
+    pause_seconds: float = 5.0
+    # Ниже этой доли от полной скорости не замедляемся, только останавливаемся
+    min_speed: float = 0.05
+
+
+@dataclass
+class BatchStats:
+    """Что стоило базе сохранение батча"""
+    rows: int
+    bytes: int
+    seconds: float
+    commit_seconds: float
+
+
+REPLICATION_LAG_SQL = """
+    SELECT COALESCE(max(EXTRACT(epoch FROM replay_lag)), 0) FROM pg_stat_replication
+"""
+
+
+class Throttle:
+    """Ограничивает скорость загрузки и замедляет её по сигналам базы.
+
+    Скорость — доля от предельной (или от естественной, если пределы не
+    заданы): при долгом COMMIT или растущем отставании реплик она
+    уменьшается вдвое, при здоровой базе — плавно растёт обратно.
+    """
+
+    def __init__(self, connection: psycopg2.extensions.connection, limits: ThrottleLimits):
+        self.conn = connection
+        self.limits = limits
+        self.speed = 1.0
+        self.replication_lag = 0.0
+        self._last_check = 0.0
+
+    def check_replication_lag(self) -> float:
+        # Без роли pg_monitor чужие строки pg_stat_replication пусты, тогда
+        # отставание считается нулевым и работает только контроль COMMIT
+        with self.conn.cursor() as cursor:
+            cursor.execute(REPLICATION_LAG_SQL)
+            self.replication_lag = float(cursor.fetchone()[0])
+        self.conn.rollback()
+        self._last_check = time.monotonic()
+        return self.replication_lag
+
+    def wait_for_replicas(self):
+        """Останавливает загрузку, пока отставание реплик выше предела"""
+        limit = self.limits.max_replication_lag
+        while self.check_replication_lag() > limit:
+            logging.warning(
+                f'Отставание реплик {self.replication_lag:.1f} с выше {limit:.1f} с, '
+                f'пауза {self.limits.pause_seconds:.0f} с'
+            )
+            time.sleep(self.limits.pause_seconds)
+            # Продолжаем, только когда реплики почти догнали, иначе пауза
+            # снова наступит после первого же батча
+            limit = self.limits.max_replication_lag / 2
+
+    def after_batch(self, stats: BatchStats):
+        if time.monotonic() - self._last_check >= self.limits.health_check_interval:
+            self.wait_for_replicas()
+
+        overloaded = (
+            stats.commit_seconds > self.limits.max_commit_latency
+            or self.replication_lag > self.limits.max_replication_lag / 2
+        )
+        if overloaded and self.speed > self.limits.min_speed:
+            self.speed = max(self.limits.min_speed, self.speed / 2)
+            logging.warning(
+                f'База под нагрузкой (COMMIT {stats.commit_seconds * 1000:.0f} мс, '
+                f'отставание реплик {self.replication_lag:.1f} с), скорость {self.speed:.0%}'
+            )
+        elif not overloaded:
+            self.speed = min(1.0, self.speed + 0.1)
+
+        # Батч должен занять не меньше времени, чем позволяют пределы скорости
+        budget = stats.seconds / self.speed
+        if self.limits.rows_per_second:
+            budget = max(budget, stats.rows / (self.limits.rows_per_second * self.speed))
+        if self.limits.bytes_per_second:
+            budget = max(budget, stats.bytes / (self.limits.bytes_per_second * self.speed))
+        if budget > stats.seconds:
+            time.sleep(budget - stats.seconds)
+
+
+def batch_bytes(data: list[tuple]) -> int:
+    """Примерный объём батча в байтах"""
+    return sum(len(str(value).encode()) for row in data for value in row if value is not None)
+
+
 class PostgresSaver:
-    def __init__(self, connection: psycopg2.extensions.connection):
+    def __init__(self, connection: psycopg2.extensions.connection, throttle: Optional[Throttle] = None):
         self.conn = connection
+        self.throttle = throttle
+        self.insert_sql = self._insert_sql()
 
-    def save_batch(self, batch: list):
+    def _insert_sql(self) -> dict:
+        """SQL_INSERT_MAP с целью конфликта связей под текущую схему таблиц"""
+        with self.conn.cursor() as cursor:
+            cursor.execute(PARTITIONED_TABLES_SQL)
+            partitioned = {row[0] for row in cursor.fetchall()}
+        insert_sql = dict(SQL_INSERT_MAP)
+        for model, table in ((GenreFilmWork, 'genre_film_work'), (PersonFilmWork, 'person_film_work')):
+            insert_sql[model] = SQL_INSERT_MAP[model].format(id_key=LINK_ID_KEYS[table in partitioned])
+        return insert_sql
+
+    def save_batch(self, batch: list) -> Optional[BatchStats]:
         """Сохраняет батч, автоматически определяя класс"""
         if not batch:
-            return
+            return None
         
+        started = time.perf_counter()
         obj_class = type(batch[0])  # Определяем класс из первого объекта
-        sql_query = SQL_INSERT_MAP[obj_class]
+        sql_query = self.insert_sql[obj_class]
         convert_func = DATA_MAP[obj_class]
         
         data = [convert_func(obj) for obj in batch]
         with self.conn.cursor() as cursor:
             cursor.executemany(sql_query, data)
+            commit_started = time.perf_counter()
             self.conn.commit()
+        finished = time.perf_counter()
+        return BatchStats(
+            rows=len(data),
+            bytes=batch_bytes(data) if self.throttle else 0,
+            seconds=finished - started,
+            commit_seconds=finished - commit_started,
+        )
 
     def save_all_data(self, data_generator: Generator[list, None, None]):
         """Сохраняет все данные из генератора"""
         for batch_no, batch in enumerate(data_generator, start=1):
             logging.info(f'Сохраняем батч #{batch_no}, объектов: {len(batch)}')
-            self.save_batch(batch)
+            stats = self.save_batch(batch)
             logging.info(f'Батч #{batch_no} успешно сохранен')
             logging.info('---')
+            if self.throttle and stats:
+                self.throttle.after_batch(stats)
 
-def verify_data_migration(sqlite_conn: sqlite3.Connection, pg_conn: psycopg2.extensions.connection):
-    """Проверяет целостность данных после миграции из SQLite в PostgreSQL с использованием батчей"""
-    
-    # Определяем соответствие таблиц и их названий в PostgreSQL
-    table_map = {
-        'genre': 'content.genre',
-        'film_work': 'content.film_work',
-        'person': 'content.person',
-        'genre_film_work': 'content.genre_film_work',
-        'person_film_work': 'content.person_film_work'
-    }
-    
-    # Проверка количества записей в каждой таблице
-    ("Проверка количества записей...")
-    for sqlite_table, pg_table in table_map.items():
-        # Получаем количество записей из SQLite
+@dataclass
+class TableReport:
+    """Итог проверки одной таблицы"""
+    table: str
+    mode: str
+    total: int
+    checked: int
+    seconds: float
+
+
+def compare_rows(table: str, location: str, sqlite_dict: dict, pg_dict: dict, columns):
+    """Сравнивает значения колонок одной записи SQLite и PostgreSQL"""
+    prefix = f"Несоответствие в таблице {table}, {location}"
+    for col in columns:
+        sqlite_value = sqlite_dict[col]
+        pg_value = pg_dict[col]
+
+        # Особенная обработка для временных меток
+        if col in ['created_at', 'updated_at'] and sqlite_value is not None:
+            # Преобразуем в строки и сравниваем только значимые части
+            sqlite_str = str(sqlite_value)[:19]  # Берем только дату и время без микросекунд
+            pg_str = str(pg_value)[:19]
+            assert sqlite_str == pg_str, (
+                f"{prefix}, колонка {col}: SQLite={sqlite_str}, PostgreSQL={pg_str}"
+            )
+        elif col == 'creation_date' and sqlite_value is not None:
+            # Для дат сравниваем строковое представление
+            sqlite_str = str(sqlite_value)
+            pg_str = str(pg_value)
+            assert sqlite_str == pg_str, (
+                f"{prefix}, колонка {col}: SQLite={sqlite_str}, PostgreSQL={pg_str}"
+            )
+        elif col in ['id', 'film_work_id', 'genre_id', 'person_id'] and sqlite_value is not None:
+            # Для UUID сравниваем строковые представления (приводим к нижнему регистру)
+            sqlite_str = str(sqlite_value).lower()
+            pg_str = str(pg_value).lower()
+            assert sqlite_str == pg_str, (
+                f"{prefix}, колонка {col}: SQLite={sqlite_str}, PostgreSQL={pg_str}"
+            )
+        # Особенная обработка для None значений
+        elif sqlite_value is None:
+            assert pg_value is None, (
+                f"{prefix}, колонка {col}: SQLite=None, PostgreSQL={pg_value}"
+            )
+        elif pg_value is None:
+            assert sqlite_value is None, (
+                f"{prefix}, колонка {col}: SQLite={sqlite_value}, PostgreSQL=None"
+            )
+        # Для числовых значений сравниваем с допуском
+        elif isinstance(sqlite_value, (int, float)) and isinstance(pg_value, (int, float)):
+            assert abs(sqlite_value - pg_value) < 0.0001, (
+                f"{prefix}, колонка {col}: SQLite={sqlite_value}, PostgreSQL={pg_value}"
+            )
+        else:
+            assert sqlite_value == pg_value, (
+                f"{prefix}, колонка {col}: SQLite={sqlite_value}, PostgreSQL={pg_value}"
+            )
+
+
+def check_row_counts(sqlite_conn: sqlite3.Connection, pg_conn: psycopg2.extensions.connection) -> dict[str, int]:
+    """Проверяет количество записей в каждой таблице, возвращает его"""
+    logging.info("Проверка количества записей...")
+    counts = {}
+    for sqlite_table, pg_table in TABLE_MAP.items():
         sqlite_cursor = sqlite_conn.cursor()
         sqlite_cursor.execute(f"SELECT COUNT(*) FROM {sqlite_table}")
         sqlite_count = sqlite_cursor.fetchone()[0]
-        
-        # Получаем количество записей из PostgreSQL
-        pg_cursor = pg_conn.cursor()
-        pg_cursor.execute(f"SELECT COUNT(*) FROM {pg_table}")
-        pg_count = pg_cursor.fetchone()[0]
-        
+
+        with pg_conn.cursor() as pg_cursor:
+            pg_cursor.execute(f"SELECT COUNT(*) FROM {pg_table}")
+            pg_count = pg_cursor.fetchone()[0]
+
         logging.info(f"Таблица {sqlite_table}: SQLite={sqlite_count}, PostgreSQL={pg_count}")
         assert sqlite_count == pg_count, (
             f"Несоответствие количества записей в таблице {sqlite_table}: "
             f"SQLite={sqlite_count}, PostgreSQL={pg_count}"
         )
-    
+        counts[sqlite_table] = sqlite_count
+
     logging.info("✓ Количество записей во всех таблицах совпадает\n")
-    
-    # Проверка содержимого записей для каждой таблицы с использованием батчей
-    logging.info("Проверка содержимого записей батчами...")
-    
-    for sqlite_table, pg_table in table_map.items():
-        logging.info(f"Проверка таблицы: {sqlite_table}")
-        
-        # Получаем общее количество записей для прогресса
-        sqlite_cursor = sqlite_conn.cursor()
-        sqlite_cursor.execute(f"SELECT COUNT(*) FROM {sqlite_table}")
-        total_records = sqlite_cursor.fetchone()[0]
-        
-        # Получаем структуру колонок (набором, а не списком для независимости от порядка)
-        sqlite_cursor.execute(f"PRAGMA table_info({sqlite_table})")
-        sqlite_columns_set = {row[1] for row in sqlite_cursor.fetchall()}
-        
-        pg_cursor = pg_conn.cursor()
-        pg_cursor.execute(f"""
-            SELECT column_name 
-            FROM information_schema.columns 
-            WHERE table_schema = 'content' 
-            AND table_name = '{pg_table.split('.')[1]}'
-        """)
-        pg_columns_set = {row[0] for row in pg_cursor.fetchall()}
-        
-        # Проверяем, что наборы колонок совпадают
-        assert sqlite_columns_set == pg_columns_set, (
-            f"Несоответствие колонок в таблице {sqlite_table}: "
-            f"SQLite={sorted(sqlite_columns_set)}, PostgreSQL={sorted(pg_columns_set)}"
+    return counts
+
+
+def table_columns(sqlite_conn: sqlite3.Connection, pg_conn: psycopg2.extensions.connection,
+                  sqlite_table: str) -> tuple[list[str], list[str]]:
+    """Упорядоченные списки колонок таблицы в SQLite и PostgreSQL"""
+    sqlite_cursor = sqlite_conn.cursor()
+    sqlite_cursor.execute(f"PRAGMA table_info({sqlite_table})")
+    sqlite_columns = [row[1] for row in sqlite_cursor.fetchall()]
+
+    with pg_conn.cursor() as pg_cursor:
+        pg_cursor.execute("""
+            SELECT column_name
+            FROM information_schema.columns
+            WHERE table_schema = 'content' AND table_name = %s
+            ORDER BY ordinal_position
+        """, [sqlite_table])
+        pg_columns = [row[0] for row in pg_cursor.fetchall()]
+
+    # В PostgreSQL могут быть производные колонки, которых нет в SQLite
+    # (например, счётчики film_count), поэтому проверяем вхождение
+    missing = set(sqlite_columns) - set(pg_columns)
+    assert not missing, (
+        f"Несоответствие колонок в таблице {sqlite_table}: "
+        f"в PostgreSQL нет {sorted(missing)}"
+    )
+    return sqlite_columns, pg_columns
+
+
+def log_report(reports: list[TableReport]):
+    logging.info("Итоги проверки:")
+    logging.info(f"  {'таблица':<18} {'режим':<9} {'проверено':>12} {'всего':>10} {'сек':>8}")
+    for report in reports:
+        logging.info(
+            f"  {report.table:<18} {report.mode:<9} {report.checked:>12} "
+            f"{report.total:>10} {report.seconds:>8.2f}"
         )
-        
-        # Получаем упорядоченные списки колонок для корректного сопоставления данных
-        sqlite_cursor.execute(f"PRAGMA table_info({sqlite_table})")
-        sqlite_columns_ordered = [row[1] for row in sqlite_cursor.fetchall()]
-        
+    logging.info(f"  Всего: {sum(report.seconds for report in reports):.2f} сек")
+
+
+def verify_table(sqlite_conn: sqlite3.Connection, pg_conn: psycopg2.extensions.connection,
+                 sqlite_table: str, total_records: int) -> TableReport:
+    """Последовательно сравнивает все записи таблицы батчами"""
+    started = time.perf_counter()
+    pg_table = TABLE_MAP[sqlite_table]
+    logging.info(f"Проверка таблицы: {sqlite_table}")
+    sqlite_columns, pg_columns = table_columns(sqlite_conn, pg_conn, sqlite_table)
+
+    sqlite_cursor = sqlite_conn.cursor()
+    pg_cursor = pg_conn.cursor()
+    offset = 0
+    batch_number = 1
+
+    while True:
+        # Получаем батч из SQLite
+        sqlite_cursor.execute(f"""
+            SELECT * FROM {sqlite_table}
+            ORDER BY id
+            LIMIT {BATCH_SIZE} OFFSET {offset}
+        """)
+        sqlite_batch = sqlite_cursor.fetchall()
+
+        if not sqlite_batch:
+            break
+
+        # Получаем соответствующий батч из PostgreSQL
         pg_cursor.execute(f"""
-            SELECT column_name 
-            FROM information_schema.columns 
-            WHERE table_schema = 'content' 
-            AND table_name = '{pg_table.split('.')[1]}'
-            ORDER BY ordinal_position
+            SELECT * FROM {pg_table}
+            ORDER BY id
+            LIMIT {BATCH_SIZE} OFFSET {offset}
         """)
-        pg_columns_ordered = [row[0] for row in pg_cursor.fetchall()]
-        
-        # Проверяем данные батчами
-        offset = 0
-        batch_number = 1
-        
-        while True:
-            # Получаем батч из SQLite
-            sqlite_cursor.execute(f"""
-                SELECT * FROM {sqlite_table} 
-                ORDER BY id 
-                LIMIT {BATCH_SIZE} OFFSET {offset}
-            """)
-            sqlite_batch = sqlite_cursor.fetchall()
-            
-            if not sqlite_batch:
-                break
-            
-            # Получаем соответствующий батч из PostgreSQL
-            pg_cursor.execute(f"""
-                SELECT * FROM {pg_table} 
-                ORDER BY id 
-                LIMIT {BATCH_SIZE} OFFSET {offset}
-            """)
-            pg_batch = pg_cursor.fetchall()
-            
-            # Проверяем, что батчи имеют одинаковый размер
-            assert len(sqlite_batch) == len(pg_batch), (
-                f"Несоответствие размера батча #{batch_number} в таблице {sqlite_table}: "
-                f"SQLite={len(sqlite_batch)}, PostgreSQL={len(pg_batch)}"
+        pg_batch = pg_cursor.fetchall()
+
+        # Проверяем, что батчи имеют одинаковый размер
+        assert len(sqlite_batch) == len(pg_batch), (
+            f"Несоответствие размера батча #{batch_number} в таблице {sqlite_table}: "
+            f"SQLite={len(sqlite_batch)}, PostgreSQL={len(pg_batch)}"
+        )
+
+        # Сравниваем каждую запись в батче
+        for i, (sqlite_row, pg_row) in enumerate(zip(sqlite_batch, pg_batch)):
+            compare_rows(
+                sqlite_table, f"батч #{batch_number}, запись #{offset + i + 1}",
+                dict(zip(sqlite_columns, sqlite_row)), dict(zip(pg_columns, pg_row)),
+                sqlite_columns,
             )
-            
-            # Сравниваем каждую запись в батче
-            for i, (sqlite_row, pg_row) in enumerate(zip(sqlite_batch, pg_batch)):
-                record_number = offset + i + 1
-                sqlite_dict = dict(zip(sqlite_columns_ordered, sqlite_row))
-                pg_dict = dict(zip(pg_columns_ordered, pg_row))
-                
-                # Для каждой колонки проверяем соответствие значений
-                for col in sqlite_columns_set:
-                    sqlite_value = sqlite_dict[col]
-                    pg_value = pg_dict[col]
-                    
-                    # Особенная обработка для временных меток
-                    if col in ['created_at', 'updated_at'] and sqlite_value is not None:
-                        # Преобразуем в строки и сравниваем только значимые части
-                        sqlite_str = str(sqlite_value)[:19]  # Берем только дату и время без микросекунд
-                        pg_str = str(pg_value)[:19]
-                        assert sqlite_str == pg_str, (
-                            f"Несоответствие в таблице {sqlite_table}, "
-                            f"батч #{batch_number}, запись #{record_number}, колонка {col}: "
-                            f"SQLite={sqlite_str}, PostgreSQL={pg_str}"
-                        )
-                    elif col == 'creation_date' and sqlite_value is not None:
-                        # Для дат сравниваем строковое представление
-                        sqlite_str = str(sqlite_value)
-                        pg_str = str(pg_value)
-                        assert sqlite_str == pg_str, (
-                            f"Несоответствие в таблице {sqlite_table}, "
-                            f"батч #{batch_number}, запись #{record_number}, колонка {col}: "
-                            f"SQLite={sqlite_str}, PostgreSQL={pg_str}"
-                        )
-                    elif col in ['id', 'film_work_id', 'genre_id', 'person_id'] and sqlite_value is not None:
-                        # Для UUID сравниваем строковые представления (приводим к нижнему регистру)
-                        sqlite_str = str(sqlite_value).lower()
-                        pg_str = str(pg_value).lower()
-                        assert sqlite_str == pg_str, (
-                            f"Несоответствие в таблице {sqlite_table}, "
-                            f"батч #{batch_number}, запись #{record_number}, колонка {col}: "
-                            f"SQLite={sqlite_str}, PostgreSQL={pg_str}"
-                        )
-                    else:
-                        # Для остальных колонок сравниваем значения
-                        # Особенная обработка для None значений
-                        if sqlite_value is None:
-                            assert pg_value is None, (
-                                f"Несоответствие в таблице {sqlite_table}, "
-                                f"батч #{batch_number}, запись #{record_number}, колонка {col}: "
-                                f"SQLite=None, PostgreSQL={pg_value}"
-                            )
-                        elif pg_value is None:
-                            assert sqlite_value is None, (
-                                f"Несоответствие в таблице {sqlite_table}, "
-                                f"батч #{batch_number}, запись #{record_number}, колонка {col}: "
-                                f"SQLite={sqlite_value}, PostgreSQL=None"
-                            )
-                        else:
-                            # Для числовых значений сравниваем с допуском
-                            if isinstance(sqlite_value, (int, float)) and isinstance(pg_value, (int, float)):
-                                assert abs(sqlite_value - pg_value) < 0.0001, (
-                                    f"Несоответствие в таблице {sqlite_table}, "
-                                    f"батч #{batch_number}, запись #{record_number}, колонка {col}: "
-                                    f"SQLite={sqlite_value}, PostgreSQL={pg_value}"
-                                )
-                            else:
-                                assert sqlite_value == pg_value, (
-                                    f"Несоответствие в таблице {sqlite_table}, "
-                                    f"батч #{batch_number}, запись #{record_number}, колонка {col}: "
-                                    f"SQLite={sqlite_value}, PostgreSQL={pg_value}"
-                                )
-            
-            logging.info(f"  Батч #{batch_number} ({len(sqlite_batch)} записей) проверен успешно")
-            
-            offset += BATCH_SIZE
-            batch_number += 1
-        
-        logging.info(f"✓ Таблица {sqlite_table} прошла проверку ({total_records} записей)")
-    
+
+        logging.info(f"  Батч #{batch_number} ({len(sqlite_batch)} записей) проверен успешно")
+
+        offset += BATCH_SIZE
+        batch_number += 1
+
+    pg_cursor.close()
+    logging.info(f"✓ Таблица {sqlite_table} прошла проверку ({total_records} записей)")
+    return TableReport(sqlite_table, 'full', total_records, total_records, time.perf_counter() - started)
+
+
+def verify_data_migration(sqlite_conn: sqlite3.Connection, pg_conn: psycopg2.extensions.connection):
+    """Проверяет целостность данных после миграции из SQLite в PostgreSQL с использованием батчей"""
+    counts = check_row_counts(sqlite_conn, pg_conn)
+
+    # Проверка содержимого записей для каждой таблицы с использованием батчей
+    logging.info("Проверка содержимого записей батчами...")
+    reports = [
+        verify_table(sqlite_conn, pg_conn, sqlite_table, counts[sqlite_table])
+        for sqlite_table in TABLE_MAP
+    ]
+
+    log_report(reports)
     logging.info("✓ Все проверки пройдены успешно! Миграция данных завершена корректно.")
+    return reports
+
+
+# Параллельная проверка: таблицы режутся на диапазоны id, диапазоны
+# проверяются в пуле процессов. Сравнение колонок упирается в процессор,
+# поэтому потоки из-за GIL не помогают. Соединения у каждого процесса свои.
+
+_worker_connections = {}
 
-def load_from_sqlite(connection: sqlite3.Connection, pg_conn: psycopg2.extensions.connection):
+
+def _init_verify_worker(sqlite_path: str, dsl: dict):
+    _worker_connections['sqlite'] = sqlite3.connect(f'file:{sqlite_path}?mode=ro', uri=True)
+    _worker_connections['pg'] = psycopg2.connect(**dsl)
+    _worker_connections['pg'].set_session(readonly=True, autocommit=True)
+
+
+def _verify_range(sqlite_table: str, lower: Optional[str], upper: Optional[str]) -> tuple[str, int, float]:
+    """Сравнивает записи с id в (lower, upper]; None означает открытую границу"""
+    started = time.perf_counter()
+    sqlite_conn = _worker_connections['sqlite']
+    pg_conn = _worker_connections['pg']
+    sqlite_columns, pg_columns = table_columns(sqlite_conn, pg_conn, sqlite_table)
+
+    sqlite_conditions, pg_conditions, params = ['1 = 1'], ['TRUE'], []
+    if lower is not None:
+        sqlite_conditions.append('id > ?')
+        pg_conditions.append('id > %s::uuid')
+        params.append(lower)
+    if upper is not None:
+        sqlite_conditions.append('id <= ?')
+        pg_conditions.append('id <= %s::uuid')
+        params.append(upper)
+
+    sqlite_cursor = sqlite_conn.cursor()
+    sqlite_cursor.execute(
+        f"SELECT * FROM {sqlite_table} WHERE {' AND '.join(sqlite_conditions)} ORDER BY id", params,
+    )
+    sqlite_rows = sqlite_cursor.fetchall()
+    with pg_conn.cursor() as pg_cursor:
+        pg_cursor.execute(
+            f"SELECT * FROM {TABLE_MAP[sqlite_table]} WHERE {' AND '.join(pg_conditions)} ORDER BY id", params,
+        )
+        pg_rows = pg_cursor.fetchall()
+
+    location = f"диапазон id ({lower}, {upper}]"
+    assert len(sqlite_rows) == len(pg_rows), (
+        f"Несоответствие количества записей в таблице {sqlite_table}, {location}: "
+        f"SQLite={len(sqlite_rows)}, PostgreSQL={len(pg_rows)}"
+    )
+    for sqlite_row, pg_row in zip(sqlite_rows, pg_rows):
+        sqlite_dict = dict(zip(sqlite_columns, sqlite_row))
+        compare_rows(
+            sqlite_table, f"{location}, id {sqlite_dict['id']}",
+            sqlite_dict, dict(zip(pg_columns, pg_row)), sqlite_columns,
+        )
+    return sqlite_table, len(sqlite_rows), time.perf_counter() - started
+
+
+def split_id_ranges(sqlite_conn: sqlite3.Connection, sqlite_table: str,
+                    range_size: int) -> list[tuple[Optional[str], Optional[str]]]:
+    """Границы диапазонов по range_size записей за один проход по индексу id"""
+    cursor = sqlite_conn.cursor()
+    cursor.execute(f"SELECT id FROM {sqlite_table} ORDER BY id")
+    bounds = [row[0] for position, row in enumerate(cursor, start=1) if position % range_size == 0]
+    edges = [None] + bounds + [None]
+    return list(zip(edges[:-1], edges[1:]))
+
+
+def verify_data_migration_parallel(sqlite_path: str, dsl: dict, workers: Optional[int] = None,
+                                   range_size: int = VERIFY_RANGE_SIZE) -> list[TableReport]:
+    """Параллельная версия verify_data_migration: диапазоны id всех таблиц в пуле процессов"""
+    with closing(sqlite3.connect(sqlite_path)) as sqlite_conn, closing(psycopg2.connect(**dsl)) as pg_conn:
+        counts = check_row_counts(sqlite_conn, pg_conn)
+        tasks = [
+            (sqlite_table, lower, upper)
+            for sqlite_table in TABLE_MAP
+            for lower, upper in split_id_ranges(sqlite_conn, sqlite_table, range_size)
+        ]
+
+    logging.info(f"Проверка {len(tasks)} диапазонов в {workers or os.cpu_count()} процессах...")
+    checked = dict.fromkeys(TABLE_MAP, 0)
+    seconds = dict.fromkeys(TABLE_MAP, 0.0)
+    started = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_verify_worker,
+                             initargs=(sqlite_path, dsl)) as executor:
+        futures = [executor.submit(_verify_range, *task) for task in tasks]
+        for future in as_completed(futures):
+            # Ошибка сравнения в процессе пробрасывается сюда как AssertionError
+            sqlite_table, rows, elapsed = future.result()
+            checked[sqlite_table] += rows
+            seconds[sqlite_table] += elapsed
+
+    # Время таблицы — сумма времени её диапазонов по всем процессам
+    reports = [
+        TableReport(sqlite_table, 'parallel', counts[sqlite_table], checked[sqlite_table], seconds[sqlite_table])
+        for sqlite_table in TABLE_MAP
+    ]
+    log_report(reports)
+    logging.info(f"✓ Все проверки пройдены успешно за {time.perf_counter() - started:.2f} сек")
+    return reports
+
+
+def sample_size(population: int, confidence: float, tolerance: float) -> int:
+    """Размер выборки, при котором с вероятностью confidence найдётся хотя бы
+    одна расходящаяся запись, если расходится не меньше доли tolerance записей.
+    """
+    if not 0 < confidence < 1 or not 0 <= tolerance < 1:
+        raise ValueError('confidence должен быть в (0, 1), tolerance — в [0, 1)')
+    if population == 0:
+        return 0
+    if tolerance == 0:
+        # Найти единственную расходящуюся запись гарантирует только полная проверка
+        return population
+    size = math.ceil(math.log(1 - confidence) / math.log(1 - tolerance))
+    return min(size, population)
+
+
+def probability(value: str) -> float:
+    """Тип аргумента командной строки: доля строго между 0 и 1"""
+    number = float(value)
+    if not 0 < number < 1:
+        raise argparse.ArgumentTypeError(f'ожидается число строго между 0 и 1, получено {value}')
+    return number
+
+
+def verify_data_sample(sqlite_conn: sqlite3.Connection, pg_conn: psycopg2.extensions.connection,
+                       confidence: float = 0.99, tolerance: float = 0.01, seed: int = 0) -> list[TableReport]:
+    """Быстрая проверка случайной выборки записей.
+
+    Выборка воспроизводима: одинаковые seed и данные дают одинаковые id.
+    """
+    counts = check_row_counts(sqlite_conn, pg_conn)
+    rng = random.Random(seed)
+    reports = []
+    for sqlite_table, pg_table in TABLE_MAP.items():
+        started = time.perf_counter()
+        sqlite_columns, pg_columns = table_columns(sqlite_conn, pg_conn, sqlite_table)
+        sqlite_cursor = sqlite_conn.cursor()
+        sqlite_cursor.execute(f"SELECT id FROM {sqlite_table} ORDER BY id")
+        ids = [row[0] for row in sqlite_cursor.fetchall()]
+        sample = rng.sample(ids, sample_size(len(ids), confidence, tolerance))
+        logging.info(f"Проверка таблицы {sqlite_table}: выборка {len(sample)} из {len(ids)}")
+
+        for start in range(0, len(sample), BATCH_SIZE):
+            batch_ids = sample[start:start + BATCH_SIZE]
+            placeholders = ', '.join('?' * len(batch_ids))
+            sqlite_cursor.execute(f"SELECT * FROM {sqlite_table} WHERE id IN ({placeholders})", batch_ids)
+            sqlite_rows = {
+                str(row['id']).lower(): row
+                for row in (dict(zip(sqlite_columns, row)) for row in sqlite_cursor.fetchall())
+            }
+            with pg_conn.cursor() as pg_cursor:
+                pg_cursor.execute(f"SELECT * FROM {pg_table} WHERE id = ANY(%s::uuid[])", [batch_ids])
+                pg_rows = {
+                    str(row['id']).lower(): row
+                    for row in (dict(zip(pg_columns, row)) for row in pg_cursor.fetchall())
+                }
+            for record_id, sqlite_row in sqlite_rows.items():
+                assert record_id in pg_rows, (
+                    f"Запись {record_id} таблицы {sqlite_table} отсутствует в PostgreSQL"
+                )
+                compare_rows(sqlite_table, f"id {record_id}", sqlite_row, pg_rows[record_id], sqlite_columns)
+
+        reports.append(TableReport(
+            sqlite_table, 'sample', counts[sqlite_table], len(sample), time.perf_counter() - started,
+        ))
+
+    log_report(reports)
+    logging.info(
+        f"✓ Выборочная проверка пройдена: с вероятностью {confidence:.0%} "
+        f"расходится меньше {tolerance:.2%} записей каждой таблицы"
+    )
+    return reports
+
+def load_from_sqlite(connection: sqlite3.Connection, pg_conn: psycopg2.extensions.connection,
+                     throttle_limits: Optional[ThrottleLimits] = None):
     """Основной метод загрузки данных из SQLite в Postgres"""
-    postgres_saver = PostgresSaver(pg_conn)
+    throttle = Throttle(pg_conn, throttle_limits) if throttle_limits else None
+    postgres_saver = PostgresSaver(pg_conn, throttle)
     sqlite_loader = SQLiteLoader(connection)
 
     # Определяем соответствие таблиц и классов
@@ -355,6 +693,35 @@ def load_from_sqlite(connection: sqlite3.Connection, pg_conn: psycopg2.extension
             continue
 
 if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Перенос данных из SQLite в PostgreSQL')
+    parser.add_argument(
+        '--verify', choices=['full', 'parallel', 'sample'], default='full',
+        help='Режим проверки после переноса: полная, полная в пуле процессов или выборочная',
+    )
+    parser.add_argument('--workers', type=int, help='Число процессов для --verify parallel')
+    parser.add_argument('--confidence', type=probability, default=0.99, help='Уровень доверия для --verify sample')
+    parser.add_argument('--tolerance', type=probability, default=0.01,
+                        help='Доля расходящихся записей, которую должна поймать --verify sample')
+    parser.add_argument('--seed', type=int, default=0, help='Зерно выборки для --verify sample')
+    parser.add_argument('--throttle', action='store_true',
+                        help='Щадящий режим для рабочей базы: следить за COMMIT и отставанием реплик')
+    parser.add_argument('--max-rows-per-second', type=float, help='Предел строк в секунду (включает --throttle)')
+    parser.add_argument('--max-bytes-per-second', type=float, help='Предел байт в секунду (включает --throttle)')
+    parser.add_argument('--max-replication-lag', type=float, default=10.0,
+                        help='Отставание реплик в секундах, при котором загрузка встаёт на паузу')
+    parser.add_argument('--max-commit-latency', type=float, default=0.5,
+                        help='Время COMMIT в секундах, выше которого загрузка замедляется')
+    args = parser.parse_args()
+
+    throttle_limits = None
+    if args.throttle or args.max_rows_per_second or args.max_bytes_per_second:
+        throttle_limits = ThrottleLimits(
+            rows_per_second=args.max_rows_per_second,
+            bytes_per_second=args.max_bytes_per_second,
+            max_replication_lag=args.max_replication_lag,
+            max_commit_latency=args.max_commit_latency,
+        )
+
     dsl = {
         'dbname': os.environ.get('DB_NAME'),
         'user': os.environ.get('DB_USER'), 
@@ -363,8 +730,14 @@ if __name__ == '__main__':
         'port': os.environ.get('DB_PORT', 5432)
     }
 
-    with sqlite3.connect('db.sqlite') as sqlite_conn:
+    with sqlite3.connect(SQLITE_PATH) as sqlite_conn:
         with closing(psycopg2.connect(**dsl, cursor_factory=DictCursor)) as pg_conn:
             with pg_conn:
-                load_from_sqlite(sqlite_conn, pg_conn)
-                verify_data_migration(sqlite_conn, pg_conn)
\ No newline at end of file
+                load_from_sqlite(sqlite_conn, pg_conn, throttle_limits)
+                if args.verify == 'full':
+                    verify_data_migration(sqlite_conn, pg_conn)
+                elif args.verify == 'sample':
+                    verify_data_sample(sqlite_conn, pg_conn, args.confidence, args.tolerance, args.seed)
+
+    if args.verify == 'parallel':
+        verify_data_migration_parallel(SQLITE_PATH, dsl, args.workers)
@@ -0,0 +1,292 @@
+import argparse
+import gzip
+import json
+import logging
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import closing
+from dataclasses import asdict, dataclass
+from datetime import datetime, timezone
+from pathlib import Path
+
+import psycopg2
+from dotenv import load_dotenv
+
+logging.basicConfig(level=logging.INFO)
+
+load_dotenv()
+
+# Порядок важен только для логов: при восстановлении внешние ключи
+# создаются после загрузки всех таблиц
+TABLES = ('genre', 'film_work', 'person', 'genre_film_work', 'person_film_work')
+MANIFEST = 'manifest.json'
+SNAPSHOT_FORMAT = 'pgcopy-binary+gzip'
+# Сжатие уровня 1 почти так же эффективно на этих данных, но в разы быстрее
+COMPRESS_LEVEL = 1
+COPY_BUFFER_SIZE = 1024 * 1024
+
+# Контрольная сумма не зависит от порядка строк: сумма первых 64 бит md5
+# каждой строки. Колонки перечисляются явно, чтобы сумма не зависела от
+# их физического порядка в таблице.
+CHECKSUM_SQL = """
+    SELECT count(*), COALESCE(sum(('x' || substr(md5(ROW({columns})::text), 1, 16))::bit(64)::bigint), 0)
+    FROM content.{table}
+"""
+
+
+@dataclass
+class TableSnapshot:
+    """Запись манифеста о таблице снапшота"""
+    table: str
+    file: str
+    columns: list[str]
+    rows: int
+    checksum: str
+    bytes: int
+
+
+def get_dsl() -> dict:
+    return {
+        'dbname': os.environ.get('DB_NAME'),
+        'user': os.environ.get('DB_USER'),
+        'password': os.environ.get('DB_PASSWORD'),
+        'host': os.environ.get('DB_HOST', '127.0.0.1'),
+        'port': os.environ.get('DB_PORT', 5432)
+    }
+
+
+def table_columns(cursor, table: str) -> list[str]:
+    cursor.execute("""
+        SELECT column_name FROM information_schema.columns
+        WHERE table_schema = 'content' AND table_name = %s
+        ORDER BY ordinal_position
+    """, [table])
+    return [row[0] for row in cursor.fetchall()]
+
+
+def table_checksum(cursor, table: str, columns: list[str]) -> tuple[int, str]:
+    cursor.execute(CHECKSUM_SQL.format(table=table, columns=', '.join(columns)))
+    rows, checksum = cursor.fetchone()
+    return rows, str(checksum)
+
+
+# Снапшот
+
+def _dump_table(dsl: dict, snapshot_id: str, directory: Path, table: str) -> TableSnapshot:
+    started = time.perf_counter()
+    path = directory / f'{table}.copy.gz'
+    with closing(psycopg2.connect(**dsl)) as conn:
+        conn.set_session(isolation_level='REPEATABLE READ', readonly=True)
+        with conn.cursor() as cursor:
+            # Все таблицы читаются из одного снимка базы, хотя и разными соединениями
+            cursor.execute('SET TRANSACTION SNAPSHOT %s', [snapshot_id])
+            columns = table_columns(cursor, table)
+            rows, checksum = table_checksum(cursor, table, columns)
+            with gzip.open(path, 'wb', compresslevel=COMPRESS_LEVEL) as file:
+                # COPY (SELECT ...) работает и для секционированных таблиц
+                cursor.copy_expert(
+                    f'COPY (SELECT {", ".join(columns)} FROM content.{table}) TO STDOUT WITH (FORMAT binary)',
+                    file, size=COPY_BUFFER_SIZE,
+                )
+        conn.rollback()
+
+    snapshot = TableSnapshot(table, path.name, columns, rows, checksum, path.stat().st_size)
+    logging.info(
+        f'{table}: {rows} строк, {snapshot.bytes / 1024 / 1024:.1f} МБ за {time.perf_counter() - started:.1f} с'
+    )
+    return snapshot
+
+
+def dump_snapshot(dsl: dict, directory: str, jobs: int = 4) -> dict:
+    """Выгружает таблицы content.* в сжатые файлы бинарного COPY и пишет манифест"""
+    directory = Path(directory)
+    directory.mkdir(parents=True, exist_ok=True)
+    started = time.perf_counter()
+
+    # Соединение держит экспортированный снимок, пока его используют остальные
+    with closing(psycopg2.connect(**dsl)) as conn:
+        conn.set_session(isolation_level='REPEATABLE READ', readonly=True)
+        with conn.cursor() as cursor:
+            cursor.execute('SELECT pg_export_snapshot(), current_setting(\'server_version\')')
+            snapshot_id, server_version = cursor.fetchone()
+
+        with ThreadPoolExecutor(max_workers=jobs) as executor:
+            tables = list(executor.map(lambda table: _dump_table(dsl, snapshot_id, directory, table), TABLES))
+        conn.rollback()
+
+    manifest = {
+        'format': SNAPSHOT_FORMAT,
+        'created_at': datetime.now(timezone.utc).isoformat(),
+        'server_version': server_version,
+        'tables': [asdict(table) for table in tables],
+    }
+    (directory / MANIFEST).write_text(json.dumps(manifest, indent=2, ensure_ascii=False))
+    logging.info(f'Снапшот записан в {directory} за {time.perf_counter() - started:.1f} с')
+    return manifest
+
+
+# Восстановление
+
+def _deferred_objects(cursor, table: str) -> tuple[list, list, list]:
+    """Ограничения (без внешних ключей), внешние ключи и индексы таблицы"""
+    cursor.execute("""
+        SELECT conname, contype, pg_get_constraintdef(oid)
+        FROM pg_constraint
+        WHERE conrelid = %s::regclass AND contype IN ('p', 'u', 'f')
+    """, [f'content.{table}'])
+    constraints = cursor.fetchall()
+    cursor.execute("""
+        SELECT i.indexname, i.indexdef
+        FROM pg_indexes i
+        WHERE i.schemaname = 'content' AND i.tablename = %s
+          AND NOT EXISTS (SELECT 1 FROM pg_constraint c WHERE c.conname = i.indexname)
+    """, [table])
+    indexes = cursor.fetchall()
+    keys = [(name, definition) for name, kind, definition in constraints if kind != 'f']
+    foreign_keys = [(name, definition) for name, kind, definition in constraints if kind == 'f']
+    return keys, foreign_keys, indexes
+
+
+def _restore_table(dsl: dict, directory: Path, snapshot: dict):
+    started = time.perf_counter()
+    table = snapshot['table']
+    with closing(psycopg2.connect(**dsl)) as conn:
+        with conn.cursor() as cursor:
+            cursor.execute(
+                "SELECT relkind FROM pg_class WHERE oid = %s::regclass", [f'content.{table}'],
+            )
+            # FREEZE избавляет от перезаписи страниц первым VACUUM, но требует
+            # TRUNCATE в той же транзакции и не работает с секционированными
+            freeze = cursor.fetchone()[0] == 'r'
+            cursor.execute(f'TRUNCATE content.{table}')
+            with gzip.open(directory / snapshot['file'], 'rb') as file:
+                cursor.copy_expert(
+                    f'COPY content.{table} ({", ".join(snapshot["columns"])}) FROM STDIN '
+                    f'WITH (FORMAT binary{", FREEZE" if freeze else ""})',
+                    file, size=COPY_BUFFER_SIZE,
+                )
+        conn.commit()
+    logging.info(f'{table}: загружено {snapshot["rows"]} строк за {time.perf_counter() - started:.1f} с')
+
+
+def _run_statements(dsl: dict, statements: list[str]):
+    with closing(psycopg2.connect(**dsl)) as conn:
+        with conn.cursor() as cursor:
+            for statement in statements:
+                cursor.execute(statement)
+        conn.commit()
+
+
+def verify_snapshot(conn, manifest: dict):
+    """Сверяет число строк и контрольные суммы таблиц с манифестом"""
+    with conn.cursor() as cursor:
+        for snapshot in manifest['tables']:
+            rows, checksum = table_checksum(cursor, snapshot['table'], snapshot['columns'])
+            assert (rows, checksum) == (snapshot['rows'], snapshot['checksum']), (
+                f"Несоответствие в таблице {snapshot['table']}: "
+                f"строк {rows} (в манифесте {snapshot['rows']}), "
+                f"контрольная сумма {checksum} (в манифесте {snapshot['checksum']})"
+            )
+            logging.info(f"✓ {snapshot['table']}: {rows} строк, контрольная сумма совпадает")
+
+
+def restore_snapshot(dsl: dict, directory: str, jobs: int = 4, clean: bool = False):
+    """Загружает снапшот в базу с уже созданной схемой (manage.py migrate).
+
+    Индексы, ключи и триггеры на время загрузки снимаются и создаются
+    заново после неё; таблицы загружаются параллельно.
+    """
+    directory = Path(directory)
+    manifest = json.loads((directory / MANIFEST).read_text())
+    assert manifest['format'] == SNAPSHOT_FORMAT, f"Неизвестный формат снапшота: {manifest['format']}"
+    tables = [snapshot['table'] for snapshot in manifest['tables']]
+    started = time.perf_counter()
+
+    with closing(psycopg2.connect(**dsl)) as conn:
+        with conn.cursor() as cursor:
+            if not clean:
+                for table in tables:
+                    cursor.execute(f'SELECT EXISTS (SELECT 1 FROM content.{table})')
+                    assert not cursor.fetchone()[0], (
+                        f'Таблица {table} не пуста; используйте --clean, чтобы перезаписать данные'
+                    )
+
+            deferred = {table: _deferred_objects(cursor, table) for table in tables}
+            # Сначала внешние ключи: они зависят от первичных ключей других таблиц
+            for table, (keys, foreign_keys, indexes) in deferred.items():
+                for name, _definition in foreign_keys:
+                    cursor.execute(f'ALTER TABLE content.{table} DROP CONSTRAINT {name}')
+            for table, (keys, foreign_keys, indexes) in deferred.items():
+                for name, _definition in keys:
+                    cursor.execute(f'ALTER TABLE content.{table} DROP CONSTRAINT {name}')
+                for name, _definition in indexes:
+                    cursor.execute(f'DROP INDEX content.{name}')
+                # Счётчики film_count уже есть в снапшоте, триггеры их не трогают
+                cursor.execute(f'ALTER TABLE content.{table} DISABLE TRIGGER USER')
+        conn.commit()
+        logging.info(f'Индексы и ограничения сняты ({time.perf_counter() - started:.1f} с)')
+
+        try:
+            with ThreadPoolExecutor(max_workers=jobs) as executor:
+                list(executor.map(lambda snapshot: _restore_table(dsl, directory, snapshot), manifest['tables']))
+            logging.info(f'Данные загружены за {time.perf_counter() - started:.1f} с')
+        except BaseException:
+            # Частично загруженные таблицы не дали бы создать ключи заново
+            _run_statements(dsl, [f'TRUNCATE {", ".join(f"content.{table}" for table in tables)}'])
+            raise
+        finally:
+            # Триггеры, индексы и ограничения восстанавливаем и при ошибке
+            # загрузки, чтобы не оставить схему без них. Триггеры — отдельно:
+            # их не должна отменить ошибка создания ключа
+            loaded = time.perf_counter()
+            _run_statements(dsl, [f'ALTER TABLE content.{table} ENABLE TRIGGER USER' for table in tables])
+            # Каждая таблица — в своём соединении
+            with ThreadPoolExecutor(max_workers=jobs) as executor:
+                list(executor.map(
+                    lambda item: _run_statements(dsl, [
+                        *(f'ALTER TABLE content.{item[0]} ADD CONSTRAINT {name} {definition}'
+                          for name, definition in item[1][0]),
+                        *(definition.replace(' ON ONLY ', ' ON ') for _name, definition in item[1][2]),
+                    ]),
+                    deferred.items(),
+                ))
+            _run_statements(dsl, [
+                f'ALTER TABLE content.{table} ADD CONSTRAINT {name} {definition}'
+                for table, (keys, foreign_keys, indexes) in deferred.items()
+                for name, definition in foreign_keys
+            ])
+            logging.info(f'Индексы и ограничения созданы за {time.perf_counter() - loaded:.1f} с')
+
+        with conn.cursor() as cursor:
+            # Представления вроде film_work_catalog собираются из восстановленных таблиц
+            cursor.execute("SELECT matviewname FROM pg_matviews WHERE schemaname = 'content'")
+            for (view,) in cursor.fetchall():
+                cursor.execute(f'REFRESH MATERIALIZED VIEW content.{view}')
+        conn.commit()
+
+        conn.autocommit = True
+        with conn.cursor() as cursor:
+            for table in tables:
+                cursor.execute(f'ANALYZE content.{table}')
+        verify_snapshot(conn, manifest)
+
+    logging.info(f'✓ Снапшот восстановлен за {time.perf_counter() - started:.1f} с')
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Снапшот таблиц content.* в бинарном формате COPY')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+    dump_parser = subparsers.add_parser('dump', help='Выгрузить снапшот')
+    dump_parser.add_argument('directory')
+    dump_parser.add_argument('--jobs', type=int, default=4)
+    restore_parser = subparsers.add_parser('restore', help='Восстановить снапшот и проверить его')
+    restore_parser.add_argument('directory')
+    restore_parser.add_argument('--jobs', type=int, default=4)
+    restore_parser.add_argument('--clean', action='store_true', help='Перезаписать непустые таблицы')
+    args = parser.parse_args()
+
+    if args.command == 'dump':
+        dump_snapshot(get_dsl(), args.directory, args.jobs)
+    else:
+        restore_snapshot(get_dsl(), args.directory, args.jobs, args.clean)
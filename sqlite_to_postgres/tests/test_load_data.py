@@ -0,0 +1,170 @@
+import math
+import unittest
+from datetime import datetime, timezone
+from unittest import mock
+
+from load_data import BatchStats, Throttle, ThrottleLimits, compare_rows, sample_size
+
+COLUMNS = ('id', 'film_work_id', 'title', 'rating', 'file_path', 'creation_date', 'created_at')
+
+
+def sqlite_row(**changes) -> dict:
+    row = {
+        'id': 'B8531E54-AE2E-4D3C-8C4B-7C6D3BDB6B6D',
+        'film_work_id': '3D825F60-9FFF-4DFE-B294-1A45FA1E115D',
+        'title': 'Star Wars',
+        'rating': 8.6,
+        'file_path': None,
+        'creation_date': '1977-05-25',
+        'created_at': '2021-06-16 20:14:09.221838+00',
+    }
+    return {**row, **changes}
+
+
+def pg_row(**changes) -> dict:
+    row = {
+        'id': 'b8531e54-ae2e-4d3c-8c4b-7c6d3bdb6b6d',
+        'film_work_id': '3d825f60-9fff-4dfe-b294-1a45fa1e115d',
+        'title': 'Star Wars',
+        'rating': 8.600000001,
+        'file_path': None,
+        'creation_date': '1977-05-25',
+        'created_at': datetime(2021, 6, 16, 20, 14, 9, 221838, tzinfo=timezone.utc),
+    }
+    return {**row, **changes}
+
+
+class CompareRowsTests(unittest.TestCase):
+    def test_equal_rows(self):
+        # Регистр UUID, микросекунды и формат временной зоны не различие,
+        # рейтинг сравнивается с допуском
+        compare_rows('film_work', 'id=1', sqlite_row(), pg_row(), COLUMNS)
+
+    def test_mismatches(self):
+        cases = {
+            'title': (sqlite_row(), pg_row(title='Star Trek')),
+            'rating': (sqlite_row(), pg_row(rating=8.7)),
+            'id': (sqlite_row(), pg_row(id='00000000-0000-0000-0000-000000000000')),
+            'created_at': (sqlite_row(), pg_row(created_at=datetime(2021, 6, 16, 20, 14, 10, tzinfo=timezone.utc))),
+            'creation_date': (sqlite_row(), pg_row(creation_date='1977-05-26')),
+            'file_path': (sqlite_row(file_path='a.mp4'), pg_row()),
+        }
+        for column, (sqlite_dict, pg_dict) in cases.items():
+            with self.subTest(column=column):
+                with self.assertRaises(AssertionError) as raised:
+                    compare_rows('film_work', 'id=1', sqlite_dict, pg_dict, COLUMNS)
+                self.assertIn('film_work, id=1', str(raised.exception))
+                self.assertIn(f'колонка {column}', str(raised.exception))
+
+    def test_null_in_postgres_only(self):
+        with self.assertRaises(AssertionError):
+            compare_rows('film_work', 'id=1', sqlite_row(), pg_row(title=None), COLUMNS)
+
+    def test_only_listed_columns(self):
+        compare_rows('film_work', 'id=1', sqlite_row(), pg_row(title='Star Trek'), ('id', 'rating'))
+
+
+class SampleSizeTests(unittest.TestCase):
+    def test_formula(self):
+        for confidence, tolerance in ((0.99, 0.01), (0.95, 0.05), (0.999, 0.001)):
+            with self.subTest(confidence=confidence, tolerance=tolerance):
+                size = sample_size(10 ** 9, confidence, tolerance)
+                # Наименьшая выборка, в которой расхождение доли tolerance
+                # пропускается с вероятностью не больше 1 - confidence
+                self.assertLessEqual((1 - tolerance) ** size, 1 - confidence)
+                self.assertGreater((1 - tolerance) ** (size - 1), 1 - confidence)
+        self.assertEqual(sample_size(10 ** 9, 0.99, 0.01), math.ceil(math.log(0.01) / math.log(0.99)))
+
+    def test_bounded_by_population(self):
+        self.assertEqual(sample_size(100, 0.99, 0.01), 100)
+        self.assertEqual(sample_size(0, 0.99, 0.01), 0)
+
+    def test_zero_tolerance_checks_everything(self):
+        self.assertEqual(sample_size(12345, 0.99, 0), 12345)
+
+    def test_invalid_arguments(self):
+        for confidence, tolerance in ((0, 0.01), (1, 0.01), (0.99, 1), (0.99, -0.1)):
+            with self.subTest(confidence=confidence, tolerance=tolerance):
+                with self.assertRaises(ValueError):
+                    sample_size(100, confidence, tolerance)
+
+
+class ThrottleTests(unittest.TestCase):
+    """Темп и паузы загрузки при подменённых часах и отставании реплик"""
+
+    def setUp(self):
+        self.now = 1000.0
+        patcher = mock.patch('load_data.time')
+        self.time = patcher.start()
+        self.addCleanup(patcher.stop)
+        self.time.monotonic.side_effect = lambda: self.now
+        self.time.sleep.side_effect = self.sleep
+        self.lags = []
+        self.conn = mock.MagicMock()
+        cursor = self.conn.cursor.return_value.__enter__.return_value
+        cursor.fetchone.side_effect = lambda: (self.lags.pop(0) if self.lags else 0.0,)
+
+    def sleep(self, seconds: float):
+        self.now += seconds
+
+    def throttle(self, **limits) -> Throttle:
+        return Throttle(self.conn, ThrottleLimits(**limits))
+
+    def sleeps(self) -> list[float]:
+        return [call.args[0] for call in self.time.sleep.call_args_list]
+
+    def test_rows_per_second(self):
+        throttle = self.throttle(rows_per_second=5000)
+        throttle.after_batch(BatchStats(rows=1000, bytes=0, seconds=0.1, commit_seconds=0.01))
+        self.assertEqual(len(self.sleeps()), 1)
+        self.assertAlmostEqual(self.sleeps()[0], 0.1)
+
+    def test_bytes_per_second(self):
+        throttle = self.throttle(rows_per_second=10 ** 6, bytes_per_second=10 ** 6)
+        throttle.after_batch(BatchStats(rows=1000, bytes=500_000, seconds=0.1, commit_seconds=0.01))
+        self.assertAlmostEqual(self.sleeps()[0], 0.4)
+
+    def test_no_limits_no_pause(self):
+        self.throttle().after_batch(BatchStats(rows=1000, bytes=0, seconds=0.1, commit_seconds=0.01))
+        self.time.sleep.assert_not_called()
+
+    def test_slow_commit_halves_speed_and_recovers(self):
+        throttle = self.throttle(rows_per_second=5000, max_commit_latency=0.5)
+        throttle.after_batch(BatchStats(rows=1000, bytes=0, seconds=0.1, commit_seconds=1.0))
+        self.assertEqual(throttle.speed, 0.5)
+        # При половинной скорости 1000 строк занимают 0.4 с
+        self.assertAlmostEqual(self.sleeps()[-1], 0.3)
+        throttle.after_batch(BatchStats(rows=1000, bytes=0, seconds=0.1, commit_seconds=0.01))
+        self.assertAlmostEqual(throttle.speed, 0.6)
+
+    def test_speed_floor(self):
+        throttle = self.throttle(min_speed=0.1)
+        for _ in range(10):
+            throttle.after_batch(BatchStats(rows=10, bytes=0, seconds=0.01, commit_seconds=1.0))
+        self.assertEqual(throttle.speed, 0.1)
+
+    def test_pauses_until_replicas_catch_up(self):
+        throttle = self.throttle(max_replication_lag=10, pause_seconds=5)
+        # Выше предела — пауза; 6 с ниже предела, но выше половины — ещё пауза
+        self.lags = [30.0, 6.0, 4.0]
+        throttle.after_batch(BatchStats(rows=10, bytes=0, seconds=0.01, commit_seconds=0.01))
+        self.assertEqual(self.sleeps(), [5, 5])
+        self.assertEqual(throttle.replication_lag, 4.0)
+        self.assertEqual(throttle.speed, 1.0)
+
+    def test_lag_above_half_slows_down(self):
+        throttle = self.throttle(max_replication_lag=10)
+        self.lags = [6.0]
+        throttle.after_batch(BatchStats(rows=10, bytes=0, seconds=0.01, commit_seconds=0.01))
+        self.assertEqual(throttle.speed, 0.5)
+        self.assertAlmostEqual(self.sleeps()[0], 0.01)
+
+    def test_health_check_interval(self):
+        throttle = self.throttle(health_check_interval=5)
+        stats = BatchStats(rows=10, bytes=0, seconds=0.01, commit_seconds=0.01)
+        throttle.after_batch(stats)
+        self.now += 1
+        throttle.after_batch(stats)
+        self.now += 5
+        throttle.after_batch(stats)
+        self.assertEqual(self.conn.cursor.call_count, 2)
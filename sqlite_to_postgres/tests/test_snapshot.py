@@ -0,0 +1,121 @@
+import json
+import tempfile
+import unittest
+from contextlib import closing
+from pathlib import Path
+from unittest import mock
+
+import psycopg2
+
+import snapshot
+
+# Базы создаются из рабочей (DB_NAME) как из шаблона: схема та же, что
+# после manage.py migrate, а данные в них тест очищает
+SOURCE_DB = 'test_snapshot_source'
+TARGET_DB = 'test_snapshot_target'
+
+FIXTURE_SQL = """
+    INSERT INTO content.genre (id, name, description, created_at, updated_at) VALUES
+        ('6a0a479b-cfec-41ac-b520-41b2b007b611', 'Drama', '', now(), now()),
+        ('120a21cf-9097-479e-904a-13dd7198c1dd', 'Noir', 'Dark', now(), now());
+    INSERT INTO content.film_work (id, title, description, creation_date, rating, type, created_at, updated_at)
+    SELECT gen_random_uuid(), 'Film ' || n, '', date '2000-01-01' + n, n % 100, 'movie', now(), now()
+    FROM generate_series(1, 50) AS n;
+    INSERT INTO content.person (id, full_name, created_at, updated_at) VALUES
+        ('26e83050-29ef-4163-a99d-b546cac208f8', 'Anna Smirnova', now(), now());
+    INSERT INTO content.genre_film_work (id, film_work_id, genre_id, created_at)
+    SELECT gen_random_uuid(), id, '6a0a479b-cfec-41ac-b520-41b2b007b611', now() FROM content.film_work;
+    INSERT INTO content.person_film_work (id, film_work_id, person_id, role, created_at)
+    SELECT gen_random_uuid(), id, '26e83050-29ef-4163-a99d-b546cac208f8', 'actor', now()
+    FROM content.film_work WHERE rating < 10;
+"""
+
+SCHEMA_OBJECTS_SQL = """
+    SELECT 'constraint', conrelid::regclass::text, conname, pg_get_constraintdef(oid)
+    FROM pg_constraint WHERE connamespace = 'content'::regnamespace
+    UNION ALL
+    SELECT 'index', tablename, indexname, indexdef FROM pg_indexes WHERE schemaname = 'content'
+    UNION ALL
+    SELECT 'trigger', tgrelid::regclass::text, tgname, tgenabled::text
+    FROM pg_trigger WHERE NOT tgisinternal AND tgrelid IN (
+        SELECT oid FROM pg_class WHERE relnamespace = 'content'::regnamespace
+    )
+"""
+
+
+class SnapshotTests(unittest.TestCase):
+    """Снапшот восстанавливается в пустую схему без потерь и без следов ошибок"""
+
+    @classmethod
+    def setUpClass(cls):
+        dsl = snapshot.get_dsl()
+        try:
+            admin = psycopg2.connect(**{**dsl, 'dbname': 'postgres'})
+        except psycopg2.OperationalError as error:
+            raise unittest.SkipTest(f'PostgreSQL недоступен: {error}')
+        admin.autocommit = True
+        with closing(admin), admin.cursor() as cursor:
+            for name in (SOURCE_DB, TARGET_DB):
+                cursor.execute(f'DROP DATABASE IF EXISTS {name}')
+                cursor.execute(f'CREATE DATABASE {name} TEMPLATE {dsl["dbname"]}')
+        cls.addClassCleanup(cls.drop_databases, dsl)
+        cls.source, cls.target = {**dsl, 'dbname': SOURCE_DB}, {**dsl, 'dbname': TARGET_DB}
+        truncate = f'TRUNCATE {", ".join(f"content.{table}" for table in snapshot.TABLES)} CASCADE'
+        snapshot._run_statements(cls.source, [truncate, FIXTURE_SQL])
+        snapshot._run_statements(cls.target, [truncate])
+
+        directory = tempfile.TemporaryDirectory()
+        cls.addClassCleanup(directory.cleanup)
+        cls.directory = Path(directory.name)
+        cls.manifest = snapshot.dump_snapshot(cls.source, directory.name, jobs=2)
+
+    @staticmethod
+    def drop_databases(dsl: dict):
+        with closing(psycopg2.connect(**{**dsl, 'dbname': 'postgres'})) as admin:
+            admin.autocommit = True
+            with admin.cursor() as cursor:
+                for name in (SOURCE_DB, TARGET_DB):
+                    cursor.execute(f'DROP DATABASE IF EXISTS {name}')
+
+    def query(self, dsl: dict, sql: str) -> list[tuple]:
+        with closing(psycopg2.connect(**dsl)) as conn, conn.cursor() as cursor:
+            cursor.execute(sql)
+            return sorted(cursor.fetchall())
+
+    def checksums(self, manifest: dict) -> dict:
+        return {table['table']: (table['rows'], table['checksum']) for table in manifest['tables']}
+
+    def test_manifest(self):
+        manifest = json.loads((self.directory / snapshot.MANIFEST).read_text())
+        self.assertEqual(manifest, self.manifest)
+        counts = {table: rows for table, (rows, _checksum) in self.checksums(manifest).items()}
+        self.assertEqual(counts, {
+            'genre': 2, 'film_work': 50, 'person': 1, 'genre_film_work': 50, 'person_film_work': 9,
+        })
+
+    def test_round_trip(self):
+        snapshot.restore_snapshot(self.target, self.directory, jobs=2, clean=True)
+        with tempfile.TemporaryDirectory() as directory:
+            restored = snapshot.dump_snapshot(self.target, directory, jobs=2)
+        self.assertEqual(self.checksums(restored), self.checksums(self.manifest))
+        # Счётчики пришли из снапшота, а не пересчитаны триггерами
+        self.assertEqual(
+            self.query(self.target, 'SELECT name, film_count FROM content.genre'), [('Drama', 50), ('Noir', 0)],
+        )
+        self.assertEqual(self.query(self.target, SCHEMA_OBJECTS_SQL), self.query(self.source, SCHEMA_OBJECTS_SQL))
+
+    def test_failed_restore_keeps_schema(self):
+        schema = self.query(self.target, SCHEMA_OBJECTS_SQL)
+        restore_table = snapshot._restore_table
+
+        def failing_restore(dsl, directory, table_snapshot):
+            if table_snapshot['table'] == 'person_film_work':
+                raise RuntimeError('обрыв загрузки')
+            restore_table(dsl, directory, table_snapshot)
+
+        with mock.patch.object(snapshot, '_restore_table', failing_restore):
+            with self.assertRaisesRegex(RuntimeError, 'обрыв загрузки'):
+                snapshot.restore_snapshot(self.target, self.directory, jobs=2, clean=True)
+        self.assertEqual(self.query(self.target, SCHEMA_OBJECTS_SQL), schema)
+        # Загруженные до ошибки таблицы очищены, иначе ключи не создать
+        self.assertEqual(self.query(self.target, 'SELECT count(*) FROM content.genre_film_work'), [(0,)])